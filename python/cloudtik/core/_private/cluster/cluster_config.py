@@ -6,13 +6,16 @@ from typing import Any, Dict, Optional
 from functools import partial
 import yaml
 
+import cloudtik
+from cloudtik.core._private import constants
 from cloudtik.core._private.debug import log_once
 from cloudtik.core._private.utils import prepare_config, decrypt_config, runtime_prepare_config, validate_config, \
     verify_config, encrypt_config, RUNTIME_CONFIG_KEY
 from cloudtik.core._private.providers import _NODE_PROVIDERS, _PROVIDER_PRETTY_NAMES
 from cloudtik.core._private.cli_logger import cli_logger, cf
+from cloudtik.core._private.template_cache import record_template_files, is_template_files_up_to_date
 
-CONFIG_CACHE_VERSION = 1
+CONFIG_CACHE_VERSION = 2
 
 
 def try_logging_config(config: Dict[str, Any]) -> None:
@@ -44,17 +47,26 @@ def _bootstrap_config(config: Dict[str, Any],
     if config.get("bootstrapped", False):
         return config
 
-    config = prepare_config(config)
-    # NOTE: multi-node-type cluster scaler is guaranteed to be in use after this.
-
+    # The cache is keyed by the user config before preparing so that
+    # a cached config is used without loading and merging the templates.
+    # The templates used are checked to be not modified instead.
     hasher = hashlib.sha1()
-    hasher.update(json.dumps([config], sort_keys=True).encode("utf-8"))
+    hasher.update(json.dumps(
+        [config, cloudtik.__version__,
+         os.environ.get(constants.CLOUDTIK_USER_TEMPLATES)],
+        sort_keys=True).encode("utf-8"))
     cache_key = os.path.join(tempfile.gettempdir(),
                              "cloudtik-config-{}".format(hasher.hexdigest()))
 
     if os.path.exists(cache_key) and not no_config_cache:
         config_cache = json.loads(open(cache_key).read())
-        if config_cache.get("_version", -1) == CONFIG_CACHE_VERSION:
+        if config_cache.get("_version", -1) == CONFIG_CACHE_VERSION and (
+                not is_template_files_up_to_date(
+                    config_cache.get("template_files", {}))):
+            cli_logger.verbose(
+                "The templates of the cached cluster config are modified. "
+                "Config will be re-resolved.")
+        elif config_cache.get("_version", -1) == CONFIG_CACHE_VERSION:
             # todo: is it fine to re-resolve? afaik it should be.
             # we can have migrations otherwise or something
             # but this seems overcomplicated given that resolving is
@@ -82,6 +94,27 @@ def _bootstrap_config(config: Dict[str, Any],
                 "Config will be re-resolved.",
                 config_cache.get("_version", "none"), CONFIG_CACHE_VERSION)
 
+    with record_template_files() as template_files:
+        resolved_config = _resolve_config(config)
+
+    if not no_config_cache or init_config_cache:
+        with open(cache_key, "w", opener=partial(os.open, mode=0o600)) as f:
+            encrypted_config = encrypt_config(resolved_config)
+            config_cache = {
+                "_version": CONFIG_CACHE_VERSION,
+                "provider_log_info": try_get_log_state(
+                    resolved_config["provider"]),
+                "template_files": template_files,
+                "config": encrypted_config
+            }
+            f.write(json.dumps(config_cache))
+    return resolved_config
+
+
+def _resolve_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    config = prepare_config(config)
+    # NOTE: multi-node-type cluster scaler is guaranteed to be in use after this.
+
     importer = _NODE_PROVIDERS.get(config["provider"]["type"])
     if not importer:
         raise NotImplementedError("Unsupported provider {}".format(
@@ -106,17 +139,6 @@ def _bootstrap_config(config: Dict[str, Any],
 
     # add a verify step
     verify_config(resolved_config)
-
-    if not no_config_cache or init_config_cache:
-        with open(cache_key, "w", opener=partial(os.open, mode=0o600)) as f:
-            encrypted_config = encrypt_config(resolved_config)
-            config_cache = {
-                "_version": CONFIG_CACHE_VERSION,
-                "provider_log_info": try_get_log_state(
-                    resolved_config["provider"]),
-                "config": encrypted_config
-            }
-            f.write(json.dumps(config_cache))
     return resolved_config
 
 
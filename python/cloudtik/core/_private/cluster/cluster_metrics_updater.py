@@ -6,9 +6,10 @@ from typing import Optional, Dict
 
 from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
 from cloudtik.core._private.cluster.event_summarizer import EventSummarizer
-from cloudtik.core._private.constants import CLOUDTIK_RESOURCE_REQUEST_CHANNEL
+from cloudtik.core._private.constants import CLOUDTIK_RESOURCE_REQUEST_CHANNEL, \
+    CLOUDTIK_HEARTBEAT_TIMEOUT_S, CLOUDTIK_HEARTBEAT_RECONCILE_INTERVAL_S
 from cloudtik.core._private.state.kv_store import kv_initialized, kv_get
-from cloudtik.core._private.state.scaling_state import ScalingStateClient
+from cloudtik.core._private.state.scaling_state import ScalingStateClient, NodeHeartbeatSubscriber
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +20,17 @@ class ClusterMetricsUpdater:
     def __init__(self,
                  cluster_metrics: ClusterMetrics,
                  event_summarizer: Optional[EventSummarizer],
-                 scaling_state_client: ScalingStateClient):
+                 scaling_state_client: ScalingStateClient,
+                 heartbeat_subscriber: Optional[NodeHeartbeatSubscriber] = None):
         self.cluster_metrics = cluster_metrics
         self.event_summarizer = event_summarizer
         self.scaling_state_client = scaling_state_client
+        self.heartbeat_subscriber = heartbeat_subscriber
         self.last_avail_resources = None
         self.cluster_metrics_failures = 0
+        # The latest heartbeat states of the live nodes
+        self.node_heartbeat_states = {}
+        self.last_heartbeats_reconcile_time = 0
 
     def update(self):
         self._update_cluster_metrics()
@@ -56,10 +62,34 @@ class ClusterMetricsUpdater:
 
     def _update_node_heartbeats(
             self, heartbeat_nodes: Dict[str, str]):
-        cluster_heartbeat_state = self.scaling_state_client.get_cluster_heartbeat_state(timeout=60)
-        for node_id, node_heartbeat_state in cluster_heartbeat_state.node_heartbeat_states.items():
-            ip = node_heartbeat_state.node_ip
+        now = time.time()
+        if self.heartbeat_subscriber is not None:
+            pushed_heartbeat_states, missed = self.heartbeat_subscriber.drain()
+        else:
+            pushed_heartbeat_states, missed = {}, True
+
+        if missed or (now - self.last_heartbeats_reconcile_time
+                      >= CLOUDTIK_HEARTBEAT_RECONCILE_INTERVAL_S):
+            # Reconcile with all the heartbeats in the state table
+            self.node_heartbeat_states = {
+                node_heartbeat_state.node_id: node_heartbeat_state
+                for node_heartbeat_state in
+                self.scaling_state_client.iter_node_heartbeat_states(timeout=60)}
+            self.last_heartbeats_reconcile_time = now
+
+        # Apply the heartbeats pushed since the last update
+        for node_id, node_heartbeat_state in pushed_heartbeat_states.items():
+            current_state = self.node_heartbeat_states.get(node_id)
+            if (current_state is None or current_state.last_heartbeat_time
+                    < node_heartbeat_state.last_heartbeat_time):
+                self.node_heartbeat_states[node_id] = node_heartbeat_state
+
+        for node_id, node_heartbeat_state in list(self.node_heartbeat_states.items()):
             last_heartbeat_time = node_heartbeat_state.last_heartbeat_time
+            if now - last_heartbeat_time >= CLOUDTIK_HEARTBEAT_TIMEOUT_S:
+                del self.node_heartbeat_states[node_id]
+                continue
+            ip = node_heartbeat_state.node_ip
             heartbeat_nodes[node_id] = ip
             self.cluster_metrics.update_heartbeat(ip, node_id, last_heartbeat_time)
 
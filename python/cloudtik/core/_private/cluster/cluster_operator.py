@@ -38,7 +38,7 @@ from cloudtik.core._private.constants import \
     CLOUDTIK_RESOURCE_REQUEST_CHANNEL, \
     MAX_PARALLEL_SHUTDOWN_WORKERS, \
     CLOUDTIK_REDIS_DEFAULT_PASSWORD, CLOUDTIK_CLUSTER_STATUS_STOPPED, CLOUDTIK_CLUSTER_STATUS_RUNNING, \
-    CLOUDTIK_RUNTIME_NAME
+    CLOUDTIK_RUNTIME_NAME, RUN_ENV_TYPES
 from cloudtik.core._private.utils import hash_runtime_conf, \
     hash_launch_conf, get_free_port, \
     get_proxy_info_file, get_safe_proxy_process_info, \
@@ -70,6 +70,7 @@ from cloudtik.core._private.cluster.cluster_dump import Archive, \
     create_archive_for_remote_nodes, get_all_local_data, \
     create_archive_for_cluster_nodes
 from cloudtik.core._private.state.control_state import ControlState
+from cloudtik.core._private.state.state_codec import decode_heartbeat
 
 from cloudtik.core._private.cluster.cluster_metrics import ClusterMetricsSummary
 from cloudtik.core._private.cluster.cluster_scaler import ClusterScalerSummary
@@ -77,8 +78,6 @@ from cloudtik.core._private.utils import format_info_string
 
 logger = logging.getLogger(__name__)
 
-RUN_ENV_TYPES = ["auto", "host", "docker"]
-
 POLL_INTERVAL = 5
 
 Port_forward = Union[Tuple[int, int], List[Tuple[int, int]]]
@@ -2200,15 +2199,18 @@ def cluster_process_status_on_head(redis_address, redis_password):
     control_state.initialize_control_state(redis_ip_address, redis_port,
                                            redis_password)
     node_table = control_state.get_node_table()
+    node_heartbeats = control_state.get_node_heartbeat_table().get_all()
 
     tb = pt.PrettyTable()
     tb.field_names = ["node-ip", "node-type", "n-controller", "n-manager", "l-monitor",
                       "c-controller", "r-manager", "r-server"]
-    all_nodes = node_table.get_all().values()
     nodes_info = []
-    for value in all_nodes:
+    for node_id, value in node_table.iter_all():
         node_info = eval(value)
-        if not is_alive_time(node_info.get("last_heartbeat_time", 0)):
+        last_heartbeat_time = node_info.get("last_heartbeat_time", 0)
+        if node_id in node_heartbeats:
+            last_heartbeat_time = decode_heartbeat(node_heartbeats[node_id])
+        if not is_alive_time(last_heartbeat_time):
             continue
         nodes_info.append(node_info)
 
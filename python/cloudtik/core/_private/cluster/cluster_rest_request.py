@@ -1,9 +1,11 @@
-from typing import Dict, Any
+import atexit
+import logging
+import threading
+from typing import Dict, Any, Tuple
 
+import requests
 import sshtunnel
-import urllib
-import urllib.request
-import urllib.error
+from requests.adapters import HTTPAdapter
 
 from paramiko import ProxyCommand
 
@@ -13,6 +15,10 @@ from cloudtik.core._private.utils import get_cluster_head_ip
 
 REST_ENDPOINT_URL_FORMAT = "http://{}:{}/{}"
 REST_REQUEST_TIMEOUT = 60
+REST_TUNNEL_KEEPALIVE_S = 5.0
+REST_HTTP_POOL_MAXSIZE = 10
+
+logger = logging.getLogger(__name__)
 
 
 def request_rest_to_head(
@@ -48,34 +54,153 @@ def ssh_proxy_wrapper(ssh_proxy_command, server_ip, ssh_port, ssh_user):
     return ssh_proxy
 
 
-def request_rest_to_server(
-        config, server_ip, rest_api_ip: str, rest_api_port: int, endpoint: str):
-    auth_config = config.get("auth", {})
-    ssh_proxy_command = auth_config.get("ssh_proxy_command", None)
-    ssh_private_key = auth_config.get("ssh_private_key", None)
-    ssh_user = auth_config["ssh_user"]
-    ssh_port = auth_config.get("ssh_port", 22)
-    ssh_proxy = ssh_proxy_wrapper(ssh_proxy_command, server_ip, ssh_port, ssh_user)
-
-    with sshtunnel.open_tunnel(
+class SSHTunnelManager:
+    """Keep a long-lived SSH tunnel for each (server, remote address).
+
+    The tunnels are kept alive by the SSH keep-alive and reused by the
+    requests to the same remote address. A tunnel which is no longer active
+    is reconnected on the next use. All the tunnels are closed at exit.
+
+    A tunnel is opened with the lock of its key only, so opening a tunnel
+    doesn't block the requests through the other tunnels.
+    """
+
+    def __init__(self, keepalive_s: float = REST_TUNNEL_KEEPALIVE_S):
+        self.keepalive_s = keepalive_s
+        self._lock = threading.Lock()
+        self._tunnels: Dict[Tuple, sshtunnel.SSHTunnelForwarder] = {}
+        self._tunnel_locks: Dict[Tuple, threading.Lock] = {}
+
+    def get_local_port(self, config, server_ip,
+                       remote_ip: str, remote_port: int) -> int:
+        """The local port forwarded to the remote address through the server."""
+        key = self._get_tunnel_key(config, server_ip, remote_ip, remote_port)
+        with self._lock:
+            tunnel_lock = self._tunnel_locks.setdefault(key, threading.Lock())
+        with tunnel_lock:
+            with self._lock:
+                tunnel = self._tunnels.get(key)
+            if tunnel is not None and not self._is_tunnel_up(tunnel):
+                logger.debug("SSH tunnel to {}:{} through {} is down. "
+                             "Reconnecting.".format(remote_ip, remote_port, server_ip))
+                with self._lock:
+                    if self._tunnels.get(key) is tunnel:
+                        del self._tunnels[key]
+                self._stop_tunnel(tunnel)
+                tunnel = None
+            if tunnel is None:
+                tunnel = self._open_tunnel(config, server_ip, remote_ip, remote_port)
+                with self._lock:
+                    self._tunnels[key] = tunnel
+            return tunnel.local_bind_port
+
+    def close(self, config, server_ip, remote_ip: str, remote_port: int):
+        key = self._get_tunnel_key(config, server_ip, remote_ip, remote_port)
+        with self._lock:
+            tunnel = self._tunnels.pop(key, None)
+        if tunnel is not None:
+            self._stop_tunnel(tunnel)
+
+    def close_all(self):
+        with self._lock:
+            tunnels = list(self._tunnels.values())
+            self._tunnels = {}
+        for tunnel in tunnels:
+            self._stop_tunnel(tunnel)
+
+    @staticmethod
+    def _get_tunnel_key(config, server_ip, remote_ip, remote_port):
+        auth_config = config.get("auth", {})
+        return (server_ip, auth_config.get("ssh_port", 22),
+                auth_config["ssh_user"], remote_ip, remote_port)
+
+    def _open_tunnel(self, config, server_ip, remote_ip, remote_port):
+        auth_config = config.get("auth", {})
+        ssh_proxy_command = auth_config.get("ssh_proxy_command", None)
+        ssh_private_key = auth_config.get("ssh_private_key", None)
+        ssh_user = auth_config["ssh_user"]
+        ssh_port = auth_config.get("ssh_port", 22)
+        ssh_proxy = ssh_proxy_wrapper(ssh_proxy_command, server_ip, ssh_port, ssh_user)
+
+        tunnel = sshtunnel.open_tunnel(
             server_ip,
             ssh_username=ssh_user,
             ssh_port=ssh_port,
             ssh_pkey=ssh_private_key,
             ssh_proxy=ssh_proxy,
-            remote_bind_address=(rest_api_ip, rest_api_port)
-    ) as tunnel:
-        return request_rest_direct("127.0.0.1", tunnel.local_bind_port, endpoint)
+            remote_bind_address=(remote_ip, remote_port),
+            set_keepalive=self.keepalive_s
+        )
+        # Don't block the exit of the process on the tunnel threads
+        tunnel.daemon_forward_servers = True
+        tunnel.daemon_transport = True
+        tunnel.start()
+        return tunnel
+
+    @staticmethod
+    def _is_tunnel_up(tunnel) -> bool:
+        try:
+            return tunnel.is_active
+        except Exception:
+            return False
+
+    @staticmethod
+    def _stop_tunnel(tunnel):
+        try:
+            tunnel.stop(force=True)
+        except Exception as e:
+            logger.debug("Error stopping SSH tunnel: {}".format(e))
+
+
+_ssh_tunnel_manager = None
+_http_session = None
+_lock = threading.Lock()
+
+
+def get_ssh_tunnel_manager() -> SSHTunnelManager:
+    global _ssh_tunnel_manager
+    with _lock:
+        if _ssh_tunnel_manager is None:
+            _ssh_tunnel_manager = SSHTunnelManager()
+            atexit.register(_ssh_tunnel_manager.close_all)
+        return _ssh_tunnel_manager
+
+
+def get_http_session() -> requests.Session:
+    """The HTTP session with pooled keep-alive connections for REST requests."""
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            session = requests.Session()
+            # The requests go to the head or through 127.0.0.1,
+            # disable all the proxies from the environment
+            session.trust_env = False
+            adapter = HTTPAdapter(pool_maxsize=REST_HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def request_rest_to_server(
+        config, server_ip, rest_api_ip: str, rest_api_port: int, endpoint: str):
+    tunnel_manager = get_ssh_tunnel_manager()
+    local_port = tunnel_manager.get_local_port(
+        config, server_ip, rest_api_ip, rest_api_port)
+    try:
+        return request_rest_direct("127.0.0.1", local_port, endpoint)
+    except requests.ConnectionError:
+        # The tunnel may be broken without being noticed. Reconnect once.
+        tunnel_manager.close(config, server_ip, rest_api_ip, rest_api_port)
+        local_port = tunnel_manager.get_local_port(
+            config, server_ip, rest_api_ip, rest_api_port)
+        return request_rest_direct("127.0.0.1", local_port, endpoint)
 
 
 def request_rest_direct(rest_api_ip: str, rest_api_port: int, endpoint: str):
     endpoint_url = REST_ENDPOINT_URL_FORMAT.format(
         rest_api_ip, rest_api_port, endpoint)
 
-    # sine we have use 127.0.0.1, disable all proxy on 127.0.0.1
-    proxy_support = urllib.request.ProxyHandler({"no": "127.0.0.1"})
-    opener = urllib.request.build_opener(proxy_support)
-    urllib.request.install_opener(opener)
-
-    response = urllib.request.urlopen(endpoint_url, timeout=REST_REQUEST_TIMEOUT)
-    return response.read()
+    response = get_http_session().get(endpoint_url, timeout=REST_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.content
@@ -10,7 +10,6 @@ import math
 import operator
 import os
 import subprocess
-import threading
 import time
 import yaml
 from enum import Enum
@@ -39,22 +38,25 @@ from cloudtik.core._private.cluster.event_summarizer import EventSummarizer
 from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
 from cloudtik.core._private.prometheus_metrics import ClusterPrometheusMetrics
 from cloudtik.core._private.providers import _get_node_provider
+from cloudtik.core._private.cluster.scaler_profiler import ScalerProfiler
+from cloudtik.core._private.cluster.node_updater_pool import NodeUpdaterPool
+from cloudtik.core._private.command_executor import get_ssh_control_master_pool
 from cloudtik.core._private.node.node_updater import NodeUpdaterThread
 from cloudtik.core._private.cluster.node_launcher import NodeLauncher
+from cloudtik.core._private.cluster.config_snapshot import ConfigSnapshot
 from cloudtik.core._private.cluster.node_tracker import NodeTracker
 from cloudtik.core._private.cluster.resource_demand_scheduler import \
     get_bin_pack_residual, ResourceDemandScheduler, NodeType, NodeID, NodeIP, \
     ResourceDict
 from cloudtik.core._private.utils import validate_config, \
-    hash_launch_conf, hash_runtime_conf, \
+    hash_runtime_conf, \
     format_info_string, get_commands_to_run, with_head_node_ip_environment_variables, \
-    encode_cluster_secrets, _get_node_specific_commands, _get_node_specific_config, \
-    _get_node_specific_docker_config, _get_node_specific_runtime_config, \
+    encode_cluster_secrets, get_node_type, \
     _has_node_type_specific_runtime_config, get_runtime_config_key, RUNTIME_CONFIG_KEY, \
     _get_minimal_nodes_before_update, CLOUDTIK_CLUSTER_NODES_INFO_NODE_TYPE, _notify_minimal_nodes_reached, \
     process_config_with_privacy, decrypt_config, CLOUDTIK_CLUSTER_SCALING_STATUS
 from cloudtik.core._private.constants import CLOUDTIK_MAX_NUM_FAILURES, \
-    CLOUDTIK_MAX_LAUNCH_BATCH, CLOUDTIK_MAX_CONCURRENT_LAUNCHES, \
+    CLOUDTIK_MAX_LAUNCH_BATCH, CLOUDTIK_MAX_CONCURRENT_LAUNCHES, CLOUDTIK_MAX_CONCURRENT_UPDATES, \
     CLOUDTIK_UPDATE_INTERVAL_S, CLOUDTIK_HEARTBEAT_TIMEOUT_S, CLOUDTIK_RUNTIME_ENV_SECRETS
 
 logger = logging.getLogger(__name__)
@@ -78,37 +80,110 @@ class ClusterScalerSummary:
 
 
 class NonTerminatedNodes:
-    """Class to extract and organize information on non-terminated nodes."""
+    """Class to extract and organize information on non-terminated nodes.
+
+    The node kind, node type and internal ip of each node are cached, so
+    that refresh only queries the provider for the nodes which are new
+    since the last refresh.
+    """
 
     def __init__(self, provider: NodeProvider):
-        # All non-terminated nodes
-        self.all_node_ids = provider.non_terminated_nodes({})
+        self.provider = provider
 
+        # All non-terminated nodes
+        self.all_node_ids: List[NodeID] = []
         # Managed worker nodes (node kind "worker"):
         self.worker_ids: List[NodeID] = []
         # The head node (node kind "head")
         self.head_id: Optional[NodeID] = None
 
-        for node in self.all_node_ids:
-            node_kind = provider.node_tags(node)[CLOUDTIK_TAG_NODE_KIND]
-            if node_kind == NODE_KIND_WORKER:
-                self.worker_ids.append(node)
-            elif node_kind == NODE_KIND_HEAD:
-                self.head_id = node
+        # The index of the nodes above for O(1) membership checks
+        self.all_node_id_set: Set[NodeID] = set()
+        self.worker_id_set: Set[NodeID] = set()
+
+        # Per node cache of the node kinds, node types and ips
+        self.node_kinds: Dict[NodeID, str] = {}
+        self.node_types: Dict[NodeID, Optional[NodeType]] = {}
+        self.node_ips: Dict[NodeID, NodeIP] = {}
+
+        self.refresh()
 
         # Note: For typical use-cases,
         # self.all_node_ids == self.worker_ids + [self.head_id]
 
+    def refresh(self) -> None:
+        """Query the provider for the non-terminated nodes and update
+        the internal state with the difference from the last refresh."""
+        self.all_node_ids = self.provider.non_terminated_nodes({})
+        self.all_node_id_set = set(self.all_node_ids)
+
+        # Forget the nodes which are gone
+        for node_id in list(self.node_kinds):
+            if node_id not in self.all_node_id_set:
+                self._forget_node(node_id)
+
+        self.worker_ids = []
+        self.head_id = None
+        for node_id in self.all_node_ids:
+            node_kind = self.node_kinds.get(node_id)
+            if node_kind is None:
+                # Only new nodes need to query the tags
+                tags = self.provider.node_tags(node_id)
+                node_kind = tags[CLOUDTIK_TAG_NODE_KIND]
+                self.node_kinds[node_id] = node_kind
+                self.node_types[node_id] = tags.get(
+                    CLOUDTIK_TAG_USER_NODE_TYPE)
+            if node_kind == NODE_KIND_WORKER:
+                self.worker_ids.append(node_id)
+            elif node_kind == NODE_KIND_HEAD:
+                self.head_id = node_id
+        self.worker_id_set = set(self.worker_ids)
+
     def remove_terminating_nodes(self,
                                  terminating_nodes: List[NodeID]) -> None:
         """Remove nodes we're in the process of terminating from internal
         state."""
+        terminating_nodes = set(terminating_nodes)
 
         def not_terminating(node):
             return node not in terminating_nodes
 
         self.worker_ids = list(filter(not_terminating, self.worker_ids))
         self.all_node_ids = list(filter(not_terminating, self.all_node_ids))
+        self.worker_id_set -= terminating_nodes
+        self.all_node_id_set -= terminating_nodes
+        # The provider may reuse a terminated node with different tags
+        for node_id in terminating_nodes:
+            self._forget_node(node_id)
+
+    def is_worker(self, node_id: NodeID) -> bool:
+        return node_id in self.worker_id_set
+
+    def node_type(self, node_id: NodeID) -> Optional[NodeType]:
+        node_type = self.node_types.get(node_id)
+        if node_type is None:
+            node_type = self.provider.node_tags(node_id).get(
+                CLOUDTIK_TAG_USER_NODE_TYPE)
+            if node_type is not None and node_id in self.all_node_id_set:
+                self.node_types[node_id] = node_type
+        return node_type
+
+    def internal_ip(self, node_id: NodeID) -> Optional[NodeIP]:
+        node_ip = self.node_ips.get(node_id)
+        if node_ip is None:
+            # The ip may not be available yet for a pending node
+            node_ip = self.provider.internal_ip(node_id)
+            if node_ip is not None and node_id in self.all_node_id_set:
+                self.node_ips[node_id] = node_ip
+        return node_ip
+
+    def internal_ips(self) -> List[NodeIP]:
+        return [self.internal_ip(node_id) for node_id in self.all_node_ids]
+
+    def _forget_node(self, node_id: NodeID) -> None:
+        self.node_kinds.pop(node_id, None)
+        self.node_types.pop(node_id, None)
+        self.node_ips.pop(node_id, None)
 
 
 # Whether a worker should be kept based on the min_workers and
@@ -141,11 +216,13 @@ class ClusterScaler:
             resource_scaling_policy: ResourceScalingPolicy,
             max_launch_batch: int = CLOUDTIK_MAX_LAUNCH_BATCH,
             max_concurrent_launches: int = CLOUDTIK_MAX_CONCURRENT_LAUNCHES,
+            max_concurrent_updates: int = CLOUDTIK_MAX_CONCURRENT_UPDATES,
             max_failures: int = CLOUDTIK_MAX_NUM_FAILURES,
             process_runner: Any = subprocess,
             update_interval_s: int = CLOUDTIK_UPDATE_INTERVAL_S,
             event_summarizer: Optional[EventSummarizer] = None,
             prometheus_metrics: Optional[ClusterPrometheusMetrics] = None,
+            scaler_profiler: Optional[ScalerProfiler] = None,
     ):
         """Create a ClusterScaler.
 
@@ -157,12 +234,15 @@ class ClusterScaler:
             max_concurrent_launches: Max number of nodes that can be
                 concurrently launched. This value and `max_launch_batch`
                 determine the number of batches that are used to launch nodes.
+            max_concurrent_updates: Max number of node updaters that can run
+                concurrently. The other updaters are queued.
             max_failures: Number of failures that the cluster scaler will tolerate
                 before exiting.
             process_runner: Subproc-like interface used by the CommandRunner.
             update_interval_s: Seconds between running the autoscaling loop.
             event_summarizer: Utility to consolidate duplicated messages.
             prometheus_metrics: Prometheus metrics for cluster scaler related operations.
+            scaler_profiler: Profiler for the phases of the update loop.
         """
 
         if isinstance(config_reader, str):
@@ -182,6 +262,7 @@ class ClusterScaler:
 
         self.config = {}
         self.config_hash = None
+        self.config_snapshot = None
         # TODO: Each node updater may need its own CallContext
         # The call context for node updater
         self.call_context = CallContext()
@@ -192,6 +273,7 @@ class ClusterScaler:
         # then prometheus_metrics must be instantiated to increment the
         # exception counter)
         self.prometheus_metrics = prometheus_metrics or ClusterPrometheusMetrics()
+        self.profiler = scaler_profiler or ScalerProfiler(self.prometheus_metrics)
         self.resource_demand_scheduler = None
 
         # These are records of publish for performance
@@ -226,6 +308,8 @@ class ClusterScaler:
 
         # Map from node_id to NodeUpdater threads
         self.updaters = {}
+        # The updaters are started by the pool with a limit of concurrency
+        self.updater_pool = NodeUpdaterPool(max_concurrent_updates)
         self.num_failed_updates = defaultdict(int)
         self.num_successful_updates = defaultdict(int)
         self.num_failures = 0
@@ -290,10 +374,17 @@ class ClusterScaler:
         logger.info("Cluster Controller: {}".format(config_to_log))
 
     def run(self):
-        self.reset(errors_fatal=False)
+        with self.profiler.tick():
+            self._run()
+
+    def _run(self):
+        with self.profiler.phase("reset"):
+            self.reset(errors_fatal=False)
 
-        self.resource_scaling_policy.update()
-        self.cluster_metrics_updater.update()
+        with self.profiler.phase("update_scaling_policy"):
+            self.resource_scaling_policy.update()
+        with self.profiler.phase("update_cluster_metrics"):
+            self.cluster_metrics_updater.update()
 
         status = {
             "cluster_metrics_report": asdict(self.cluster_metrics.summary()),
@@ -302,7 +393,8 @@ class ClusterScaler:
         }
 
         self.update()
-        self.update_status(status)
+        with self.profiler.phase("update_status"):
+            self.update_status(status)
 
     def update_status(self, status):
         status["cluster_scaler_report"] = asdict(self.summary())
@@ -347,7 +439,11 @@ class ClusterScaler:
         self.last_update_time = now
 
         # Query the provider to update the list of non-terminated nodes
-        self.non_terminated_nodes = NonTerminatedNodes(self.provider)
+        with self.profiler.phase("non_terminated_nodes"):
+            if self.non_terminated_nodes is None:
+                self.non_terminated_nodes = NonTerminatedNodes(self.provider)
+            else:
+                self.non_terminated_nodes.refresh()
 
         # This will accumulate the nodes we need to terminate.
         self.nodes_to_terminate = []
@@ -357,29 +453,37 @@ class ClusterScaler:
         self.prometheus_metrics.running_workers.set(num_workers)
 
         # Remove from LoadMetrics the ips unknown to the NodeProvider.
-        self.cluster_metrics.prune_active_ips(active_ips=[
-            self.provider.internal_ip(node_id)
-            for node_id in self.non_terminated_nodes.all_node_ids
-        ])
+        with self.profiler.phase("prune_active_ips"):
+            active_ips = self.non_terminated_nodes.internal_ips()
+            self.cluster_metrics.prune_active_ips(active_ips=active_ips)
+            # Close the SSH connections to the nodes terminated
+            control_master_pool = get_ssh_control_master_pool()
+            if control_master_pool is not None:
+                control_master_pool.prune(active_ips)
 
         # Update status strings
-        logger.info(self.info_string())
+        with self.profiler.phase("info_string"):
+            logger.info(self.info_string())
 
-        self.terminate_nodes_to_enforce_config_constraints(now)
+        with self.profiler.phase("enforce_config_constraints"):
+            self.terminate_nodes_to_enforce_config_constraints(now)
 
         if not self.disable_node_number:
             # Assign node number to new nodes
-            self.assign_node_number_to_new_nodes()
+            with self.profiler.phase("assign_node_number"):
+                self.assign_node_number_to_new_nodes()
 
-        wait_for_update = self.wait_for_minimal_nodes_before_update()
+        with self.profiler.phase("wait_for_minimal_nodes"):
+            wait_for_update = self.wait_for_minimal_nodes_before_update()
         if not wait_for_update:
-            if self.disable_node_updaters:
-                self.terminate_unhealthy_nodes(now)
-            else:
-                self.process_completed_updates()
-                self.update_nodes()
-                self.attempt_to_recover_unhealthy_nodes(now)
-                self.set_prometheus_updater_data()
+            with self.profiler.phase("update_nodes"):
+                if self.disable_node_updaters:
+                    self.terminate_unhealthy_nodes(now)
+                else:
+                    self.process_completed_updates()
+                    self.update_nodes()
+                    self.attempt_to_recover_unhealthy_nodes(now)
+                    self.set_prometheus_updater_data()
 
         # The key place to scale up the nodes based on resource metrics
         # Based on the following aspects:
@@ -391,18 +495,20 @@ class ClusterScaler:
         # 4. The total resources of each node reported by runtime is used to update the node type resource information.
         #    (get_static_node_resources_by_ip)
         # Dict[NodeType, int], List[ResourceDict]
-        to_launch, unfulfilled = (
-            self.resource_demand_scheduler.get_nodes_to_launch(
-                self.non_terminated_nodes.all_node_ids,
-                self.pending_launches.breakdown(),
-                self.cluster_metrics.get_resource_demands(),
-                self.cluster_metrics.get_resource_utilization(),
-                self.cluster_metrics.get_static_node_resources_by_ip(),
-                ensure_min_cluster_size=self.cluster_metrics.
-                get_resource_requests()))
-        self._report_pending_infeasible(unfulfilled)
-
-        self.launch_required_nodes(to_launch)
+        with self.profiler.phase("get_nodes_to_launch"):
+            to_launch, unfulfilled = (
+                self.resource_demand_scheduler.get_nodes_to_launch(
+                    self.non_terminated_nodes.all_node_ids,
+                    self.pending_launches.breakdown(),
+                    self.cluster_metrics.get_resource_demands(),
+                    self.cluster_metrics.get_resource_utilization(),
+                    self.cluster_metrics.get_static_node_resources_by_ip(),
+                    ensure_min_cluster_size=self.cluster_metrics.
+                    get_resource_requests()))
+            self._report_pending_infeasible(unfulfilled)
+
+        with self.profiler.phase("launch_required_nodes"):
+            self.launch_required_nodes(to_launch)
 
         # Record the amount of time the cluster scaler took for
         # this _update() iteration.
@@ -452,9 +558,8 @@ class ClusterScaler:
 
         def keep_node(node_id: NodeID) -> None:
             # Update per-type counts.
-            tags = self.provider.node_tags(node_id)
-            if CLOUDTIK_TAG_USER_NODE_TYPE in tags:
-                node_type = tags[CLOUDTIK_TAG_USER_NODE_TYPE]
+            node_type = self.non_terminated_nodes.node_type(node_id)
+            if node_type is not None:
                 node_type_counts[node_type] += 1
 
         # Nodes that we could terminate, if needed.
@@ -475,7 +580,7 @@ class ClusterScaler:
                 keep_node(node_id)
                 continue
 
-            node_ip = self.provider.internal_ip(node_id)
+            node_ip = self.non_terminated_nodes.internal_ip(node_id)
             if node_ip in last_used and last_used[node_ip] < horizon:
                 self.schedule_node_termination(node_id, "idle", logger.info)
             elif not self.launch_config_ok(node_id):
@@ -516,7 +621,7 @@ class ClusterScaler:
         if reason_opt is None:
             raise Exception("reason should be not None.")
         reason: str = reason_opt
-        node_ip = self.provider.internal_ip(node_id)
+        node_ip = self.non_terminated_nodes.internal_ip(node_id)
         # Log, record an event, and add node_id to nodes_to_terminate.
         logger_method("Cluster Controller: "
                       f"Terminating the node with id {node_id}"
@@ -565,32 +670,32 @@ class ClusterScaler:
         and/or start services.
         """
         # Update nodes with out-of-date files.
-        # Spawning these threads directly seems to cause
-        # problems. They should at a minimum be spawned as daemon threads.
-        # See pull #5903 for more info.
-        T = []
+        # The updaters are submitted to the updater pool which starts
+        # them as daemon threads with a limit of concurrent updates.
         for node_id, setup_commands, start_commands, docker_config in (
                 self.should_update(node_id)
                 for node_id in self.non_terminated_nodes.worker_ids):
             if node_id is not None:
                 resources = self._node_resources(node_id)
                 call_context = self.call_context.new_call_context()
-                logger.debug(f"{node_id}: Starting new thread runner.")
-                T.append(
-                    threading.Thread(
-                        target=self.spawn_updater,
-                        args=(node_id, setup_commands, start_commands,
-                              resources, docker_config, call_context)))
-        for t in T:
-            t.start()
-        for t in T:
-            t.join()
+                logger.debug(f"{node_id}: Submitting new updater.")
+                self.spawn_updater(node_id, setup_commands, start_commands,
+                                   resources, docker_config, call_context)
 
     def process_completed_updates(self):
         """Clean up completed NodeUpdaterThreads.
         """
+        # Drop the queued updaters of the nodes which are terminated
+        for node_id in list(self.updaters):
+            if (self.updater_pool.is_queued(node_id)
+                    and node_id not in self.non_terminated_nodes.all_node_id_set):
+                if self.updater_pool.cancel(node_id):
+                    del self.updaters[node_id]
+
         completed_nodes = []
         for node_id, updater in self.updaters.items():
+            if self.updater_pool.is_queued(node_id):
+                continue
             if not updater.is_alive():
                 completed_nodes.append(node_id)
         if completed_nodes:
@@ -625,7 +730,7 @@ class ClusterScaler:
                 # Update the list of non-terminated workers.
                 for node_id in failed_nodes:
                     # Check if the node has already been terminated.
-                    if node_id in self.non_terminated_nodes.worker_ids:
+                    if self.non_terminated_nodes.is_worker(node_id):
                         self.schedule_node_termination(
                             node_id, "launch failed", logger.error)
                     else:
@@ -635,10 +740,13 @@ class ClusterScaler:
                 self.terminate_scheduled_nodes()
 
     def set_prometheus_updater_data(self):
-        """Record total number of active NodeUpdaterThreads and how many of
-        these are being run to recover nodes.
+        """Record total number of active NodeUpdaterThreads, how many of
+        these are being run to recover nodes and how many are queued.
         """
-        self.prometheus_metrics.updating_nodes.set(len(self.updaters))
+        num_queued = self.updater_pool.num_queued
+        self.prometheus_metrics.updating_nodes.set(
+            len(self.updaters) - num_queued)
+        self.prometheus_metrics.queued_updating_nodes.set(num_queued)
         num_recovering = 0
         for updater in self.updaters.values():
             if updater.for_recovery:
@@ -697,7 +805,7 @@ class ClusterScaler:
         least_recently_used = -1
 
         def last_time_used(node_id: NodeID):
-            node_ip = self.provider.internal_ip(node_id)
+            node_ip = self.non_terminated_nodes.internal_ip(node_id)
             if node_ip not in last_used_copy:
                 return least_recently_used
             else:
@@ -730,7 +838,7 @@ class ClusterScaler:
                 NodeIP,
                 ResourceDict] = \
                 self.cluster_metrics.get_static_node_resources_by_ip()
-            head_node_ip = self.provider.internal_ip(
+            head_node_ip = self.non_terminated_nodes.internal_ip(
                 self.non_terminated_nodes.head_id)
             head_node_resources = static_nodes.get(head_node_ip, {})
 
@@ -749,7 +857,7 @@ class ClusterScaler:
                         NodeIP,
                         ResourceDict] = \
                             self.cluster_metrics.get_static_node_resources_by_ip()
-                    node_ip = self.provider.internal_ip(node_id)
+                    node_ip = self.non_terminated_nodes.internal_ip(node_id)
                     node_resources = static_nodes.get(node_ip, {})
                 max_node_resources.append(node_resources)
                 resource_demand_vector_worker_node_ids.append(node_id)
@@ -805,10 +913,8 @@ class ClusterScaler:
             Optional[str]: reason for termination. Not None on
             KeepOrTerminate.terminate, None otherwise.
         """
-        tags = self.provider.node_tags(node_id)
-        if CLOUDTIK_TAG_USER_NODE_TYPE in tags:
-            node_type = tags[CLOUDTIK_TAG_USER_NODE_TYPE]
-
+        node_type = self.non_terminated_nodes.node_type(node_id)
+        if node_type is not None:
             min_workers = self.available_node_types.get(node_type, {}).get(
                 "min_workers", 0)
             max_workers = self.available_node_types.get(node_type, {}).get(
@@ -846,6 +952,10 @@ class ClusterScaler:
             else:
                 # Config not changed, check whether it needs to update the file_mounts_contents_hash
                 self._update_file_mounts_contents_hash(self.config)
+                # and whether the key files of the launch hashes are modified
+                if self.config_snapshot.check_key_files():
+                    logger.info("Cluster Controller: "
+                                "SSH key files modified. Recompute the launch hashes.")
         except Exception as e:
             self.prometheus_metrics.reset_exceptions.inc()
             if errors_fatal:
@@ -866,12 +976,14 @@ class ClusterScaler:
                     exc_info=e)
 
         self.config = new_config
+        self.config_snapshot = ConfigSnapshot(new_config, self.config_hash)
 
         self._update_runtime_hashes(self.config)
 
         if not self.provider:
             self.provider = _get_node_provider(self.config["provider"],
                                                self.config["cluster_name"])
+            self.profiler.instrument_provider(self.provider)
 
         self.available_node_types = self.config["available_node_types"]
 
@@ -1020,12 +1132,8 @@ class ClusterScaler:
             # Don't keep the node.
             return False
 
-        launch_config = {}
-        if node_type:
-            launch_config.update(
-                self.config["available_node_types"][node_type]["node_config"])
-        calculated_launch_hash = hash_launch_conf(launch_config,
-                                                  self.config["auth"])
+        calculated_launch_hash = self.config_snapshot.get_launch_hash(
+            node_type)
 
         if calculated_launch_hash != tag_launch_conf:
             return False
@@ -1064,7 +1172,7 @@ class ClusterScaler:
         """Determine whether we've received a heartbeat from a node within the
         last CLOUDTIK_HEARTBEAT_TIMEOUT_S seconds.
         """
-        key = self.provider.internal_ip(node_id)
+        key = self.non_terminated_nodes.internal_ip(node_id)
 
         if key in self.cluster_metrics.last_heartbeat_time_by_ip:
             last_heartbeat_time = self.cluster_metrics.last_heartbeat_time_by_ip[
@@ -1087,7 +1195,7 @@ class ClusterScaler:
             # This node is up-to-date. If it hasn't had the chance to produce
             # a heartbeat, fake the heartbeat now (see logic for completed node
             # updaters).
-            ip = self.provider.internal_ip(node_id)
+            ip = self.non_terminated_nodes.internal_ip(node_id)
             if ip not in self.cluster_metrics.last_heartbeat_time_by_ip:
                 self.cluster_metrics.mark_active(ip)
             # Heartbeat indicates node is healthy:
@@ -1115,7 +1223,7 @@ class ClusterScaler:
             " (lost contact with node).",
             quantity=1,
             aggregate=operator.add)
-        head_node_ip = self.provider.internal_ip(
+        head_node_ip = self.non_terminated_nodes.internal_ip(
             self.non_terminated_nodes.head_id)
         runtime_hash = self.get_node_runtime_hash(node_id)
         docker_config = self._get_node_specific_docker_config(node_id)
@@ -1150,32 +1258,33 @@ class ClusterScaler:
             for_recovery=True,
             runtime_config=runtime_config,
             environment_variables=environment_variables)
-        updater.start()
         self.updaters[node_id] = updater
+        self.updater_pool.submit(updater)
 
     def _get_node_type(self, node_id: str) -> str:
-        node_tags = self.provider.node_tags(node_id)
-        if CLOUDTIK_TAG_USER_NODE_TYPE in node_tags:
-            return node_tags[CLOUDTIK_TAG_USER_NODE_TYPE]
+        node_type = self.non_terminated_nodes.node_type(node_id)
+        if node_type is not None:
+            return node_type
         else:
             return "unknown_node_type"
 
     def _get_node_specific_commands(self, node_id: str,
                                     command_key: str) -> Any:
-        return _get_node_specific_commands(
-            self.config, self.provider, node_id, command_key)
+        node_type = get_node_type(self.provider, node_id)
+        return self.config_snapshot.get_commands(node_type, command_key)
 
     def _get_node_specific_config(self, node_id: str) -> Any:
-        return _get_node_specific_config(
-            self.config, self.provider, node_id)
+        node_type = get_node_type(self.provider, node_id)
+        return self.config_snapshot.get_node_type_config(
+            node_type).node_type_config
 
     def _get_node_specific_docker_config(self, node_id):
-        return _get_node_specific_docker_config(
-            self.config, self.provider, node_id)
+        node_type = get_node_type(self.provider, node_id)
+        return self.config_snapshot.get_docker_config(node_type)
 
     def _get_node_specific_runtime_config(self, node_id):
-        return _get_node_specific_runtime_config(
-            self.config, self.provider, node_id)
+        node_type = get_node_type(self.provider, node_id)
+        return self.config_snapshot.get_runtime_config(node_type)
 
     def should_update(self, node_id):
         if not self.can_update(node_id):
@@ -1211,10 +1320,10 @@ class ClusterScaler:
                       node_resources, docker_config, call_context):
         logger.info(f"Creating new (spawn_updater) updater thread for node"
                     f" {node_id}.")
-        ip = self.provider.internal_ip(node_id)
+        ip = self.non_terminated_nodes.internal_ip(node_id)
         node_type = self._get_node_type(node_id)
         self.node_tracker.track(node_id, ip, node_type)
-        head_node_ip = self.provider.internal_ip(
+        head_node_ip = self.non_terminated_nodes.internal_ip(
             self.non_terminated_nodes.head_id)
         runtime_hash = self.get_node_runtime_hash(node_id)
         runtime_config = self._get_node_specific_runtime_config(node_id)
@@ -1251,8 +1360,8 @@ class ClusterScaler:
             node_resources=node_resources,
             runtime_config=runtime_config,
             environment_variables=environment_variables)
-        updater.start()
         self.updaters[node_id] = updater
+        self.updater_pool.submit(updater)
 
     def can_update(self, node_id):
         if self.disable_node_updaters:
@@ -1276,10 +1385,11 @@ class ClusterScaler:
             aggregate=operator.add)
         self.pending_launches.inc(node_type, count)
         self.prometheus_metrics.pending_nodes.set(self.pending_launches.value)
-        config = copy.deepcopy(self.config)
+        # The snapshot is shared read-only by the launchers
+        config_snapshot = self.config_snapshot
         # Split into individual launch requests of the max batch size.
         while count > 0:
-            self.launch_queue.put((config, min(count, self.max_launch_batch),
+            self.launch_queue.put((config_snapshot, min(count, self.max_launch_batch),
                                    node_type))
             count -= self.max_launch_batch
 
@@ -1314,7 +1424,7 @@ class ClusterScaler:
         non_failed = set()
 
         for node_id in self.non_terminated_nodes.all_node_ids:
-            ip = self.provider.internal_ip(node_id)
+            ip = self.non_terminated_nodes.internal_ip(node_id)
             node_tags = self.provider.node_tags(node_id)
 
             if not all(
@@ -1397,7 +1507,7 @@ class ClusterScaler:
                     nodes_info_map[node_type] = {}
                 nodes_info = nodes_info_map[node_type]
 
-                node_info = {"node_ip": self.provider.internal_ip(node_id)}
+                node_info = {"node_ip": self.non_terminated_nodes.internal_ip(node_id)}
                 if CLOUDTIK_TAG_NODE_NUMBER in tags:
                     node_info["node_number"] = int(tags[CLOUDTIK_TAG_NODE_NUMBER])
                 nodes_info[node_id] = node_info
@@ -0,0 +1,143 @@
+"""Read-only snapshot of the cluster config applied by the cluster scaler.
+
+A snapshot is created each time a new cluster config is applied and is
+replaced as a whole. The merged views of each node type (commands, docker
+config, runtime config, resources and launch hash) are resolved once per
+snapshot instead of once per node and per update. The snapshot and its views
+are shared by the node launchers and the node updaters without copying and
+must not be modified. The launch hashes include the content of the SSH key
+files and are recomputed when the key files are modified.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from cloudtik.core._private.utils import hash_launch_conf, get_auth_key_files_mtime, \
+    _get_node_type_config, _get_node_type_specific_commands, \
+    _get_node_type_specific_docker_config, _get_node_type_specific_runtime_config
+
+_UNRESOLVED = object()
+
+
+class NodeTypeConfig:
+    """The resolved views of a node type in a config snapshot."""
+
+    def __init__(self, config: Dict[str, Any], node_type: Optional[str]):
+        self._config = config
+        self.node_type = node_type
+        self._lock = threading.Lock()
+        self._values: Dict[Any, Any] = {}
+
+    def _resolve(self, key, resolve_fn):
+        value = self._values.get(key, _UNRESOLVED)
+        if value is _UNRESOLVED:
+            with self._lock:
+                value = self._values.get(key, _UNRESOLVED)
+                if value is _UNRESOLVED:
+                    value = resolve_fn()
+                    self._values[key] = value
+        return value
+
+    def _invalidate(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    @property
+    def node_type_config(self) -> Optional[Dict[str, Any]]:
+        return _get_node_type_config(self._config, self.node_type)
+
+    @property
+    def node_config(self) -> Dict[str, Any]:
+        node_type_config = self.node_type_config
+        if node_type_config is None:
+            return {}
+        return node_type_config["node_config"]
+
+    @property
+    def resources(self) -> Dict[str, Any]:
+        node_type_config = self.node_type_config
+        if node_type_config is None:
+            return {}
+        return node_type_config.get("resources", {})
+
+    @property
+    def launch_hash(self) -> str:
+        return self._resolve(
+            "launch_hash",
+            lambda: hash_launch_conf(self.node_config, self._config["auth"]))
+
+    @property
+    def docker_config(self) -> Dict[str, Any]:
+        return self._resolve(
+            "docker_config",
+            lambda: _get_node_type_specific_docker_config(
+                self._config, self.node_type))
+
+    @property
+    def runtime_config(self) -> Optional[Dict[str, Any]]:
+        return self._resolve(
+            "runtime_config",
+            lambda: _get_node_type_specific_runtime_config(
+                self._config, self.node_type))
+
+    def get_commands(self, command_key: str) -> Any:
+        return self._resolve(
+            ("commands", command_key),
+            lambda: _get_node_type_specific_commands(
+                self._config, self.node_type, command_key))
+
+
+class ConfigSnapshot:
+    """An applied cluster config with the resolved views of its node types.
+
+    The snapshot is versioned by the hash of the config it is created from.
+    The views of a node type are resolved at the first access.
+    """
+
+    def __init__(self, config: Dict[str, Any], config_hash: Optional[str] = None):
+        self.config = config
+        self.config_hash = config_hash
+        self._lock = threading.Lock()
+        self._node_types: Dict[Optional[str], NodeTypeConfig] = {}
+        self._key_files_mtime = get_auth_key_files_mtime(config["auth"])
+
+    def get_node_type_config(self, node_type: Optional[str]) -> NodeTypeConfig:
+        node_type_config = self._node_types.get(node_type)
+        if node_type_config is None:
+            if node_type is not None and (
+                    node_type not in self.config["available_node_types"]):
+                raise ValueError(f"Unknown node type: {node_type}.")
+            with self._lock:
+                node_type_config = self._node_types.setdefault(
+                    node_type, NodeTypeConfig(self.config, node_type))
+        return node_type_config
+
+    def get_commands(self, node_type: Optional[str], command_key: str) -> Any:
+        return self.get_node_type_config(node_type).get_commands(command_key)
+
+    def get_docker_config(self, node_type: Optional[str]) -> Dict[str, Any]:
+        return self.get_node_type_config(node_type).docker_config
+
+    def get_runtime_config(self, node_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self.get_node_type_config(node_type).runtime_config
+
+    def get_resources(self, node_type: Optional[str]) -> Dict[str, Any]:
+        return self.get_node_type_config(node_type).resources
+
+    def get_launch_hash(self, node_type: Optional[str]) -> str:
+        return self.get_node_type_config(node_type).launch_hash
+
+    def check_key_files(self) -> bool:
+        """Invalidate the launch hashes if the SSH key files are modified.
+
+        Returns True if the launch hashes are invalidated.
+        """
+        key_files_mtime = get_auth_key_files_mtime(self.config["auth"])
+        if key_files_mtime == self._key_files_mtime:
+            return False
+        with self._lock:
+            self._key_files_mtime = key_files_mtime
+            node_type_configs = list(self._node_types.values())
+        for node_type_config in node_type_configs:
+            node_type_config._invalidate("launch_hash")
+        return True
@@ -1,4 +1,4 @@
-from typing import Any, Optional, Dict
+from typing import Optional
 import copy
 import logging
 import operator
@@ -10,8 +10,8 @@ from cloudtik.core.tags import (CLOUDTIK_TAG_LAUNCH_CONFIG, CLOUDTIK_TAG_NODE_ST
                                 CLOUDTIK_TAG_NODE_KIND, CLOUDTIK_TAG_NODE_NAME,
                                 CLOUDTIK_TAG_USER_NODE_TYPE, STATUS_UNINITIALIZED,
                                 NODE_KIND_WORKER)
+from cloudtik.core._private.cluster.config_snapshot import ConfigSnapshot
 from cloudtik.core._private.prometheus_metrics import ClusterPrometheusMetrics
-from cloudtik.core._private.utils import hash_launch_conf
 
 logger = logging.getLogger(__name__)
 
@@ -38,22 +38,21 @@ class NodeLauncher(threading.Thread):
         self.event_summarizer = event_summarizer
         super(NodeLauncher, self).__init__(*args, **kwargs)
 
-    def _launch_node(self, config: Dict[str, Any], count: int,
+    def _launch_node(self, config_snapshot: ConfigSnapshot, count: int,
                      node_type: Optional[str]):
         if self.node_types:
             assert node_type, node_type
 
-        launch_config = {}
-        if node_type:
-            launch_config.update(
-                config["available_node_types"][node_type]["node_config"])
-        resources = copy.deepcopy(
-            config["available_node_types"][node_type]["resources"])
-        launch_hash = hash_launch_conf(launch_config, config["auth"])
+        # The views of the snapshot are shared and must not be modified
+        node_type_config = config_snapshot.get_node_type_config(node_type)
+        launch_config = node_type_config.node_config
+        resources = node_type_config.resources
+        launch_hash = node_type_config.launch_hash
         self.log("Launching {} nodes, type {}.".format(count, node_type))
         node_config = {}
         node_tags = {
-            CLOUDTIK_TAG_NODE_NAME: "cloudtik-{}-worker".format(config["cluster_name"]),
+            CLOUDTIK_TAG_NODE_NAME: "cloudtik-{}-worker".format(
+                config_snapshot.config["cluster_name"]),
             CLOUDTIK_TAG_NODE_KIND: NODE_KIND_WORKER,
             CLOUDTIK_TAG_NODE_STATUS: STATUS_UNINITIALIZED,
             CLOUDTIK_TAG_LAUNCH_CONFIG: launch_hash,
@@ -64,7 +63,8 @@ class NodeLauncher(threading.Thread):
         # TODO: this logic is duplicated in cluster_operator.py (keep in sync)
         if node_type:
             node_tags[CLOUDTIK_TAG_USER_NODE_TYPE] = node_type
-            node_config.update(launch_config)
+            # The providers may modify the node config of a launch
+            node_config.update(copy.deepcopy(launch_config))
         launch_start_time = time.time()
         self.provider.create_node_with_resources(node_config, node_tags, count,
                                                  resources)
@@ -79,10 +79,10 @@ class NodeLauncher(threading.Thread):
 
     def run(self):
         while True:
-            config, count, node_type = self.queue.get()
+            config_snapshot, count, node_type = self.queue.get()
             self.log("Got {} nodes to launch.".format(count))
             try:
-                self._launch_node(config, count, node_type)
+                self._launch_node(config_snapshot, count, node_type)
             except Exception:
                 self.prometheus_metrics.node_launch_exceptions.inc()
                 self.prometheus_metrics.failed_create_nodes.inc(count)
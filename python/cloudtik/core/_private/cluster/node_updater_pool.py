@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import logging
+import threading
+from typing import Dict, List, Set, Tuple
+
+from cloudtik.core._private.constants import CLOUDTIK_MAX_CONCURRENT_UPDATES
+
+logger = logging.getLogger(__name__)
+
+# The lower value runs first
+UPDATE_PRIORITY_RECOVERY = 0
+UPDATE_PRIORITY_SETUP = 1
+
+
+class NodeUpdaterPool:
+    """Run the node updater threads with a limit of concurrent updates.
+
+    The updaters exceeding the limit are queued and started as the running
+    updaters finish. The updaters for recovering nodes are started before
+    the updaters for setting up new or out-of-date nodes. The updaters of
+    the same priority are started in the order of submission.
+    """
+
+    def __init__(self,
+                 max_concurrent_updates: int = CLOUDTIK_MAX_CONCURRENT_UPDATES):
+        self.max_concurrent_updates = max(max_concurrent_updates, 1)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # heap of (priority, seq, node_id)
+        self._queue: List[Tuple[int, int, str]] = []
+        # node_id -> (seq, updater) of the latest submission of the node
+        self._queued: Dict[str, Tuple[int, threading.Thread]] = {}
+        self._running: Set[str] = set()
+
+    @property
+    def num_queued(self) -> int:
+        return len(self._queued)
+
+    @property
+    def num_running(self) -> int:
+        return len(self._running)
+
+    def is_queued(self, node_id: str) -> bool:
+        """Whether the updater of the node is queued.
+
+        An updater being started is not queued and not alive yet. The
+        updaters are started with the lock held, so the check waits for
+        the updater to be alive.
+        """
+        with self._lock:
+            return node_id in self._queued
+
+    def submit(self, updater) -> None:
+        """Queue the updater and start it when there is a free slot."""
+        priority = (UPDATE_PRIORITY_RECOVERY if updater.for_recovery
+                    else UPDATE_PRIORITY_SETUP)
+        with self._lock:
+            seq = next(self._seq)
+            heapq.heappush(self._queue, (priority, seq, updater.node_id))
+            self._queued[updater.node_id] = (seq, updater)
+        self._start_queued()
+
+    def cancel(self, node_id: str) -> bool:
+        """Remove the updater of the node if it is still queued."""
+        with self._lock:
+            # The heap entry is skipped when it is popped
+            return self._queued.pop(node_id, None) is not None
+
+    def _start_queued(self):
+        with self._lock:
+            while self._queue and len(self._running) < self.max_concurrent_updates:
+                _, seq, node_id = heapq.heappop(self._queue)
+                queued = self._queued.get(node_id)
+                if queued is None or queued[0] != seq:
+                    # cancelled or submitted again after it
+                    continue
+                _, updater = self._queued.pop(node_id)
+                self._running.add(node_id)
+                self._start(updater)
+
+    def _start(self, updater):
+        # Called with the lock held
+        run = updater.run
+
+        def run_and_release():
+            try:
+                run()
+            finally:
+                self._release(updater.node_id)
+
+        updater.run = run_and_release
+        try:
+            updater.start()
+        except Exception:
+            self._running.discard(updater.node_id)
+            logger.exception(
+                "Failed to start the updater of node {}.".format(updater.node_id))
+
+    def _release(self, node_id):
+        with self._lock:
+            self._running.discard(node_id)
+        self._start_queued()
@@ -0,0 +1,253 @@
+"""Vectorized bin packing of resource demands.
+
+The resource names are mapped to column indices so that the node resources
+and the resource demands are held as dense float arrays. The resource
+demands are packed as (bundle, count) pairs of identical bundles. The number
+of copies of a bundle that fit each node is computed with a single array
+division, so the time is proportional to the number of distinct bundles
+instead of the total number of bundles.
+
+The results are the same as the pure Python implementation in
+resource_demand_scheduler, which is kept as the reference, if the resource
+amounts are exact in float arithmetic (see is_exact). Subtracting the other
+fractions such as 0.1 one by one accumulates rounding errors which a single
+division doesn't, so they are left to the Python implementation.
+"""
+
+from numbers import Real
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cloudtik.core._private.constants import CLOUDTIK_CONSERVE_GPU_NODES
+
+ResourceDict = Dict[str, Real]
+
+# e.g., [({"CPU": 1}, 10)].
+ResourceDemandCounts = List[Tuple[ResourceDict, int]]
+
+# The amounts which are multiples of 1 / 2 ** EXACT_FRACTION_BITS and less
+# than EXACT_MAX_AMOUNT are added, subtracted and multiplied by the counts
+# without rounding errors.
+EXACT_FRACTION_BITS = 10
+EXACT_MAX_AMOUNT = 2 ** 40
+
+
+class ResourceIndex:
+    """Map the resource names to the column indices of the dense arrays."""
+
+    def __init__(self, *resources_lists: List[ResourceDict]):
+        self.columns: Dict[str, int] = {}
+        for resources_list in resources_lists:
+            for resources in resources_list:
+                for k in resources:
+                    if k not in self.columns:
+                        self.columns[k] = len(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def to_array(self, resources_list: List[ResourceDict]) -> np.ndarray:
+        """The resources as a dense array. Missing resources are 0."""
+        array = np.zeros((len(resources_list), len(self.columns)))
+        for i, resources in enumerate(resources_list):
+            for k, v in resources.items():
+                array[i, self.columns[k]] = v
+        return array
+
+    def to_mask(self, resources_list: List[ResourceDict]) -> np.ndarray:
+        """Whether each resource is present in the resources."""
+        mask = np.zeros((len(resources_list), len(self.columns)), dtype=bool)
+        for i, resources in enumerate(resources_list):
+            for k in resources:
+                mask[i, self.columns[k]] = True
+        return mask
+
+    def to_dict(self, row: np.ndarray,
+                template: ResourceDict) -> ResourceDict:
+        """Convert an array row to a dict with the keys of the template."""
+        resources = {}
+        for k, v in template.items():
+            value = float(row[self.columns[k]])
+            if isinstance(v, int) and value.is_integer():
+                value = int(value)
+            resources[k] = value
+        return resources
+
+
+def is_exact(resources_list: List[ResourceDict]) -> bool:
+    """Whether the float arithmetic of all the resource amounts is exact."""
+    for resources in resources_list:
+        for v in resources.values():
+            if abs(v) >= EXACT_MAX_AMOUNT or not float(
+                    v * (1 << EXACT_FRACTION_BITS)).is_integer():
+                return False
+    return True
+
+
+def _demand_sort_key(demand: ResourceDict):
+    # More complex demands first.
+    # Break ties: heavier demands first.
+    # Break ties: lexicographically (to ensure stable ordering).
+    return (len(demand.values()),
+            sum(demand.values()),
+            sorted(demand.items()))
+
+
+def _fit_capacity(nodes: np.ndarray, amounts: np.ndarray,
+                  present: np.ndarray) -> np.ndarray:
+    """The number of copies of a bundle that fit each of the nodes.
+
+    For the exact amounts (see is_exact), the quotient is never rounded up
+    to the next integer, so the floor is the same as subtracting the copies
+    one by one.
+
+    A resource of the bundle with a non-positive amount is only checked
+    once as it doesn't limit the number of copies.
+    """
+    positive = amounts > 0
+    checked = present & ~positive
+    capacity = np.full(len(nodes), np.inf)
+    if positive.any():
+        capacity = np.floor(np.min(
+            nodes[:, positive] / amounts[positive], axis=1))
+        capacity = np.maximum(capacity, 0)
+    if checked.any():
+        fits = np.all(nodes[:, checked] >= amounts[checked], axis=1)
+        capacity[~fits] = 0
+    return capacity
+
+
+def _subtract(nodes: np.ndarray, rows: np.ndarray, counts: np.ndarray,
+              amounts: np.ndarray) -> None:
+    updated = nodes[rows] - counts[:, None] * amounts
+    # Don't go below zero for rounding errors of fractional resources
+    positive = amounts > 0
+    updated[:, positive] = np.maximum(updated[:, positive], 0)
+    nodes[rows] = updated
+
+
+def bin_pack_residual(node_resources: List[ResourceDict],
+                      resource_demands: ResourceDemandCounts,
+                      strict_spread: bool = False
+                      ) -> (ResourceDemandCounts, List[ResourceDict]):
+    """Vectorized version of get_bin_pack_residual for the resource
+    demands aggregated as (bundle, count) pairs.
+
+    Returns:
+        ResourceDemandCounts: the residual resources that do not fit.
+        List[ResourceDict]: The updated node_resources after the method.
+    """
+    sorted_demands = []
+    for bundle, count in sorted(
+            resource_demands, key=lambda demand: _demand_sort_key(demand[0]),
+            reverse=True):
+        # The identical bundles are next to each other after sorting
+        if sorted_demands and sorted_demands[-1][0] == bundle:
+            count += sorted_demands.pop()[1]
+        sorted_demands.append((bundle, count))
+    if not node_resources:
+        return sorted_demands, []
+
+    bundles = [bundle for bundle, _ in sorted_demands]
+    index = ResourceIndex(node_resources, bundles)
+    nodes = index.to_array(node_resources)
+    amounts = index.to_array(bundles)
+    present = index.to_mask(bundles)
+    # Same as the Python path, an empty node doesn't fulfill a demand
+    empty = np.array([not node for node in node_resources])
+    # Nodes which cannot be used again due to strict spread
+    available = np.ones(len(node_resources), dtype=bool)
+    used = []
+
+    unfulfilled = []
+    for i, (bundle, count) in enumerate(sorted_demands):
+        capacity = _fit_capacity(nodes, amounts[i], present[i])
+        if strict_spread:
+            # One copy on each of the first nodes that fit
+            rows = np.nonzero((capacity >= 1) & available)[0][:count]
+            available[rows] = False
+            used.extend(rows.tolist())
+            placed = np.ones(len(rows))
+        else:
+            # First fit fills the nodes in order
+            placed_before = np.concatenate(([0.0], np.cumsum(capacity)[:-1]))
+            placed = np.clip(count - placed_before, 0, capacity)
+            rows = np.nonzero(placed)[0]
+            placed = placed[rows]
+        rows_fulfilled = ~empty[rows]
+        _subtract(nodes, rows[rows_fulfilled], placed[rows_fulfilled],
+                  amounts[i])
+        num_unfulfilled = count - int(placed[rows_fulfilled].sum())
+        if num_unfulfilled > 0:
+            unfulfilled.append((bundle, num_unfulfilled))
+
+    node_indices = [
+        node_index for node_index in range(len(node_resources))
+        if available[node_index]] + used
+    return unfulfilled, [
+        index.to_dict(nodes[node_index], node_resources[node_index])
+        for node_index in node_indices]
+
+
+def utilization_scores(node_resources_list: List[ResourceDict],
+                       resources: ResourceDemandCounts
+                       ) -> List[Optional[Tuple[int, float, float]]]:
+    """Vectorized version of _utilization_score for a list of node resources
+    and the resource demands aggregated as (bundle, count) pairs.
+
+    Returns:
+        The utilization score of each node resources in the list.
+    """
+    if not node_resources_list:
+        return []
+
+    bundles = [bundle for bundle, _ in resources]
+    any_gpu_task = any("GPU" in r for r in bundles)
+    resource_types = set()
+    for r in bundles:
+        for k, v in r.items():
+            if v > 0:
+                resource_types.add(k)
+
+    index = ResourceIndex(node_resources_list, bundles)
+    remaining = index.to_array(node_resources_list)
+    fittable = np.zeros(len(node_resources_list), dtype=bool)
+    if bundles:
+        amounts = index.to_array(bundles)
+        present = index.to_mask(bundles)
+        for i, (_, count) in enumerate(resources):
+            capacity = _fit_capacity(remaining, amounts[i], present[i])
+            placed = np.minimum(capacity, count)
+            rows = np.nonzero(placed)[0]
+            _subtract(remaining, rows, placed[rows], amounts[i])
+            fittable[rows] = True
+
+    scores = []
+    for i, node_resources in enumerate(node_resources_list):
+        is_gpu_node = "GPU" in node_resources and node_resources["GPU"] > 0
+        # Avoid launching GPU nodes if there aren't any GPU tasks at all.
+        if CLOUDTIK_CONSERVE_GPU_NODES and is_gpu_node and not any_gpu_task:
+            scores.append(None)
+            continue
+        if not fittable[i]:
+            scores.append(None)
+            continue
+
+        util_by_resources = []
+        num_matching_resource_types = 0
+        for k, v in node_resources.items():
+            # Don't divide by zero.
+            if v < 1:
+                continue
+            if k in resource_types:
+                num_matching_resource_types += 1
+            util = (v - float(remaining[i, index.columns[k]])) / v
+            util_by_resources.append(v * (util**3))
+
+        if not util_by_resources:
+            scores.append(None)
+            continue
+        scores.append((num_matching_resource_types, min(util_by_resources),
+                       np.mean(util_by_resources)))
+    return scores
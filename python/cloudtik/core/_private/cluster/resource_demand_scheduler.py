@@ -18,7 +18,10 @@ from typing import Optional
 from typing import Tuple
 
 from cloudtik.core.node_provider import NodeProvider
-from cloudtik.core._private.constants import CLOUDTIK_CONSERVE_GPU_NODES, to_memory_units
+from cloudtik.core._private.cluster.resource_bin_packing import bin_pack_residual, utilization_scores, \
+    ResourceDemandCounts, is_exact
+from cloudtik.core._private.constants import CLOUDTIK_CONSERVE_GPU_NODES, to_memory_units, \
+    CLOUDTIK_VECTORIZED_BIN_PACKING
 from cloudtik.core.tags import (
     CLOUDTIK_TAG_USER_NODE_TYPE, NODE_KIND_UNMANAGED,
     NODE_KIND_WORKER, CLOUDTIK_TAG_NODE_KIND, NODE_KIND_HEAD)
@@ -136,6 +139,11 @@ class ResourceDemandScheduler:
         # But we use the node types static memory information here
         # self._update_node_resources_from_runtime(nodes, max_resources_by_ip)
 
+        # Schedule the identical resource bundles together
+        resource_demand_counts = aggregate_resource_demands(resource_demands)
+        min_cluster_size_counts = aggregate_resource_demands(
+            ensure_min_cluster_size)
+
         node_resources: List[ResourceDict]
         node_type_counts: Dict[NodeType, int]
         node_resources, node_type_counts = self.calculate_node_resources(
@@ -152,21 +160,22 @@ class ResourceDemandScheduler:
          adjusted_min_workers) = \
             _add_min_workers_nodes(
                 node_resources, node_type_counts, self.node_types,
-                self.max_workers, self.head_node_type, ensure_min_cluster_size)
+                self.max_workers, self.head_node_type, min_cluster_size_counts)
 
         # Add 1 to account for the head node.
         max_to_add = self.max_workers + 1 - sum(node_type_counts.values())
 
         # Step 3/4: add nodes for pending tasks
-        unfulfilled, _ = get_bin_pack_residual(node_resources,
-                                               resource_demands)
+        unfulfilled, _ = _get_bin_pack_residual_of_counts(
+            node_resources, resource_demand_counts)
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("Resource demands: {}".format(resource_demands))
+            logger.debug("Resource demands: {}".format(resource_demand_counts))
             logger.debug("Unfulfilled demands: {}".format(unfulfilled))
 
-        nodes_to_add_based_on_demand, final_unfulfilled = get_nodes_for(
+        nodes_to_add_based_on_demand, final_unfulfilled = _get_nodes_for_counts(
             self.node_types, node_type_counts, self.head_node_type, max_to_add,
             unfulfilled)
+        final_unfulfilled = expand_resource_demands(final_unfulfilled)
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug("Final unfulfilled: {}".format(final_unfulfilled))
@@ -421,7 +430,7 @@ def _add_min_workers_nodes(
         node_resources: List[ResourceDict],
         node_type_counts: Dict[NodeType, int],
         node_types: Dict[NodeType, NodeTypeConfigDict], max_workers: int,
-        head_node_type: NodeType, ensure_min_cluster_size: List[ResourceDict]
+        head_node_type: NodeType, ensure_min_cluster_size: ResourceDemandCounts
 ) -> (List[ResourceDict], Dict[NodeType, int], Dict[NodeType, int]):
     """Updates resource demands to respect the min_workers and
     request_resources() constraints.
@@ -431,7 +440,8 @@ def _add_min_workers_nodes(
         node_type_counts: Counts of existing nodes already launched/pending.
         node_types: Node types config.
         max_workers: global max_workers constaint.
-        ensure_min_cluster_size: resource demands from request_resources().
+        ensure_min_cluster_size: resource demands from request_resources()
+            aggregated as (bundle, count) pairs.
 
     Returns:
         node_resources: The updated node resources after adding min_workers
@@ -467,10 +477,10 @@ def _add_min_workers_nodes(
                 for _ in range(node_type_counts[node_type])
             ])
         # Get the unfulfilled to ensure min cluster size.
-        resource_requests_unfulfilled, _ = get_bin_pack_residual(
+        resource_requests_unfulfilled, _ = _get_bin_pack_residual_of_counts(
             max_node_resources, ensure_min_cluster_size)
         # Get the nodes to meet the unfulfilled.
-        nodes_to_add_request_resources, _ = get_nodes_for(
+        nodes_to_add_request_resources, _ = _get_nodes_for_counts(
             node_types, node_type_counts, head_node_type, max_to_add,
             resource_requests_unfulfilled)
         # Update the resources, counts and total nodes to add.
@@ -490,6 +500,33 @@ def _add_min_workers_nodes(
     return node_resources, node_type_counts, total_nodes_to_add_dict
 
 
+def aggregate_resource_demands(
+        resource_demands: Optional[List[ResourceDict]]
+) -> ResourceDemandCounts:
+    """Collapse the runs of identical resource bundles to (bundle, count)
+    pairs. The order of the bundles is kept so that scheduling the pairs
+    has the same results as scheduling the bundles one by one."""
+    demand_counts = []
+    for demand in resource_demands or []:
+        if demand_counts and demand_counts[-1][0] == demand:
+            bundle, count = demand_counts[-1]
+            demand_counts[-1] = (bundle, count + 1)
+        else:
+            demand_counts.append((demand, 1))
+    return demand_counts
+
+
+def expand_resource_demands(
+        resource_demands: ResourceDemandCounts) -> List[ResourceDict]:
+    """Expand the (bundle, count) pairs to a list of resource bundles."""
+    return [bundle for bundle, count in resource_demands
+            for _ in range(count)]
+
+
+def _count_resource_demands(resource_demands: ResourceDemandCounts) -> int:
+    return sum(count for _, count in resource_demands)
+
+
 def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
                   existing_nodes: Dict[NodeType, int],
                   head_node_type: NodeType,
@@ -512,10 +549,25 @@ def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
         Dict of count to add for each node type, and residual of resources
         that still cannot be fulfilled.
     """
+    nodes_to_add, residual = _get_nodes_for_counts(
+        node_types, existing_nodes, head_node_type, max_to_add,
+        aggregate_resource_demands(resources), strict_spread)
+    return nodes_to_add, expand_resource_demands(residual)
+
+
+def _get_nodes_for_counts(node_types: Dict[NodeType, NodeTypeConfigDict],
+                          existing_nodes: Dict[NodeType, int],
+                          head_node_type: NodeType,
+                          max_to_add: int,
+                          resources: ResourceDemandCounts,
+                          strict_spread: bool = False
+                          ) -> (Dict[NodeType, int], ResourceDemandCounts):
+    """Same as get_nodes_for with the resource demands aggregated as
+    (bundle, count) pairs."""
     nodes_to_add = collections.defaultdict(int)
 
     while resources and sum(nodes_to_add.values()) < max_to_add:
-        utilization_scores = []
+        candidate_node_types = []
         for node_type in node_types:
             max_workers_of_node_type = node_types[node_type].get(
                 "max_workers", 0)
@@ -528,39 +580,68 @@ def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
                     logger.debug(f"Will not launch node of {node_type} type as it already "
                                  f"exceeds the max number ({max_workers_of_node_type})")
                 continue
-            node_resources = node_types[node_type]["resources"]
-            if strict_spread:
-                # If handling strict spread, only one bundle can be placed on
-                # the node.
-                score = _utilization_score(node_resources, [resources[0]])
-            else:
-                score = _utilization_score(node_resources, resources)
-            if score is not None:
-                utilization_scores.append((score, node_type))
+            candidate_node_types.append(node_type)
+
+        if strict_spread:
+            # If handling strict spread, only one bundle can be placed on
+            # the node.
+            resources_to_score = [(resources[0][0], 1)]
+        else:
+            resources_to_score = resources
+        scores = _get_utilization_scores(
+            [node_types[node_type]["resources"]
+             for node_type in candidate_node_types], resources_to_score)
+        node_type_scores = [
+            (score, node_type)
+            for score, node_type in zip(scores, candidate_node_types)
+            if score is not None]
 
         # Give up, no feasible node.
-        if not utilization_scores:
+        if not node_type_scores:
             logger.warning(
                 f"The scaler could not find a node type to satisfy the "
                 f"request: {resources}. "
             )
             break
 
-        utilization_scores = sorted(utilization_scores, reverse=True)
-        best_node_type = utilization_scores[0][1]
+        node_type_scores = sorted(node_type_scores, reverse=True)
+        best_node_type = node_type_scores[0][1]
         nodes_to_add[best_node_type] += 1
         if strict_spread:
-            resources = resources[1:]
+            bundle, count = resources[0]
+            if count > 1:
+                resources = [(bundle, count - 1)] + resources[1:]
+            else:
+                resources = resources[1:]
         else:
             allocated_resource = node_types[best_node_type]["resources"]
-            residual, _ = get_bin_pack_residual([allocated_resource],
-                                                resources)
-            assert len(residual) < len(resources), (resources, residual)
+            residual, _ = _get_bin_pack_residual_of_counts(
+                [allocated_resource], resources)
+            assert _count_resource_demands(residual) < _count_resource_demands(
+                resources), (resources, residual)
             resources = residual
 
     return nodes_to_add, resources
 
 
+def _is_vectorized_bin_packing(node_resources: List[ResourceDict],
+                               resources: ResourceDemandCounts) -> bool:
+    # The vectorized bin packing has the same results only if the float
+    # arithmetic of the resource amounts is exact
+    return CLOUDTIK_VECTORIZED_BIN_PACKING and is_exact(
+        node_resources) and is_exact([bundle for bundle, _ in resources])
+
+
+def _get_utilization_scores(node_resources_list: List[ResourceDict],
+                            resources: ResourceDemandCounts
+                            ) -> List[Optional[float]]:
+    if _is_vectorized_bin_packing(node_resources_list, resources):
+        return utilization_scores(node_resources_list, resources)
+    resources = expand_resource_demands(resources)
+    return [_utilization_score(node_resources, resources)
+            for node_resources in node_resources_list]
+
+
 def _utilization_score(node_resources: ResourceDict,
                        resources: List[ResourceDict]) -> Optional[float]:
     remaining = copy.deepcopy(node_resources)
@@ -626,7 +707,32 @@ def get_bin_pack_residual(node_resources: List[ResourceDict],
         List[ResourceDict]: the residual list resources that do not fit.
         List[ResourceDict]: The updated node_resources after the method.
     """
+    unfulfilled, nodes = _get_bin_pack_residual_of_counts(
+        node_resources, aggregate_resource_demands(resource_demands),
+        strict_spread)
+    return expand_resource_demands(unfulfilled), nodes
 
+
+def _get_bin_pack_residual_of_counts(
+        node_resources: List[ResourceDict],
+        resource_demands: ResourceDemandCounts,
+        strict_spread: bool = False
+) -> (ResourceDemandCounts, List[ResourceDict]):
+    """Same as get_bin_pack_residual with the resource demands aggregated
+    as (bundle, count) pairs."""
+    if _is_vectorized_bin_packing(node_resources, resource_demands):
+        return bin_pack_residual(
+            node_resources, resource_demands, strict_spread)
+    unfulfilled, nodes = _get_bin_pack_residual(
+        node_resources, expand_resource_demands(resource_demands),
+        strict_spread)
+    return aggregate_resource_demands(unfulfilled), nodes
+
+
+def _get_bin_pack_residual(node_resources: List[ResourceDict],
+                           resource_demands: List[ResourceDict],
+                           strict_spread: bool = False
+                           ) -> (List[ResourceDict], List[ResourceDict]):
     unfulfilled = []
 
     # A most naive bin packing algorithm.
@@ -0,0 +1,253 @@
+"""Profiling of the cluster scaler update loop.
+
+The time of each phase of a scaler update, the calls to the node provider
+API and the Redis calls made during an update are exported as Prometheus
+metrics. Optionally, each update is profiled with cProfile and the profiles
+of the slowest updates are kept in the logs directory.
+"""
+
+import cProfile
+import functools
+import heapq
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cloudtik.core._private.constants import CLOUDTIK_SCALER_PROFILE, \
+    CLOUDTIK_SCALER_PROFILE_SLOWEST_TICKS
+from cloudtik.core._private.log_timer import LogTimer
+from cloudtik.core._private.prometheus_metrics import ClusterPrometheusMetrics
+from cloudtik.core.node_provider import NodeProvider
+
+logger = logging.getLogger(__name__)
+
+SCALER_PROFILES_DIR = "scaler_profiles"
+
+# The node provider methods called by the cluster scaler
+PROVIDER_API_METHODS = [
+    "non_terminated_nodes",
+    "is_running",
+    "is_terminated",
+    "node_tags",
+    "external_ip",
+    "internal_ip",
+    "create_node",
+    "create_node_with_resources",
+    "set_node_tags",
+    "terminate_node",
+    "terminate_nodes",
+]
+
+
+class RedisCallCounter:
+    """Count the Redis calls made through the Redis clients of the scaler.
+
+    The methods are wrapped on the client instances so that the calls made
+    through other clients of the process are not counted. A pipeline is
+    counted as a single call as it is a single round trip.
+
+    Args:
+        get_redis_clients: Return the Redis clients to count the calls of.
+            The clients connected later are counted from the next tick.
+    """
+
+    def __init__(self, get_redis_clients: Callable[[], List]):
+        self._get_redis_clients = get_redis_clients
+        self._lock = threading.Lock()
+        self._count = 0
+
+    @property
+    def count(self):
+        return self._count
+
+    def increment(self):
+        with self._lock:
+            self._count += 1
+
+    def instrument(self):
+        """Wrap the Redis clients which are not counted yet."""
+        for redis_client in self._get_redis_clients():
+            if getattr(redis_client, "_call_counter", None) is self:
+                continue
+            redis_client.execute_command = self._counted(
+                redis_client.execute_command)
+            redis_client.pipeline = self._counted_pipeline(
+                redis_client.pipeline)
+            redis_client._call_counter = self
+
+    def _counted(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.increment()
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _counted_pipeline(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            pipeline = func(*args, **kwargs)
+            pipeline.execute = self._counted(pipeline.execute)
+            return pipeline
+        return wrapper
+
+
+class PhaseTimer(LogTimer):
+    def __init__(self, profiler: "ScalerProfiler", phase: str):
+        super().__init__("Cluster Controller: {}".format(phase))
+        self._profiler = profiler
+        self._phase = phase
+
+    def __exit__(self, *error_vals):
+        super().__exit__(*error_vals)
+        self._profiler.record_phase(self._phase, self.elapsed_s)
+
+
+class ScalerProfiler:
+    """Record the time of the scaler update phases and the calls made to
+    the node provider and Redis for each update (tick).
+
+    Args:
+        prometheus_metrics: The metrics to export the timings to.
+        profile_dir: The directory to write the profiles of the slowest
+            ticks to. The ticks are not profiled if it is None.
+        slowest_ticks: The number of slowest tick profiles to keep.
+        redis_call_counter: The counter of the Redis calls. The Redis
+            calls are not counted if it is None.
+    """
+
+    def __init__(self,
+                 prometheus_metrics: Optional[ClusterPrometheusMetrics] = None,
+                 profile_dir: Optional[str] = None,
+                 slowest_ticks: int = CLOUDTIK_SCALER_PROFILE_SLOWEST_TICKS,
+                 redis_call_counter: Optional[RedisCallCounter] = None):
+        self.prometheus_metrics = prometheus_metrics or ClusterPrometheusMetrics()
+        self.profile_dir = profile_dir
+        self.slowest_ticks = slowest_ticks
+        self.redis_call_counter = redis_call_counter
+        self.phase_times: Dict[str, float] = {}
+        # The provider calls are made from the node launcher threads too
+        self._provider_calls_lock = threading.Lock()
+        self.provider_calls: Dict[str, int] = {}
+        self.redis_calls: Optional[int] = None
+        self.num_ticks = 0
+        # Min heap of the (duration, path) of the profiles kept
+        self._slowest_profiles: List[Tuple[float, str]] = []
+
+    @staticmethod
+    def from_logs_dir(prometheus_metrics: ClusterPrometheusMetrics,
+                      logs_dir: Optional[str],
+                      redis_call_counter: Optional[RedisCallCounter] = None
+                      ) -> "ScalerProfiler":
+        profile_dir = None
+        if CLOUDTIK_SCALER_PROFILE and logs_dir:
+            profile_dir = os.path.join(logs_dir, SCALER_PROFILES_DIR)
+        return ScalerProfiler(prometheus_metrics, profile_dir=profile_dir,
+                              redis_call_counter=redis_call_counter)
+
+    @contextmanager
+    def tick(self):
+        """Time a scaler update and profile it if enabled."""
+        self.num_ticks += 1
+        self.phase_times = {}
+        with self._provider_calls_lock:
+            self.provider_calls = {}
+        redis_calls_start = None
+        if self.redis_call_counter is not None:
+            self.redis_call_counter.instrument()
+            redis_calls_start = self.redis_call_counter.count
+        profile = None
+        if self.profile_dir and self.slowest_ticks > 0:
+            profile = cProfile.Profile()
+            profile.enable()
+        start_time = time.perf_counter()
+        try:
+            yield self
+        finally:
+            duration = time.perf_counter() - start_time
+            if profile is not None:
+                profile.disable()
+            if redis_calls_start is not None:
+                self.redis_calls = (
+                    self.redis_call_counter.count - redis_calls_start)
+                self.prometheus_metrics.update_redis_calls.set(
+                    self.redis_calls)
+            logger.debug("Cluster Controller: Update took {:.3f}s: "
+                         "phases={}, provider calls={}, redis calls={}".format(
+                             duration, self.phase_times_string(),
+                             self.provider_calls, self.redis_calls))
+            if profile is not None:
+                self._keep_profile(profile, duration)
+
+    def phase(self, phase: str) -> PhaseTimer:
+        """Time a phase of the scaler update."""
+        return PhaseTimer(self, phase)
+
+    def record_phase(self, phase: str, elapsed_s: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + elapsed_s
+        self.prometheus_metrics.update_phase_time.labels(
+            phase=phase).observe(elapsed_s)
+
+    def phase_times_string(self) -> str:
+        return ", ".join(
+            "{}={:.3f}s".format(phase, elapsed_s)
+            for phase, elapsed_s in self.phase_times.items())
+
+    def instrument_provider(self, provider: NodeProvider):
+        """Count and time the calls to the node provider API methods.
+
+        The methods are wrapped on the provider instance so that the
+        provider keeps its own type.
+        """
+        if getattr(provider, "_profiler_instrumented", False):
+            return
+        for method in PROVIDER_API_METHODS:
+            func = getattr(provider, method, None)
+            if func is None:
+                continue
+            setattr(provider, method, self._timed_provider_call(method, func))
+        provider._profiler_instrumented = True
+
+    def _timed_provider_call(self, method, func):
+        calls = self.prometheus_metrics.provider_calls.labels(method=method)
+        call_time = self.prometheus_metrics.provider_call_time.labels(
+            method=method)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls.inc()
+                call_time.observe(time.perf_counter() - start_time)
+                with self._provider_calls_lock:
+                    self.provider_calls[method] = self.provider_calls.get(
+                        method, 0) + 1
+        return wrapper
+
+    def _keep_profile(self, profile: cProfile.Profile, duration: float):
+        if len(self._slowest_profiles) >= self.slowest_ticks and (
+                duration <= self._slowest_profiles[0][0]):
+            return
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profile_path = os.path.join(
+                self.profile_dir, "scaler-update-{}-{}-{:.3f}s.prof".format(
+                    time.strftime("%Y%m%d-%H%M%S"), self.num_ticks, duration))
+            profile.dump_stats(profile_path)
+        except Exception as e:
+            logger.warning(
+                "Cluster Controller: Failed to write the update profile: "
+                "{}".format(e))
+            return
+
+        heapq.heappush(self._slowest_profiles, (duration, profile_path))
+        if len(self._slowest_profiles) > self.slowest_ticks:
+            _, evicted_path = heapq.heappop(self._slowest_profiles)
+            try:
+                os.remove(evicted_path)
+            except OSError:
+                pass
@@ -9,6 +9,7 @@ import logging
 import os
 import subprocess
 import sys
+import threading
 import time
 import warnings
 
@@ -18,7 +19,8 @@ from cloudtik.core._private.constants import \
     CLOUDTIK_DEFAULT_SHARED_MEMORY_MAX_BYTES, \
     CLOUDTIK_DEFAULT_SHARED_MEMORY_PROPORTION, \
     CLOUDTIK_NODE_START_WAIT_S, \
-    CLOUDTIK_DATA_DISK_MOUNT_POINT, PRIVACY_REPLACEMENT, PRIVACY_REPLACEMENT_TEMPLATE
+    CLOUDTIK_DATA_DISK_MOUNT_POINT, PRIVACY_REPLACEMENT, PRIVACY_REPLACEMENT_TEMPLATE, \
+    CLOUDTIK_SSH_CONTROL_MASTER_CHECK_INTERVAL_S
 from cloudtik.core._private.docker import check_bind_mounts_cmd, \
                                   check_docker_running_cmd, \
                                   check_docker_image, \
@@ -376,6 +378,138 @@ class SSHOptions:
         ]
 
 
+class SSHControlMasterPool:
+    """Keep a persistent SSH ControlMaster connection to each node.
+
+    The commands and rsyncs to a node use ControlMaster=auto with the same
+    ControlPath, so they open a channel on the pooled master connection
+    instead of doing a new SSH handshake. With the pool enabled, the
+    commands keep the master they start in the background with
+    ControlPersist=yes. The master of a node is taken into the pool after
+    the first successful command to the node, checked at most every check
+    interval and started by the pool if it is gone. A node failing to
+    start the master is not tried again within the check interval. The
+    masters of the nodes which are terminated are closed by pruning the
+    pool with the active node ips.
+    """
+
+    def __init__(self,
+                 check_interval_s: int = CLOUDTIK_SSH_CONTROL_MASTER_CHECK_INTERVAL_S):
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        # ip -> the connection info of the master
+        self._masters = {}
+        # ip -> the time of the last failure to start the master
+        self._failed_times = {}
+        self._ip_locks = {}
+
+    def _get_ip_lock(self, ip):
+        with self._lock:
+            if ip not in self._ip_locks:
+                self._ip_locks[ip] = threading.Lock()
+            return self._ip_locks[ip]
+
+    @property
+    def ips(self) -> List[str]:
+        return list(self._masters)
+
+    def connect(self, executor: "SSHCommandExecutor", timeout=60) -> bool:
+        """Make sure the master connection to the node of the executor is
+        alive. Return False if the master connection cannot be started,
+        in which case the commands fall back to their own connections."""
+        ip = executor.ssh_ip
+        with self._get_ip_lock(ip):
+            master = self._masters.get(ip)
+            now = time.time()
+            if master is not None:
+                if now - master["last_check_time"] < self.check_interval_s:
+                    return True
+            elif now - self._failed_times.get(
+                    ip, -self.check_interval_s) < self.check_interval_s:
+                return False
+            else:
+                master = {
+                    "ssh_options": SSHOptions(
+                        executor.call_context,
+                        executor.ssh_private_key,
+                        executor.ssh_control_path,
+                        ProxyCommand=executor.ssh_proxy_command,
+                        ControlMaster="yes",
+                        ControlPersist="yes"),
+                    "target": "{}@{}".format(executor.ssh_user, ip),
+                    "process_runner": executor.process_runner,
+                }
+
+            # The master is usually the one started by the last command
+            if not self._control(master, "check"):
+                logger.debug(
+                    "No SSH control master to {}. Starting.".format(ip))
+                # The master stays in the background after the command exits
+                if not self._run(master, [], ["exit 0"], timeout=timeout):
+                    self._masters.pop(ip, None)
+                    self._failed_times[ip] = now
+                    return False
+            master["last_check_time"] = now
+            self._masters[ip] = master
+            self._failed_times.pop(ip, None)
+            return True
+
+    def close(self, ip: str) -> None:
+        with self._get_ip_lock(ip):
+            master = self._masters.pop(ip, None)
+            if master is not None:
+                self._control(master, "exit")
+            self._failed_times.pop(ip, None)
+        with self._lock:
+            self._ip_locks.pop(ip, None)
+
+    def prune(self, active_ips) -> None:
+        """Close the masters to the nodes which are no longer active."""
+        active_ips = set(active_ips)
+        for ip in self.ips + list(self._failed_times):
+            if ip not in active_ips:
+                self.close(ip)
+
+    def close_all(self) -> None:
+        for ip in self.ips:
+            self.close(ip)
+
+    def _control(self, master, command) -> bool:
+        return self._run(master, ["-O", command], [])
+
+    @staticmethod
+    def _run(master, ssh_args, remote_cmd, timeout=60) -> bool:
+        final_cmd = ["ssh"] + ssh_args + master[
+            "ssh_options"].to_ssh_options_list(timeout=timeout) + [
+            master["target"]] + remote_cmd
+        try:
+            # Don't let the background master hold the output pipes
+            master["process_runner"].check_call(
+                final_cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL)
+            return True
+        except Exception:
+            return False
+
+
+_ssh_control_master_pool = None
+
+
+def enable_ssh_control_master_pool() -> SSHControlMasterPool:
+    """Share a ControlMaster connection to each node among the SSH
+    command executors of this process."""
+    global _ssh_control_master_pool
+    if _ssh_control_master_pool is None:
+        _ssh_control_master_pool = SSHControlMasterPool()
+    return _ssh_control_master_pool
+
+
+def get_ssh_control_master_pool():
+    return _ssh_control_master_pool
+
+
 class SSHCommandExecutor(CommandExecutor):
     def __init__(self, call_context, log_prefix, node_id, provider, auth_config,
                  cluster_name, process_runner, use_internal_ip):
@@ -397,11 +531,16 @@ class SSHCommandExecutor(CommandExecutor):
         self.ssh_control_path = ssh_control_path
         self.ssh_ip = None
         self.ssh_proxy_command = auth_config.get("ssh_proxy_command", None)
+        ssh_options_kwargs = {}
+        if get_ssh_control_master_pool() is not None:
+            # Keep the master started by a command for the pool
+            ssh_options_kwargs["ControlPersist"] = "yes"
         self.ssh_options = SSHOptions(
             self.call_context,
             self.ssh_private_key,
             self.ssh_control_path,
-            ProxyCommand=self.ssh_proxy_command)
+            ProxyCommand=self.ssh_proxy_command,
+            **ssh_options_kwargs)
 
     def _get_node_ip(self):
         if self.use_internal_ip:
@@ -455,6 +594,13 @@ class SSHCommandExecutor(CommandExecutor):
         except OSError as e:
             self.cli_logger.warning("{}", str(e))  # todo: msg
 
+    def _connect_control_master(self, timeout):
+        # Called after a successful command so that the commands probing
+        # a node which is not ready don't wait for starting the master
+        control_master_pool = get_ssh_control_master_pool()
+        if control_master_pool is not None:
+            control_master_pool.connect(self, timeout=timeout)
+
     def _run_helper(self,
                     final_cmd,
                     with_output=False,
@@ -594,13 +740,16 @@ class SSHCommandExecutor(CommandExecutor):
 
         if self.cli_logger.verbosity > 0:
             with self.cli_logger.indented():
-                return self._run_helper(
+                result = self._run_helper(
                     final_cmd, with_output, exit_on_fail,
                     silent=silent, cmd_to_print=final_cmd_to_print)
         else:
-            return self._run_helper(
+            result = self._run_helper(
                 final_cmd, with_output, exit_on_fail,
                 silent=silent, cmd_to_print=final_cmd_to_print)
+        if ssh_options is self.ssh_options:
+            self._connect_control_master(timeout)
+        return result
 
     def _create_rsync_filter_args(self, options):
         rsync_excludes = options.get("rsync_exclude") or []
@@ -634,6 +783,7 @@ class SSHCommandExecutor(CommandExecutor):
         ]
         self.cli_logger.verbose("Running `{}`", cf.bold(" ".join(command)))
         self._run_helper(command, silent=self.call_context.is_rsync_silent())
+        self._connect_control_master(timeout=120)
 
     def run_rsync_down(self, source, target, options=None):
         self._set_ssh_ip_if_required()
@@ -651,6 +801,7 @@ class SSHCommandExecutor(CommandExecutor):
         ]
         self.cli_logger.verbose("Running `{}`", cf.bold(" ".join(command)))
         self._run_helper(command, silent=self.call_context.is_rsync_silent())
+        self._connect_control_master(timeout=120)
 
     def remote_shell_command_str(self):
         self._set_ssh_ip_if_required()
@@ -745,9 +896,7 @@ class DockerCommandExecutor(CommandExecutor):
             cmd_to_print=None,
             silent=False
     ):
-        if run_env == "auto":
-            run_env = "host" if (not bool(cmd) or cmd.find(
-                self.docker_cmd) == 0) else self.docker_cmd
+        run_env = self.resolve_run_env(cmd, run_env)
 
         if environment_variables:
             cmd, cmd_to_print = _with_environment_variables(
@@ -777,6 +926,12 @@ class DockerCommandExecutor(CommandExecutor):
             cmd_to_print=cmd_to_print,
             silent=silent)
 
+    def resolve_run_env(self, cmd, run_env):
+        if run_env == "auto":
+            run_env = "host" if (not bool(cmd) or cmd.find(
+                self.docker_cmd) == 0) else self.docker_cmd
+        return run_env
+
     def run_rsync_up(self, source, target, options=None):
         options = options or {}
         host_destination = os.path.join(
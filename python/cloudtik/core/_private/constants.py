@@ -45,6 +45,9 @@ CLOUDTIK_RESOURCES_ENV = "CLOUDTIK_OVERRIDE_RESOURCES"
 # Env name for user templates directory
 CLOUDTIK_USER_TEMPLATES = "CLOUDTIK_USER_TEMPLATES"
 
+# Whether to cache the parsed templates in the temp directory
+CLOUDTIK_TEMPLATE_CACHE = env_bool("CLOUDTIK_TEMPLATE_CACHE", True)
+
 LOGGER_FORMAT = (
     "%(asctime)s\t%(levelname)s %(filename)s:%(lineno)s -- %(message)s")
 LOGGER_FORMAT_HELP = f"The logging format. default='{LOGGER_FORMAT}'"
@@ -107,12 +110,24 @@ def to_memory_units(memory_bytes, round_up):
 # Whether to avoid launching GPU nodes for CPU only tasks.
 CLOUDTIK_CONSERVE_GPU_NODES = env_integer("CLOUDTIK_CONSERVE_GPU_NODES", 1)
 
+# Whether to use the NumPy arrays based implementation for bin packing
+# the resource demands onto the nodes.
+CLOUDTIK_VECTORIZED_BIN_PACKING = env_bool("CLOUDTIK_VECTORIZED_BIN_PACKING", True)
+
 # How long to wait for a node to start, in seconds.
 CLOUDTIK_NODE_START_WAIT_S = env_integer("CLOUDTIK_NODE_START_WAIT_S", 900)
 
 # Interval at which to check if node SSH became available.
 CLOUDTIK_NODE_SSH_INTERVAL_S = env_integer("CLOUDTIK_NODE_SSH_INTERVAL_S", 5)
 
+# Whether the cluster controller keeps a persistent SSH ControlMaster
+# connection to each node shared by all the commands and rsyncs to the node
+CLOUDTIK_SSH_CONTROL_MASTER_POOL = env_bool(
+    "CLOUDTIK_SSH_CONTROL_MASTER_POOL", True)
+# Interval to check whether a pooled ControlMaster connection is alive
+CLOUDTIK_SSH_CONTROL_MASTER_CHECK_INTERVAL_S = env_integer(
+    "CLOUDTIK_SSH_CONTROL_MASTER_CHECK_INTERVAL_S", 30)
+
 # Abort autoscaling if more than this number of errors are encountered. This
 # is a safety feature to prevent e.g. runaway node launches.
 CLOUDTIK_MAX_NUM_FAILURES = env_integer("CLOUDTIK_MAX_NUM_FAILURES", 5)
@@ -126,9 +141,19 @@ CLOUDTIK_MAX_LAUNCH_BATCH = env_integer("CLOUDTIK_MAX_LAUNCH_BATCH", 5)
 CLOUDTIK_MAX_CONCURRENT_LAUNCHES = env_integer(
     "CLOUDTIK_MAX_CONCURRENT_LAUNCHES", 10)
 
+# Max number of node updaters running at a time.
+CLOUDTIK_MAX_CONCURRENT_UPDATES = env_integer(
+    "CLOUDTIK_MAX_CONCURRENT_UPDATES", 50)
+
 # Interval at which to perform autoscaling updates.
 CLOUDTIK_UPDATE_INTERVAL_S = env_integer("CLOUDTIK_UPDATE_INTERVAL_S", 5)
 
+# Whether to profile each cluster scaler update with cProfile and
+# keep the profiles of the slowest updates in the logs directory
+CLOUDTIK_SCALER_PROFILE = env_bool("CLOUDTIK_SCALER_PROFILE", False)
+CLOUDTIK_SCALER_PROFILE_SLOWEST_TICKS = env_integer(
+    "CLOUDTIK_SCALER_PROFILE_SLOWEST_TICKS", 5)
+
 # We will attempt to restart on nodes it hasn't heard from
 # in more than this interval.
 CLOUDTIK_HEARTBEAT_TIMEOUT_S = env_integer("CLOUDTIK_HEARTBEAT_TIMEOUT_S", 30)
@@ -138,6 +163,30 @@ CLOUDTIK_NODE_RESOURCE_STATE_TIMEOUT_S = env_integer("CLOUDTIK_NODE_RESOURCE_STA
 
 CLOUDTIK_HEARTBEAT_PERIOD_SECONDS = env_integer("CLOUDTIK_HEARTBEAT_PERIOD_SECONDS", 1)
 
+# The interval to write the node info again even if it is not changed
+CLOUDTIK_NODE_INFO_REFRESH_S = env_integer("CLOUDTIK_NODE_INFO_REFRESH_S", 60)
+
+# The interval to read all the heartbeats from the state table for the
+# heartbeats may be missed from the heartbeat channel
+CLOUDTIK_HEARTBEAT_RECONCILE_INTERVAL_S = env_integer(
+    "CLOUDTIK_HEARTBEAT_RECONCILE_INTERVAL_S", 15)
+
+# The storage mode of the state tables. With "hash", each table is stored as
+# a Redis hash on each shard with a change version for incremental reads.
+# With "key", each table row is stored as a separate Redis key.
+CLOUDTIK_STATE_TABLE_STORAGE_HASH = "hash"
+CLOUDTIK_STATE_TABLE_STORAGE_KEY = "key"
+CLOUDTIK_STATE_TABLE_STORAGE = os.environ.get(
+    "CLOUDTIK_STATE_TABLE_STORAGE", CLOUDTIK_STATE_TABLE_STORAGE_HASH)
+
+# The number of table versions for which the changes are retained for
+# incremental reads. A reader falling further behind will do a full read.
+CLOUDTIK_STATE_TABLE_CHANGES_RETAINED = env_integer(
+    "CLOUDTIK_STATE_TABLE_CHANGES_RETAINED", 100000)
+
+# Whether to access the Redis shards concurrently for reading a table
+CLOUDTIK_STATE_CONCURRENT_SHARDS = env_bool("CLOUDTIK_STATE_CONCURRENT_SHARDS", True)
+
 # The maximum number of nodes (including failed nodes) that the cluster scaler will
 # track for logging purposes.
 CLOUDTIK_MAX_NODES_TRACKED = 1500
@@ -159,6 +208,9 @@ CLOUDTIK_RESOURCE_REQUEST_CHANNEL = b"cloudtik_resource_request"
 # `services.py:wait_for_redis_to_start`.
 CLOUDTIK_START_REDIS_WAIT_RETRIES = env_integer("CLOUDTIK_START_REDIS_WAIT_RETRIES", 16)
 
+# The environments to run a command on a node
+RUN_ENV_TYPES = ["auto", "host", "docker"]
+
 CLOUDTIK_PROCESSES = [
     # The first element is the substring to filter.
     # The second element, if True, is to filter ps results by command name
@@ -211,6 +263,9 @@ LOG_MONITOR_MAX_OPEN_FILES = 200
 
 LOG_FILE_CHANNEL = "CLOUDKIT_LOG_CHANNEL"
 
+# The channel to which the nodes publish their heartbeats
+CLOUDTIK_HEARTBEAT_CHANNEL = "CLOUDTIK_HEARTBEAT_CHANNEL"
+
 DEFAULT_PROXY_PORT = 6000
 
 # The mount point path of the data disks on both host and container
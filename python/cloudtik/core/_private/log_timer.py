@@ -10,15 +10,18 @@ class LogTimer:
     def __init__(self, message, show_status=False):
         self._message = message
         self._show_status = show_status
+        self.elapsed_s = None
 
     def __enter__(self):
         self._start_time = datetime.datetime.utcnow()
+        return self
 
     def __exit__(self, *error_vals):
+        td = datetime.datetime.utcnow() - self._start_time
+        self.elapsed_s = td.total_seconds()
         if cli_logger.log_style != "record":
             return
 
-        td = datetime.datetime.utcnow() - self._start_time
         status = ""
         if self._show_status:
             status = "failed" if any(error_vals) else "succeeded"
@@ -8,7 +8,8 @@ from threading import Thread
 
 from cloudtik.core._private.utils import with_runtime_environment_variables, with_node_ip_environment_variables, \
     _get_cluster_uri, _is_use_internal_ip, get_node_type
-from cloudtik.core.command_executor import get_cmd_to_print
+from cloudtik.core.command_executor import get_cmd_to_print, CommandBatchError, \
+    COMMAND_RUN_DEFAULT_RETRY_DELAY_S
 from cloudtik.core.tags import CLOUDTIK_TAG_NODE_STATUS, CLOUDTIK_TAG_RUNTIME_CONFIG, \
     CLOUDTIK_TAG_FILE_MOUNTS_CONTENTS, \
     STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED, STATUS_WAITING_FOR_SSH, \
@@ -481,6 +482,19 @@ class NodeUpdater:
         with LogTimer(
                 self.log_prefix + "Initialization commands",
                 show_status=True):
+            if self._is_batch_commands():
+                cmds = [cmd for command_group in self.initialization_commands
+                        for cmd in command_group.get("commands", [])]
+                self._execute_command_callbacks(
+                    CreateClusterEvent.run_initialization_cmd, cmds)
+                # Run outside docker.
+                self._exec_batched_commands(
+                    cmds, runtime_envs, run_env="host",
+                    failure_message="Initialization command failed.",
+                    ssh_options_override_ssh_key=self.auth_config.get("ssh_private_key"),
+                    number_of_retries=self.config.get("number_of_retries"))
+                return
+
             for command_group in self.initialization_commands:
                 commands = command_group.get("commands", [])
                 for cmd in commands:
@@ -524,6 +538,22 @@ class NodeUpdater:
                 self.log_prefix + "Setup commands",
                 show_status=True):
 
+            if self._is_batch_commands():
+                cmds = self._print_batched_commands(
+                    "Setting up: {}", self.setup_commands)
+                number_of_retries = 1
+                if self.config.get("retry_setup_command", True):
+                    number_of_retries = self.config.get(
+                        "number_of_retries", SETUP_COMMAND_DEFAULT_NUMBER_OF_RETRIES)
+                self._execute_command_callbacks(
+                    CreateClusterEvent.run_setup_cmd, cmds)
+                # Runs in the container if docker is in use
+                self._exec_batched_commands(
+                    cmds, runtime_envs, run_env="auto",
+                    failure_message="Setup command failed.",
+                    number_of_retries=number_of_retries)
+                return
+
             total = len(self.setup_commands)
             for i, command_group in enumerate(self.setup_commands):
                 command_group_name = command_group.get("group_name", "")
@@ -570,22 +600,36 @@ class NodeUpdater:
             {"node_id": self.node_id})
         with LogTimer(
                 self.log_prefix + "Start commands", show_status=True):
-            total = len(self.start_commands)
-            for i, command_group in enumerate(self.start_commands):
-                command_group_name = command_group.get("group_name", "")
-                with self.cli_logger.group(
-                        "Starting: {}",
-                        command_group_name,
-                        _numbered=("()", i + 1, total)):
-                    commands = command_group.get("commands", [])
-                    for cmd in commands:
-                        self._exec_start_command(cmd, runtime_envs)
+            if self._is_batch_commands():
+                cmds = self._print_batched_commands(
+                    "Starting: {}", self.start_commands)
+                old_redirected = self.call_context.is_output_redirected()
+                self.call_context.set_output_redirected(False)
+                try:
+                    # Runs in the container if docker is in use
+                    self._exec_batched_commands(
+                        cmds, self._get_start_environment_variables(runtime_envs),
+                        run_env="auto",
+                        failure_message="Start command failed.")
+                finally:
+                    self.call_context.set_output_redirected(old_redirected)
+            else:
+                total = len(self.start_commands)
+                for i, command_group in enumerate(self.start_commands):
+                    command_group_name = command_group.get("group_name", "")
+                    with self.cli_logger.group(
+                            "Starting: {}",
+                            command_group_name,
+                            _numbered=("()", i + 1, total)):
+                        commands = command_group.get("commands", [])
+                        for cmd in commands:
+                            self._exec_start_command(cmd, runtime_envs)
         global_event_system.execute_callback(
             self.cluster_uri,
             CreateClusterEvent.start_cloudtik_runtime_completed,
             {"node_id": self.node_id})
 
-    def _exec_start_command(self, cmd, runtime_envs):
+    def _get_start_environment_variables(self, runtime_envs):
         # Add a resource override env variable if needed:
         if self.provider_type == "local":
             # Local NodeProvider doesn't need resource override.
@@ -597,6 +641,10 @@ class NodeUpdater:
         else:
             env_vars = {}
         env_vars.update(runtime_envs)
+        return env_vars
+
+    def _exec_start_command(self, cmd, runtime_envs):
+        env_vars = self._get_start_environment_variables(runtime_envs)
 
         cmd_to_print = self.get_cmd_to_print(cmd)
         self.cli_logger.print("- {}", cmd_to_print)
@@ -617,6 +665,68 @@ class NodeUpdater:
 
             raise click.ClickException("Start command failed.")
 
+    def _is_batch_commands(self):
+        return self.config.get("batch_commands", False)
+
+    def _print_batched_commands(self, group_message, command_groups):
+        cmds = []
+        total = len(command_groups)
+        for i, command_group in enumerate(command_groups):
+            command_group_name = command_group.get("group_name", "")
+            with self.cli_logger.group(
+                    group_message,
+                    command_group_name,
+                    _numbered=("()", i + 1, total)):
+                for cmd in command_group.get("commands", []):
+                    self.cli_logger.print("- {}", self.get_cmd_to_print(cmd))
+                    cmds.append(cmd)
+        return cmds
+
+    def _execute_command_callbacks(self, event, cmds):
+        # The commands in a batch run together, so the callbacks of
+        # the commands are executed before running the batch
+        for cmd in cmds:
+            global_event_system.execute_callback(
+                self.cluster_uri, event,
+                {"node_id": self.node_id, "command": cmd})
+
+    def _exec_batched_commands(self, cmds, envs, run_env, failure_message,
+                               ssh_options_override_ssh_key="",
+                               number_of_retries=None, retry_interval=None):
+        """Run the commands in a batch. A failed batch is retried from
+        the failed command."""
+        retries = number_of_retries if number_of_retries is not None else 1
+        if retry_interval is None:
+            retry_interval = self.config.get(
+                "retry_interval", COMMAND_RUN_DEFAULT_RETRY_DELAY_S)
+        start_index = 0
+        while True:
+            try:
+                self.cmd_executor.run_batch(
+                    cmds[start_index:],
+                    environment_variables=envs,
+                    run_env=run_env,
+                    ssh_options_override_ssh_key=ssh_options_override_ssh_key,
+                    start_index=start_index)
+                return
+            except CommandBatchError as e:
+                failed_index = e.failed_index
+                if failed_index is not None:
+                    self.cli_logger.error(
+                        "Failed: {} (exit status {})",
+                        self.get_cmd_to_print(cmds[failed_index]),
+                        e.statuses[-1].exit_code)
+                    start_index = failed_index
+                else:
+                    self.cli_logger.error("Failed: {}", str(e))
+                retries -= 1
+                if retries <= 0:
+                    self.cli_logger.error("See above for stderr.")
+                    raise click.ClickException(failure_message) from None
+                self.cli_logger.warning(
+                    "Retrying the failed commands in {} seconds.", retry_interval)
+                time.sleep(retry_interval)
+
     def exec_commands(self, action_name, commands, envs):
         with LogTimer(
                 self.log_prefix + "Exec commands", show_status=True):
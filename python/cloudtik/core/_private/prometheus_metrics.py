@@ -55,6 +55,41 @@ try:
                 namespace="cloudtik",
                 registry=self.registry,
                 buckets=update_time_buckets)
+            # Buckets: .001 seconds to 1000 seconds.
+            # Used for the time of the update phases and provider calls.
+            phase_time_buckets = [.001, .01, .1, 1, 10, 100, 1000]
+            self.update_phase_time: Histogram = Histogram(
+                "update_phase_time",
+                "Scaler update phase time. This is the time for each phase "
+                "of a scaler update iteration to complete.",
+                labelnames=("phase",),
+                unit="seconds",
+                namespace="cloudtik",
+                registry=self.registry,
+                buckets=phase_time_buckets)
+            self.provider_calls: Counter = Counter(
+                "provider_calls",
+                "Number of calls made to the node provider API.",
+                labelnames=("method",),
+                unit="calls",
+                namespace="cloudtik",
+                registry=self.registry)
+            self.provider_call_time: Histogram = Histogram(
+                "provider_call_time",
+                "Node provider API call time. This is the time it takes for "
+                "a call to a node provider method to return.",
+                labelnames=("method",),
+                unit="seconds",
+                namespace="cloudtik",
+                registry=self.registry,
+                buckets=phase_time_buckets)
+            self.update_redis_calls: Gauge = Gauge(
+                "update_redis_calls",
+                "Number of Redis calls made by the controller during the "
+                "last scaler update iteration.",
+                unit="calls",
+                namespace="cloudtik",
+                registry=self.registry)
             self.pending_nodes: Gauge = Gauge(
                 "pending_nodes",
                 "Number of nodes pending to be started.",
@@ -79,6 +114,12 @@ try:
                 unit="nodes",
                 namespace="cloudtik",
                 registry=self.registry)
+            self.queued_updating_nodes: Gauge = Gauge(
+                "queued_updating_nodes",
+                "Number of nodes waiting for a free slot to update.",
+                unit="nodes",
+                namespace="cloudtik",
+                registry=self.registry)
             self.recovering_nodes: Gauge = Gauge(
                 "recovering_nodes",
                 "Number of nodes in the process of recovering.",
@@ -163,9 +204,12 @@ except ImportError:
         def observe(self, value):
             pass
 
-        def inc(self):
+        def inc(self, amount=1):
             pass
 
+        def labels(self, *args, **kwargs):
+            return self
+
     class ClusterPrometheusMetrics(object):
         def __getattr__(self, attr):
             return NullMetric()
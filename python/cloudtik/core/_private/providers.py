@@ -4,10 +4,9 @@ import json
 import os
 from typing import Any, Dict
 
-import yaml
-
 from cloudtik.core._private.concurrent_cache import ConcurrentObjectCache
 from cloudtik.core._private.core_utils import _load_class
+from cloudtik.core._private.template_cache import load_template_file
 
 logger = logging.getLogger(__name__)
 
@@ -292,8 +291,7 @@ def _get_default_config(provider_config):
         raise NotImplementedError("Unsupported node provider: {}".format(
             provider_config["type"]))
     path_to_default = load_config()
-    with open(path_to_default) as f:
-        defaults = yaml.safe_load(f) or {}
+    defaults = load_template_file(path_to_default) or {}
 
     return defaults
 
@@ -369,7 +367,6 @@ def _get_provider_config_object(provider_config, object_name: str):
             provider_config["type"]))
     path_to_home = load_config_home()
     path_to_config_file = os.path.join(path_to_home, object_name)
-    with open(path_to_config_file) as f:
-        config_object = yaml.safe_load(f) or {}
+    config_object = load_template_file(path_to_config_file) or {}
 
     return config_object
@@ -12,7 +12,8 @@ from typing import Optional
 
 from cloudtik.core._private.cluster.cluster_metrics_updater import ClusterMetricsUpdater
 from cloudtik.core._private.cluster.resource_scaling_policy import ResourceScalingPolicy
-from cloudtik.core._private.state.scaling_state import ScalingStateClient
+from cloudtik.core._private.cluster.scaler_profiler import ScalerProfiler, RedisCallCounter
+from cloudtik.core._private.state.scaling_state import ScalingStateClient, NodeHeartbeatSubscriber
 
 try:
     import prometheus_client
@@ -22,8 +23,10 @@ except ImportError:
 import cloudtik
 from cloudtik.core._private.cluster.cluster_scaler import ClusterScaler
 from cloudtik.core._private.cluster.cluster_operator import teardown_cluster
+from cloudtik.core._private.command_executor import enable_ssh_control_master_pool, \
+    get_ssh_control_master_pool
 from cloudtik.core._private.constants import CLOUDTIK_UPDATE_INTERVAL_S, \
-    CLOUDTIK_METRIC_PORT
+    CLOUDTIK_METRIC_PORT, CLOUDTIK_SSH_CONTROL_MASTER_POOL
 from cloudtik.core._private.cluster.event_summarizer import EventSummarizer
 from cloudtik.core._private.prometheus_metrics import ClusterPrometheusMetrics
 from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
@@ -54,9 +57,13 @@ class ClusterController:
                  redis_password=None,
                  controller_ip=None,
                  stop_event: Optional[Event] = None,
-                 retry_on_failure: bool = True):
+                 retry_on_failure: bool = True,
+                 logs_dir: Optional[str] = None):
 
         self.controller_ip = controller_ip
+        if CLOUDTIK_SSH_CONTROL_MASTER_POOL:
+            # Reuse one SSH connection to each node for all the updates
+            enable_ssh_control_master_pool()
         # Initialize the Redis clients.
         self.redis = services.create_redis_client(
             redis_address, password=redis_password)
@@ -90,10 +97,21 @@ class ClusterController:
         self.cluster_scaler = None
         self.resource_scaling_policy = ResourceScalingPolicy(
             self.head_ip, self.scaling_state_client)
+        # Heartbeats are pushed to the controller as they come with the
+        # periodical full read of the heartbeats as a fallback
+        self.heartbeat_subscriber = NodeHeartbeatSubscriber(self.redis)
+        self.heartbeat_subscriber.start()
         self.cluster_metrics_updater = ClusterMetricsUpdater(
-            self.cluster_metrics, self.event_summarizer, self.scaling_state_client)
+            self.cluster_metrics, self.event_summarizer, self.scaling_state_client,
+            heartbeat_subscriber=self.heartbeat_subscriber)
 
         self.prometheus_metrics = ClusterPrometheusMetrics()
+        # Count the Redis calls made by the controller for each update
+        redis_call_counter = RedisCallCounter(
+            lambda: [self.redis] + control_state.get_redis_clients())
+        self.scaler_profiler = ScalerProfiler.from_logs_dir(
+            self.prometheus_metrics, logs_dir,
+            redis_call_counter=redis_call_counter)
         if prometheus_client:
             try:
                 logger.info(
@@ -119,7 +137,8 @@ class ClusterController:
             cluster_metrics_updater=self.cluster_metrics_updater,
             resource_scaling_policy=self.resource_scaling_policy,
             event_summarizer=self.event_summarizer,
-            prometheus_metrics=self.prometheus_metrics)
+            prometheus_metrics=self.prometheus_metrics,
+            scaler_profiler=self.scaler_profiler)
 
     def _run(self):
         """Run the controller loop."""
@@ -215,6 +234,11 @@ class ClusterController:
         except Exception:
             self._handle_failure(traceback.format_exc())
             raise
+        finally:
+            # Don't leave the persistent SSH connections behind
+            control_master_pool = get_ssh_control_master_pool()
+            if control_master_pool is not None:
+                control_master_pool.close_all()
 
 
 if __name__ == "__main__":
@@ -308,6 +332,7 @@ if __name__ == "__main__":
         args.redis_address,
         cluster_scaling_config,
         redis_password=args.redis_password,
-        controller_ip=args.controller_ip)
+        controller_ip=args.controller_ip,
+        logs_dir=args.logs_dir)
 
     controller.run()
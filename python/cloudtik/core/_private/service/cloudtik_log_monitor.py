@@ -1,4 +1,5 @@
 import argparse
+import collections
 import errno
 import glob
 import json
@@ -7,9 +8,17 @@ import os
 import platform
 import re
 import shutil
+import threading
 import time
 import traceback
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
 import cloudtik.core._private.constants as constants
 import cloudtik.core._private.services as services
 import cloudtik.core._private.utils as utils
@@ -34,6 +43,25 @@ LOG_NAME_UPDATE_INTERVAL_S = float(
 # log monitor start giving backpressure to lower cpu usages.
 LOG_MONITOR_MANY_FILES_THRESHOLD = int(
     os.getenv("CLOUDTIK_LOG_MONITOR_MANY_FILES_THRESHOLD", 1000))
+# Whether to watch the logs directory for changes (with inotify on Linux)
+# instead of polling. Polling is used if watchdog is not available.
+LOG_MONITOR_WATCH = os.getenv(
+    "CLOUDTIK_LOG_MONITOR_WATCH", "1").lower() in ("1", "true")
+# When watching, the interval to rescan the logs directory and check the
+# files in case of missed events.
+LOG_MONITOR_RESCAN_INTERVAL_S = float(
+    os.getenv("CLOUDTIK_LOG_MONITOR_RESCAN_INTERVAL_S", 5))
+# The size of the buffer for reading the log files.
+LOG_MONITOR_READ_BUFFER_SIZE = int(
+    os.getenv("CLOUDTIK_LOG_MONITOR_READ_BUFFER_SIZE", 64 * 1024))
+# The max bytes to read from a file in one pass.
+LOG_MONITOR_MAX_READ_BYTES_PER_FILE = int(
+    os.getenv("CLOUDTIK_LOG_MONITOR_MAX_READ_BYTES_PER_FILE", 1024 * 1024))
+# The max bytes to read from all the files and publish in one pass.
+# Since the publish waits for Redis, this gives backpressure for reading
+# when the channel is slow.
+LOG_MONITOR_MAX_PUBLISH_BYTES = int(
+    os.getenv("CLOUDTIK_LOG_MONITOR_MAX_PUBLISH_BYTES", 8 * 1024 * 1024))
 
 
 class LogFileInfo:
@@ -58,6 +86,22 @@ class LogFileInfo:
         self.task_name = None
 
 
+class LogFileEventHandler(FileSystemEventHandler):
+    """Notify the log monitor of the changes in the logs directory."""
+
+    def __init__(self, log_monitor):
+        super().__init__()
+        self.log_monitor = log_monitor
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == "modified":
+            self.log_monitor.notify_file_changed(event.src_path)
+        elif event.event_type in ["created", "moved"]:
+            self.log_monitor.notify_files_updated()
+
+
 class LogMonitor:
     """A monitor process for monitoring log files.
 
@@ -76,6 +120,10 @@ class LogMonitor:
     4. Then we will loop through the open files and see if there are any new
        lines in the file. If so, we will publish them to Redis.
 
+    If the logs directory is watched, the monitor waits for the file events
+    instead of sleeping and polling. Only the closed files which are written
+    since they were closed are checked for new lines.
+
     Attributes:
         host (str): The hostname of this machine. Used to improve the log
             messages published to Redis.
@@ -103,6 +151,18 @@ class LogMonitor:
         self.open_file_infos = []
         self.closed_file_infos = []
         self.can_open_more_files = True
+        # The buffer reused for reading the files
+        self.read_buffer = bytearray(LOG_MONITOR_READ_BUFFER_SIZE)
+        self.read_view = memoryview(self.read_buffer)
+        # The index of the open file to start reading for next pass
+        self.next_file_index = 0
+
+        # The state updated by the watcher of the logs directory. The
+        # changed filenames is None if not watching.
+        self.changed_filenames = None
+        self.files_updated = True
+        self.wakeup_event = threading.Event()
+        self.watch_lock = threading.Lock()
 
     def close_all_files(self):
         """Close all open files (so that we can open more)."""
@@ -174,6 +234,9 @@ class LogMonitor:
                 is_err_file = file_path.endswith("err")
 
                 self.log_filenames.add(file_path)
+                if self.changed_filenames is not None:
+                    with self.watch_lock:
+                        self.changed_filenames.add(file_path)
                 self.closed_file_infos.append(
                     LogFileInfo(
                         filename=file_path,
@@ -199,14 +262,26 @@ class LogMonitor:
             self.close_all_files()
 
         files_with_no_updates = []
-        while len(self.closed_file_infos) > 0:
+        closed_file_infos = collections.deque(self.closed_file_infos)
+        self.closed_file_infos = []
+        while len(closed_file_infos) > 0:
             if (len(self.open_file_infos) >=
                     constants.LOG_MONITOR_MAX_OPEN_FILES):
                 self.can_open_more_files = False
                 break
 
-            file_info = self.closed_file_infos.pop(0)
+            file_info = closed_file_infos.popleft()
             assert file_info.file_handle is None
+            if self.changed_filenames is not None:
+                # Only the files written since closed or not read to the
+                # end may have new lines
+                with self.watch_lock:
+                    if (file_info.filename not in self.changed_filenames
+                            and file_info.file_position >=
+                            file_info.size_when_last_opened):
+                        files_with_no_updates.append(file_info)
+                        continue
+                    self.changed_filenames.discard(file_info.filename)
             # Get the file size to see if it has gotten bigger since we last
             # opened it.
             try:
@@ -220,11 +295,13 @@ class LogMonitor:
                     continue
                 raise e
 
-            # If some new lines have been added to this file, try to reopen the
-            # file.
-            if file_size > file_info.size_when_last_opened:
+            # If some lines of this file are not read yet, try to reopen the
+            # file. The lines may be left unread when the file was closed
+            # as the bytes to read for one pass are limited.
+            if file_size > file_info.file_position:
                 try:
-                    f = open(file_info.filename, "rb")
+                    # Unbuffered to read directly into the read buffer
+                    f = open(file_info.filename, "rb", buffering=0)
                 except (IOError, OSError) as e:
                     if e.errno == errno.ENOENT:
                         logger.warning(
@@ -236,27 +313,98 @@ class LogMonitor:
                         raise e
 
                 f.seek(file_info.file_position)
-                file_info.filesize_when_last_opened = file_size
+                file_info.size_when_last_opened = file_size
                 file_info.file_handle = f
                 self.open_file_infos.append(file_info)
             else:
                 files_with_no_updates.append(file_info)
 
         # Add the files with no changes back to the list of closed files.
+        self.closed_file_infos += closed_file_infos
         self.closed_file_infos += files_with_no_updates
 
+    def read_lines(self, file_info, max_bytes):
+        """Read the available lines of an open file in chunks.
+
+        The last line is returned even if it is not terminated by a new line
+        yet. A line longer than the read buffer is split into multiple lines.
+
+        Returns:
+            The lines read and the number of bytes read.
+        """
+        lines = []
+        bytes_read = 0
+        file_handle = file_info.file_handle
+        buffer_size = len(self.read_buffer)
+        while bytes_read < max_bytes:
+            try:
+                n = file_handle.readinto(self.read_buffer)
+            except Exception:
+                logger.error(
+                    f"Error: Reading file: {file_info.filename}, "
+                    f"position: {file_handle.tell()} failed.")
+                raise
+            if not n:
+                break
+            is_full = n == buffer_size
+            if is_full:
+                # A full buffer may end in the middle of a line (or
+                # a character). Leave the partial line for next read.
+                end = self.read_buffer.rfind(b"\n", 0, n) + 1
+                if 0 < end < n:
+                    file_handle.seek(end - n, os.SEEK_CUR)
+                    n = end
+            # Replace any characters not in UTF-8 with
+            # a replacement character, see
+            # https://stackoverflow.com/a/38565489/10891801
+            text = str(self.read_view[:n], "utf-8", "replace")
+            if text[-1] == "\n":
+                text = text[:-1]
+            lines.extend(text.split("\n"))
+            bytes_read += n
+            if not is_full:
+                # No more data available
+                break
+        return lines, bytes_read
+
     def check_log_files_and_publish_updates(self):
         """Get any changes to the log files and push updates to Redis.
 
+        The lines of all the files are published in one Redis pipeline.
+
         Returns:
             True if anything was published and false otherwise.
         """
-        anything_published = False
-        lines_to_publish = []
+        messages = []
+        total_bytes_read = 0
+
+        num_open_files = len(self.open_file_infos)
+        # Start from a different file each pass for fairness when the
+        # bytes to read for one pass is limited.
+        start_index = self.next_file_index % max(num_open_files, 1)
+        for i in range(num_open_files):
+            file_info = self.open_file_infos[
+                (start_index + i) % num_open_files]
+            assert not file_info.file_handle.closed
+
+            if total_bytes_read >= LOG_MONITOR_MAX_PUBLISH_BYTES:
+                self.next_file_index = start_index + i
+                break
+
+            lines_to_publish, bytes_read = self.read_lines(
+                file_info, min(LOG_MONITOR_MAX_READ_BYTES_PER_FILE,
+                               LOG_MONITOR_MAX_PUBLISH_BYTES - total_bytes_read))
+            total_bytes_read += bytes_read
+
+            # TODO (haifeng) : correct and add the processes we will have
+            if file_info.file_position == 0:
+                if "/cloudtik_node_controller" in file_info.filename:
+                    file_info.worker_pid = "cloudtik_node_controller"
+                elif "/cloudtik_cluster_controller" in file_info.filename:
+                    file_info.worker_pid = "cloudtik_cluster_controller"
 
-        def flush():
-            nonlocal lines_to_publish
-            nonlocal anything_published
+            # Record the current position in the file.
+            file_info.file_position = file_info.file_handle.tell()
             if len(lines_to_publish) > 0:
                 data = {
                     "ip": self.ip,
@@ -267,46 +415,48 @@ class LogMonitor:
                     "actor_name": file_info.actor_name,
                     "task_name": file_info.task_name,
                 }
-                self.redis_client.publish(constants.LOG_FILE_CHANNEL,
-                                          json.dumps(data))
-                anything_published = True
-                lines_to_publish = []
+                messages.append(json.dumps(data))
 
-        for file_info in self.open_file_infos:
-            assert not file_info.file_handle.closed
+        if not messages:
+            return False
 
-            max_num_lines_to_read = 100
-            for _ in range(max_num_lines_to_read):
-                try:
-                    next_line = file_info.file_handle.readline()
-                    # Replace any characters not in UTF-8 with
-                    # a replacement character, see
-                    # https://stackoverflow.com/a/38565489/10891801
-                    next_line = next_line.decode("utf-8", "replace")
-                    if next_line == "":
-                        break
-                    if next_line[-1] == "\n":
-                        next_line = next_line[:-1]
-                    lines_to_publish.append(next_line)
-                except Exception:
-                    logger.error(
-                        f"Error: Reading file: {file_info.filename}, "
-                        f"position: {file_info.file_info.file_handle.tell()} "
-                        "failed.")
-                    raise
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for message in messages:
+            pipeline.publish(constants.LOG_FILE_CHANNEL, message)
+        pipeline.execute()
+        return True
 
-            # TODO (haifeng) : correct and add the processes we will have
-            if file_info.file_position == 0:
-                if "/cloudtik_node_controller" in file_info.filename:
-                    file_info.worker_pid = "cloudtik_node_controller"
-                elif "/cloudtik_cluster_controller" in file_info.filename:
-                    file_info.worker_pid = "cloudtik_cluster_controller"
+    def notify_file_changed(self, filename):
+        with self.watch_lock:
+            self.changed_filenames.add(filename)
+        self.wakeup_event.set()
 
-            # Record the current position in the file.
-            file_info.file_position = file_info.file_handle.tell()
-            flush()
+    def notify_files_updated(self):
+        self.files_updated = True
+        self.wakeup_event.set()
+
+    def start_watching(self):
+        """Start watching the logs directory for changes.
 
-        return anything_published
+        Returns:
+            The observer watching the directory or None if watching is not
+            enabled or available.
+        """
+        if not LOG_MONITOR_WATCH or Observer is None:
+            return None
+        self.changed_filenames = set()
+        observer = Observer()
+        observer.schedule(
+            LogFileEventHandler(self), self.logs_dir, recursive=False)
+        observer.daemon = True
+        observer.start()
+        logger.info(f"Watching the logs directory {self.logs_dir} for changes")
+        return observer
+
+    def check_all_files_changed(self):
+        # Check all the files in case of missed events
+        with self.watch_lock:
+            self.changed_filenames.update(self.log_filenames)
 
     def run(self):
         """Run the log monitor.
@@ -314,6 +464,14 @@ class LogMonitor:
         This will query Redis once every second to check if there are new log
         files to monitor. It will also store those log files in Redis.
         """
+        observer = self.start_watching()
+        if observer is not None:
+            try:
+                self.run_watching()
+            finally:
+                observer.stop()
+            return
+
         total_log_files = 0
         last_updated = time.time()
         while True:
@@ -329,6 +487,24 @@ class LogMonitor:
             if not anything_published:
                 time.sleep(0.1)
 
+    def run_watching(self):
+        """Run the log monitor waking up on the changes of the log files."""
+        last_rescan = 0
+        while True:
+            self.wakeup_event.clear()
+            now = time.time()
+            if now - last_rescan > LOG_MONITOR_RESCAN_INTERVAL_S:
+                self.files_updated = True
+                self.check_all_files_changed()
+                last_rescan = now
+            if self.files_updated:
+                self.files_updated = False
+                self.update_log_filenames()
+            self.open_closed_files()
+            anything_published = self.check_log_files_and_publish_updates()
+            if not anything_published:
+                self.wakeup_event.wait(LOG_MONITOR_RESCAN_INTERVAL_S)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
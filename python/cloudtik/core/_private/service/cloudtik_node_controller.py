@@ -17,6 +17,7 @@ import cloudtik
 from cloudtik.core._private import constants, services
 from cloudtik.core._private.logging_utils import setup_component_logger
 from cloudtik.core._private.state.control_state import ControlState
+from cloudtik.core._private.state.state_codec import encode_heartbeat, encode_record
 from cloudtik.core._private.utils import get_runtime_processes, make_node_id
 
 logger = logging.getLogger(__name__)
@@ -59,6 +60,9 @@ class NodeController:
             "resource": self._parse_resource_list(),
         }
         self.old_processes = []
+        # The node info last written to the node table and when it is written
+        self.published_node_info = None
+        self.node_info_publish_time = 0
 
         # Can be used to signal graceful exit from controller loop.
         self.stop_event = stop_event  # type: Optional[Event]
@@ -66,6 +70,7 @@ class NodeController:
         self.control_state = ControlState()
         self.control_state.initialize_control_state(ip, port, redis_password)
         self.node_table = self.control_state.get_node_table()
+        self.node_heartbeat_table = self.control_state.get_node_heartbeat_table()
         self.processes_to_check = constants.CLOUDTIK_PROCESSES
         runtime_list = runtimes.split(",") if runtimes and len(runtimes) > 0 else None
         self.processes_to_check.extend(get_runtime_processes(runtime_list))
@@ -104,15 +109,32 @@ class NodeController:
         while True:
             time.sleep(constants.CLOUDTIK_HEARTBEAT_PERIOD_SECONDS)
             now = time.time()
-            node_info = self.node_info.copy()
-            node_info.update({"last_heartbeat_time": now})
-            node_info_as_json = json.dumps(node_info)
             try:
-                self.node_table.put(self.node_id, node_info_as_json)
+                self._publish_node_info(now)
+                self.node_heartbeat_table.put(
+                    self.node_id, encode_heartbeat(now))
+                # Push the heartbeat to the cluster controller
+                self.redis.publish(
+                    constants.CLOUDTIK_HEARTBEAT_CHANNEL,
+                    encode_record({
+                        "node_id": self.node_id,
+                        "node_ip": self.node_ip,
+                        "last_heartbeat_time": now}))
             except Exception as e:
                 logger.exception("Failed sending heartbeat: " + str(e))
                 logger.exception(traceback.format_exc())
 
+    def _publish_node_info(self, now):
+        # The node info is written only when it changes or needs a refresh,
+        # while the heartbeat carries only the heartbeat time
+        node_info = self.node_info.copy()
+        if (node_info == self.published_node_info and
+                now - self.node_info_publish_time < constants.CLOUDTIK_NODE_INFO_REFRESH_S):
+            return
+        self.node_table.put(self.node_id, json.dumps(node_info))
+        self.published_node_info = node_info
+        self.node_info_publish_time = now
+
     def _parse_resource_list(self):
         node_resource_dict = {}
         resource_split = self.static_resource_list.split(",")
@@ -131,13 +131,22 @@ class ControlStateAccessor:
         self.state_table_store = None
         self.connected = False
 
+    def get_redis_clients(self):
+        assert self.connected, "Control state accessor not connected"
+        return [redis_shard.get_redis_client()
+                for redis_shard in self.redis_shard_client.get_shards().values()]
+
     def get_node_table(self):
         assert self.connected, "Control state accessor not connected"
         return self.state_table_store.get_node_table()
 
-    def get_user_state_table(self, table_name):
+    def get_node_heartbeat_table(self):
+        assert self.connected, "Control state accessor not connected"
+        return self.state_table_store.get_node_heartbeat_table()
+
+    def get_user_state_table(self, table_name, binary=False):
         assert self.connected, "Control state accessor not connected"
-        return self.state_table_store.get_user_state_table(table_name)
+        return self.state_table_store.get_user_state_table(table_name, binary)
 
 
 class ControlState:
@@ -207,12 +216,24 @@ class ControlState:
                                                            self.redis_password)
         self.control_state_accessor.connect()
 
+    def get_redis_clients(self):
+        """Return the Redis clients of the control state which are connected.
+        The control state is not connected by this method."""
+        if self.control_state_accessor is None:
+            return []
+        return self.control_state_accessor.get_redis_clients()
+
     def get_node_table(self):
         self._check_connected()
         node_table = self.control_state_accessor.get_node_table()
         return node_table
 
-    def get_user_state_table(self, table_name):
+    def get_node_heartbeat_table(self):
+        self._check_connected()
+        node_heartbeat_table = self.control_state_accessor.get_node_heartbeat_table()
+        return node_heartbeat_table
+
+    def get_user_state_table(self, table_name, binary=False):
         self._check_connected()
-        state_table = self.control_state_accessor.get_user_state_table(table_name)
+        state_table = self.control_state_accessor.get_user_state_table(table_name, binary)
         return state_table
@@ -1,12 +1,79 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import redis
 import hashlib
+from six.moves import queue
+
+from cloudtik.core._private.constants import CLOUDTIK_STATE_CONCURRENT_SHARDS
 
 logger = logging.getLogger(__name__)
 
 
 TABLE_SEPERATOR = ":"
 
+# The prefixes of the keys for a table stored as hash on each shard
+TABLE_HASH_PREFIX = "@table"
+TABLE_VERSION_PREFIX = "@table_version"
+TABLE_CHANGES_PREFIX = "@table_changes"
+
+# Set the values of fields in a table hash and record the change version
+# KEYS: table hash key, table version key, table changes key
+# ARGV: number of versions to retain changes, field1, value1, field2, value2, ...
+TABLE_PUT_SCRIPT = """
+local version = redis.call('INCR', KEYS[2])
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    redis.call('ZADD', KEYS[3], version, ARGV[i])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', '(' .. (version - tonumber(ARGV[1])))
+return version
+"""
+
+# Delete fields in a table hash and record the change version
+# KEYS: table hash key, table version key, table changes key
+# ARGV: number of versions to retain changes, field1, field2, ...
+TABLE_DELETE_SCRIPT = """
+local version = redis.call('INCR', KEYS[2])
+for i = 2, #ARGV do
+    redis.call('HDEL', KEYS[1], ARGV[i])
+    redis.call('ZADD', KEYS[3], version, ARGV[i])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', '(' .. (version - tonumber(ARGV[1])))
+return version
+"""
+
+# The max number of fields to get with one HMGET in the scripts. The number
+# of values which can be unpacked as the arguments is limited by Lua stack.
+TABLE_SCRIPT_BATCH_SIZE = 1000
+
+# Get the changes of a table hash since a version
+# KEYS: table hash key, table version key, table changes key
+# ARGV: the version since which to get changes, number of versions retained for changes
+# Returns {version} if not changed, {version, 1, all_fields_and_values} for
+# a full read if the changes since the version are not available or
+# {version, 0, changed_fields, values} with false values for deleted fields
+TABLE_GET_CHANGES_SCRIPT = """
+local version = tonumber(redis.call('GET', KEYS[2]) or '0')
+local since = tonumber(ARGV[1])
+if since == version then
+    return {version}
+end
+if since < 0 or since > version or since < version - tonumber(ARGV[2]) then
+    return {version, 1, redis.call('HGETALL', KEYS[1])}
+end
+local fields = redis.call('ZRANGEBYSCORE', KEYS[3], '(' .. since, '+inf')
+local values = {}
+for i = 1, #fields, %d do
+    local batch = redis.call('HMGET', KEYS[1], unpack(fields, i, math.min(i + %d, #fields)))
+    for j = 1, #batch do
+        values[#values + 1] = batch[j]
+    end
+end
+return {version, 0, fields, values}
+""" % (TABLE_SCRIPT_BATCH_SIZE, TABLE_SCRIPT_BATCH_SIZE - 1)
+
 
 def generate_match_pattern(table_name):
     return table_name + TABLE_SEPERATOR + "*"
@@ -16,6 +83,13 @@ def generate_redis_key(table_name, key):
     return table_name + TABLE_SEPERATOR + key
 
 
+def generate_table_keys(table_name):
+    # The hash key, version key and changes key of a table
+    return [TABLE_HASH_PREFIX + TABLE_SEPERATOR + table_name,
+            TABLE_VERSION_PREFIX + TABLE_SEPERATOR + table_name,
+            TABLE_CHANGES_PREFIX + TABLE_SEPERATOR + table_name]
+
+
 def hash_redis_key(redis_key):
     md5 = hashlib.md5()
     if isinstance(redis_key, bytes):
@@ -31,17 +105,55 @@ def get_real_key(redis_key, table_name):
     return redis_key[pos:]
 
 
+def encode_value(value):
+    # The value can be either str or bytes
+    if isinstance(value, str):
+        return value.encode()
+    return value
+
+
+def _decode_hash_items(items):
+    # Decode a flat list of field and value pairs to a dict
+    return {items[i].decode("utf-8"): items[i + 1]
+            for i in range(0, len(items), 2)}
+
+
+class TableShardChanges:
+    """The changes of a table on one shard since a version.
+
+    If full is True, updated contains all the rows of the table on the
+    shard and deleted is empty.
+    """
+    def __init__(self, version, full, updated, deleted):
+        self.version = version
+        self.full = full
+        self.updated = updated
+        self.deleted = deleted
+
+
 # TODO: Implement operations on a specific redis shard
 class RedisShard:
     def __init__(self):
         self._redis_client = None
+        self._table_put_script = None
+        self._table_delete_script = None
+        self._table_get_changes_script = None
 
     def connect(self, redis_address, redis_port, redis_password):
         self._redis_client = redis.StrictRedis(
             host=redis_address, port=redis_port, password=redis_password)
+        self._table_put_script = self._redis_client.register_script(
+            TABLE_PUT_SCRIPT)
+        self._table_delete_script = self._redis_client.register_script(
+            TABLE_DELETE_SCRIPT)
+        self._table_get_changes_script = self._redis_client.register_script(
+            TABLE_GET_CHANGES_SCRIPT)
+
+    def get_redis_client(self):
+        return self._redis_client
 
     def put(self, key, value):
-        self._redis_client.set(key, value.encode())
+        self._redis_client.set(key, encode_value(value))
 
     def get(self, key):
         return self._redis_client.get(key)
@@ -49,6 +161,16 @@ class RedisShard:
     def delete(self, key):
         return self._redis_client.delete(key)
 
+    def put_many(self, key_values):
+        # Send all the sets to this shard in one round trip
+        pipeline = self._redis_client.pipeline(transaction=False)
+        for key, value in key_values.items():
+            pipeline.set(key, encode_value(value))
+        pipeline.execute()
+
+    def delete_many(self, keys):
+        return self._redis_client.delete(*keys)
+
     def mget(self, keys):
         return self._redis_client.mget(keys)
 
@@ -58,6 +180,63 @@ class RedisShard:
     def lrange(self, key, start=0, stop=-1):
         return self._redis_client.lrange(key, start, stop)
 
+    def table_put_many(self, table_name, key_values, changes_retained):
+        args = [changes_retained]
+        for key, value in key_values.items():
+            args.append(key)
+            args.append(encode_value(value))
+        return self._table_put_script(
+            keys=generate_table_keys(table_name), args=args)
+
+    def table_delete_many(self, table_name, keys, changes_retained):
+        args = [changes_retained]
+        args.extend(keys)
+        return self._table_delete_script(
+            keys=generate_table_keys(table_name), args=args)
+
+    def table_get(self, table_name, key):
+        hash_key, _, _ = generate_table_keys(table_name)
+        return self._redis_client.hget(hash_key, key)
+
+    def table_get_many(self, table_name, keys):
+        hash_key, _, _ = generate_table_keys(table_name)
+        return self._redis_client.hmget(hash_key, keys)
+
+    def table_get_all(self, table_name):
+        hash_key, _, _ = generate_table_keys(table_name)
+        return {key.decode("utf-8"): value
+                for key, value in self._redis_client.hgetall(hash_key).items()}
+
+    def table_scan(self, table_name, batch_size):
+        hash_key, _, _ = generate_table_keys(table_name)
+        for key, value in self._redis_client.hscan_iter(hash_key, count=batch_size):
+            yield key.decode("utf-8"), value
+
+    def table_get_changes(self, table_name, since_version, changes_retained):
+        """Get the table changes on this shard since the version.
+
+        Returns None if the table is not changed since the version.
+        """
+        result = self._table_get_changes_script(
+            keys=generate_table_keys(table_name),
+            args=[since_version, changes_retained])
+        version = int(result[0])
+        if len(result) == 1:
+            return None
+        if int(result[1]):
+            return TableShardChanges(
+                version, True, _decode_hash_items(result[2]), [])
+
+        updated = {}
+        deleted = []
+        for key, value in zip(result[2], result[3]):
+            key = key.decode("utf-8")
+            if value is None:
+                deleted.append(key)
+            else:
+                updated[key] = value
+        return TableShardChanges(version, False, updated, deleted)
+
 
 def get_redis_shards_addresses(primary_shard: RedisShard):
     redis_addresses = []
@@ -93,6 +272,8 @@ class RedisShardsClient:
         self._primary_shard = None
         self._redis_shards = {}
         self._shards_count = 0
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def get_primary_shard(self):
         return self._primary_shard
@@ -132,7 +313,76 @@ class RedisShardsClient:
         self._shards_count = len(self._redis_shards)
         self._is_connected = True
 
+    def _get_executor(self):
+        if not CLOUDTIK_STATE_CONCURRENT_SHARDS or self._shards_count <= 1:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                # One worker for each shard
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._shards_count,
+                    thread_name_prefix="redis_shards")
+            return self._executor
+
+    def map_shards(self, shard_function):
+        """Call the function on all the shards concurrently.
+
+        Returns:
+            The map of shard index to the result of the shard function.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return {shard_index: shard_function(redis_shard)
+                    for shard_index, redis_shard in self._redis_shards.items()}
+
+        futures = {shard_index: executor.submit(shard_function, redis_shard)
+                   for shard_index, redis_shard in self._redis_shards.items()}
+        return {shard_index: future.result()
+                for shard_index, future in futures.items()}
+
+    def iter_shards(self, shard_function):
+        """Iterate the items generated by the shard function of all the shards.
+
+        The shard function is a generator function called with the shard.
+        The shards are iterated concurrently and the items are yielded as
+        they come regardless of the shards they come from.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            for redis_shard in list(self._redis_shards.values()):
+                yield from shard_function(redis_shard)
+            return
+
+        # Each worker puts the items and finally a done or error marker
+        item_queue = queue.Queue()
+
+        def iter_shard(redis_shard):
+            try:
+                for item in shard_function(redis_shard):
+                    item_queue.put((True, item))
+                item_queue.put((False, None))
+            except Exception as e:
+                item_queue.put((False, e))
+
+        shards = list(self._redis_shards.values())
+        for redis_shard in shards:
+            executor.submit(iter_shard, redis_shard)
+
+        remaining = len(shards)
+        while remaining > 0:
+            is_item, item = item_queue.get()
+            if is_item:
+                yield item
+                continue
+            remaining -= 1
+            if item is not None:
+                raise item
+
     def disconnect(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
         self._primary_shard = None
         if self._redis_shards is not None:
             self._redis_shards.clear()
@@ -15,16 +15,24 @@ class RedisShardsScanner:
         self._table_name = table_name
 
     def scan_keys_and_values(self, match_pattern):
-        all_key_value = {}
+        return dict(self.iter_keys_and_values(match_pattern))
 
-        def values_callback(key_value_map):
-            all_key_value.update(key_value_map)
+    def iter_keys_and_values(self, match_pattern):
+        """Scan the keys and get the values of all the shards concurrently.
+        The key and value pairs are yielded as soon as each batch is read."""
+        batch_size = SCAN_BATCH_SIZE
+        table_name = self._table_name
 
-        def keys_callback(keys):
-            scan_values(self._redis_shards_client, self._table_name, keys, values_callback)
+        def scan_shard(shard_context):
+            # The keys scanned from a shard are stored in the same shard
+            new_cursor, keys = shard_context.scan(0, match_pattern, batch_size)
+            yield from _get_shard_values(shard_context, table_name, keys)
+            while new_cursor != 0:
+                new_cursor, keys = shard_context.scan(
+                    new_cursor, match_pattern, batch_size)
+                yield from _get_shard_values(shard_context, table_name, keys)
 
-        self.scan_keys(match_pattern, keys_callback)
-        return all_key_value
+        return self._redis_shards_client.iter_shards(scan_shard)
 
     def scan_keys(self, match_pattern, keys_callback):
         batch_size = SCAN_BATCH_SIZE
@@ -41,10 +49,13 @@ class RedisShardsScanner:
                 keys_callback(keys)
 
 
-def get_scan_by_shards(shards_client: RedisShardsClient, keys):
+def get_scan_by_shards(shards_client: RedisShardsClient, keys, get_redis_key=None):
+    """Group the keys by the shards. The shard of a key is decided by the
+    redis key got with get_redis_key or the key itself if not specified."""
     scan_by_shards = {}
     for key in keys:
-        redis_shard = shards_client.get_shard(key)
+        redis_shard = shards_client.get_shard(
+            key if get_redis_key is None else get_redis_key(key))
         shard_keys = scan_by_shards.get(redis_shard)
         if shard_keys is not None:
             shard_keys.append(key)
@@ -55,6 +66,15 @@ def get_scan_by_shards(shards_client: RedisShardsClient, keys):
     return scan_by_shards
 
 
+def _get_shard_values(shard_context, table_name, keys):
+    if not keys:
+        return
+    key_values = shard_context.mget(keys)
+    for k, v in zip(keys, key_values):
+        if v is not None:
+            yield get_real_key(k, table_name).decode("utf-8"), v
+
+
 def scan_values(shards_client: RedisShardsClient, table_name, keys, values_callback):
     # Use `mget` command for each shard
     key_value_map = {}
@@ -1,11 +1,14 @@
 import json
 import logging
+import threading
 import time
 
 from cloudtik.core._private.constants import CLOUDTIK_HEARTBEAT_TIMEOUT_S, CLOUDTIK_SCALING_STATE_TIMEOUT_S, \
-    CLOUDTIK_NODE_RESOURCE_STATE_TIMEOUT_S
+    CLOUDTIK_NODE_RESOURCE_STATE_TIMEOUT_S, CLOUDTIK_HEARTBEAT_CHANNEL
 from cloudtik.core._private.state.control_state import ControlState
 from cloudtik.core._private.state.kv_store import kv_put, kv_get
+from cloudtik.core._private.state.state_codec import decode_heartbeat, encode_record, decode_record
+from cloudtik.core._private.state.state_table_store import StateTableReader
 from cloudtik.core.scaling_policy import ScalingState
 
 CLOUDTIK_AUTOSCALING_INSTRUCTIONS = "autoscaling_instructions"
@@ -30,6 +33,76 @@ class ClusterHeartbeatState:
         self.node_heartbeat_states[node_id] = node_heartbeat_state
 
 
+class NodeHeartbeatSubscriber:
+    """Subscriber of the heartbeats published by the nodes.
+
+    The heartbeats are received in a background thread and the latest
+    heartbeat state of each node is kept until drained.
+    """
+
+    def __init__(self, redis_client):
+        self._redis_client = redis_client
+        self._lock = threading.Lock()
+        self._node_heartbeat_states = {}
+        # Whether heartbeats may have been missed since the last drain
+        self._missed = True
+
+    def start(self):
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CLOUDTIK_HEARTBEAT_CHANNEL)
+                with self._lock:
+                    self._missed = True
+                for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        self._on_heartbeat(message["data"])
+                    except Exception as e:
+                        logger.warning("Invalid heartbeat message: " + str(e))
+            except Exception as e:
+                logger.exception("Error receiving heartbeats: " + str(e))
+                with self._lock:
+                    self._missed = True
+                time.sleep(1)
+            finally:
+                # Release the connection before subscribing again
+                if pubsub is not None:
+                    self._close_pubsub(pubsub)
+
+    @staticmethod
+    def _close_pubsub(pubsub):
+        try:
+            pubsub.close()
+        except Exception as e:
+            logger.debug("Error closing the heartbeat subscription: " + str(e))
+
+    def _on_heartbeat(self, data):
+        heartbeat = decode_record(data)
+        node_id = heartbeat["node_id"]
+        node_heartbeat_state = NodeHeartbeatState(
+            node_id, heartbeat["node_ip"], heartbeat["last_heartbeat_time"])
+        with self._lock:
+            self._node_heartbeat_states[node_id] = node_heartbeat_state
+
+    def drain(self):
+        """Return the heartbeat states received since the last drain and
+        whether some heartbeats may have been missed."""
+        with self._lock:
+            node_heartbeat_states = self._node_heartbeat_states
+            missed = self._missed
+            self._node_heartbeat_states = {}
+            self._missed = False
+        return node_heartbeat_states, missed
+
+
 class ScalingStateClient:
     """Client to read resource information from Redis"""
 
@@ -38,20 +111,55 @@ class ScalingStateClient:
                  nums_reconnect_retry: int = 5):
         self._control_state = control_state
         self._nums_reconnect_retry = nums_reconnect_retry
+        # The readers keep the decoded rows and read only the changes
+        self._node_table_reader = None
+        self._node_heartbeat_table_reader = None
+        self._resource_state_table_reader = None
+
+    def _get_node_table_reader(self):
+        if self._node_table_reader is None:
+            self._node_table_reader = StateTableReader(
+                self._control_state.get_node_table(), json.loads)
+        return self._node_table_reader
+
+    def _get_node_heartbeat_table_reader(self):
+        if self._node_heartbeat_table_reader is None:
+            self._node_heartbeat_table_reader = StateTableReader(
+                self._control_state.get_node_heartbeat_table(), decode_heartbeat)
+        return self._node_heartbeat_table_reader
+
+    def _get_resource_state_table_reader(self):
+        if self._resource_state_table_reader is None:
+            self._resource_state_table_reader = StateTableReader(
+                self._get_resource_state_table(), decode_record)
+        return self._resource_state_table_reader
+
+    def _get_resource_state_table(self):
+        return self._control_state.get_user_state_table(
+            RESOURCE_STATE_TABLE, binary=True)
 
     def get_cluster_heartbeat_state(self, timeout: int = STATE_FETCH_TIMEOUT):
-        node_table = self._control_state.get_node_table()
         cluster_heartbeat_state = ClusterHeartbeatState()
-        for node_info_as_json in node_table.get_all().values():
-            node_info = json.loads(node_info_as_json)
+        for node_heartbeat_state in self.iter_node_heartbeat_states(timeout):
+            cluster_heartbeat_state.add_heartbeat_state(
+                node_heartbeat_state.node_id, node_heartbeat_state)
+        return cluster_heartbeat_state
+
+    def iter_node_heartbeat_states(self, timeout: int = STATE_FETCH_TIMEOUT):
+        """Iterate the heartbeat states of the live nodes one by one"""
+        # The node table has the node info which changes rarely and
+        # the node heartbeat table has the heartbeat time of the nodes
+        node_infos = self._get_node_table_reader().read()
+        node_heartbeats = self._get_node_heartbeat_table_reader().read()
+        for node_id, node_info in node_infos.items():
+            last_heartbeat_time = node_heartbeats.get(
+                node_id, node_info.get("last_heartbeat_time", 0))
             # Filter out the stale record in the node table
-            delta = time.time() - node_info.get("last_heartbeat_time", 0)
+            delta = time.time() - last_heartbeat_time
             if delta < CLOUDTIK_HEARTBEAT_TIMEOUT_S:
-                node_id = node_info["node_id"]
-                node_heartbeat_state = NodeHeartbeatState(
-                    node_id, node_info["node_ip"], node_info.get("last_heartbeat_time"))
-                cluster_heartbeat_state.add_heartbeat_state(node_id, node_heartbeat_state)
-        return cluster_heartbeat_state
+                yield NodeHeartbeatState(
+                    node_info["node_id"], node_info["node_ip"],
+                    last_heartbeat_time)
 
     def get_scaling_state(self, timeout: int = STATE_FETCH_TIMEOUT):
         now = time.time()
@@ -67,9 +175,8 @@ class ScalingStateClient:
                 scaling_state.set_autoscaling_instructions(autoscaling_instructions)
 
         # Get resource state of nodes
-        resource_state_table = self._control_state.get_user_state_table(RESOURCE_STATE_TABLE)
-        for resource_state_as_json in resource_state_table.get_all().values():
-            resource_state = json.loads(resource_state_as_json)
+        resource_state_table_reader = self._get_resource_state_table_reader()
+        for resource_state in resource_state_table_reader.read().values():
             # Filter out the stale record in the node table
             resource_time = resource_state.get("resource_time", 0)
             delta = now - resource_time
@@ -87,14 +194,14 @@ class ScalingStateClient:
         node_resource_states = scaling_state.node_resource_states
         lost_nodes = scaling_state.lost_nodes
         if node_resource_states is not None or lost_nodes is not None:
-            resource_state_table = self._control_state.get_user_state_table(RESOURCE_STATE_TABLE)
-            if node_resource_states is not None:
-                for node_id, node_resource_state in node_resource_states.items():
-                    resource_state_as_json = json.dumps(node_resource_state)
-                    resource_state_table.put(node_id, resource_state_as_json)
-            if lost_nodes is not None:
-                for node_id in lost_nodes:
-                    resource_state_table.delete(node_id)
+            resource_state_table = self._get_resource_state_table()
+            if node_resource_states:
+                # Write all the nodes with one round trip for each shard
+                resource_state_table.put_many(
+                    {node_id: encode_record(node_resource_state)
+                     for node_id, node_resource_state in node_resource_states.items()})
+            if lost_nodes:
+                resource_state_table.delete_many(lost_nodes)
 
     @staticmethod
     def create_from(control_state):
@@ -0,0 +1,56 @@
+"""Compact codecs for the records of the state tables.
+
+The heartbeat of a node is encoded as a fixed struct with a leading codec
+version. The other records are encoded with msgpack if it is available, or
+with JSON otherwise. The decoders accept both encodings so that the records
+written by a node without msgpack can still be read.
+"""
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# The codec version byte leading the encoded records
+CODEC_HEARTBEAT_V1 = 1
+CODEC_RECORD_MSGPACK_V1 = 2
+
+# Codec version, last heartbeat time
+_HEARTBEAT_V1_STRUCT = struct.Struct("!Bd")
+
+# A JSON record starts with an open brace
+_JSON_RECORD_START = ord("{")
+
+
+def encode_heartbeat(last_heartbeat_time: float) -> bytes:
+    return _HEARTBEAT_V1_STRUCT.pack(CODEC_HEARTBEAT_V1, last_heartbeat_time)
+
+
+def decode_heartbeat(data: bytes) -> float:
+    """Decode the heartbeat and return the last heartbeat time."""
+    if not data or data[0] != CODEC_HEARTBEAT_V1:
+        raise ValueError("Unknown heartbeat codec.")
+    _, last_heartbeat_time = _HEARTBEAT_V1_STRUCT.unpack(data)
+    return last_heartbeat_time
+
+
+def encode_record(record) -> bytes:
+    if msgpack is None:
+        return json.dumps(record).encode("utf-8")
+    return bytes([CODEC_RECORD_MSGPACK_V1]) + msgpack.packb(record)
+
+
+def decode_record(data: bytes):
+    if not data:
+        raise ValueError("Empty record data.")
+    codec = data[0]
+    if codec == _JSON_RECORD_START:
+        return json.loads(data)
+    if codec == CODEC_RECORD_MSGPACK_V1:
+        if msgpack is None:
+            raise RuntimeError(
+                "The record is encoded with msgpack which is not installed.")
+        return msgpack.unpackb(data[1:])
+    raise ValueError("Unknown record codec: {}.".format(codec))
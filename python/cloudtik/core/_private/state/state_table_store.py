@@ -1,15 +1,28 @@
 import logging
 
+from cloudtik.core._private.constants import CLOUDTIK_STATE_TABLE_STORAGE, \
+    CLOUDTIK_STATE_TABLE_STORAGE_KEY
 from cloudtik.core._private.state.redis_shards_client import RedisShardsClient
-from cloudtik.core._private.state.store_client import StoreClient
+from cloudtik.core._private.state.store_client import StoreClient, HashStoreClient
 
 logger = logging.getLogger(__name__)
 
 
 class StateTable:
-    def __init__(self, store_client: StoreClient, table_name):
+    """
+    A table of key value rows. The values of a binary table are bytes,
+    otherwise the values are str.
+    """
+
+    def __init__(self, store_client: StoreClient, table_name, binary=False):
         self._store_client = store_client
         self._table_name = table_name
+        self._binary = binary
+
+    def _decode_value(self, value):
+        if self._binary:
+            return value
+        return value.decode("utf-8")
 
     def put(self, key, value):
         self._store_client.put(self._table_name, key, value)
@@ -18,35 +31,129 @@ class StateTable:
         return self._store_client.get(self._table_name, key)
 
     def get_all(self):
-        return self._store_client.get_all(self._table_name)
+        return {key: self._decode_value(value) for key, value in
+                self._store_client.get_all(self._table_name).items()}
+
+    def iter_all(self):
+        """Iterate the key and value pairs of all the rows without
+        building the full map. The shards are read concurrently."""
+        for key, value in self._store_client.iter_all(self._table_name):
+            yield key, self._decode_value(value)
 
     def delete(self, key):
         self._store_client.delete(self._table_name, key)
 
+    def put_many(self, key_values):
+        self._store_client.put_many(self._table_name, key_values)
+
+    def get_many(self, keys):
+        return {key: self._decode_value(value) for key, value in
+                self._store_client.get_many(self._table_name, keys).items()}
+
+    def delete_many(self, keys):
+        self._store_client.delete_many(self._table_name, keys)
+
+    def is_versioned(self):
+        return self._store_client.is_versioned()
+
+    def get_changes(self, since_versions):
+        changes_by_shards = self._store_client.get_changes(
+            self._table_name, since_versions)
+        if not self._binary:
+            for shard_changes in changes_by_shards.values():
+                shard_changes.updated = {
+                    key: self._decode_value(value)
+                    for key, value in shard_changes.updated.items()}
+        return changes_by_shards
+
 
 class NodeStateTable(StateTable):
     def __init__(self, store_client: StoreClient):
         super().__init__(store_client, "node_table")
 
 
+class NodeHeartbeatStateTable(StateTable):
+    def __init__(self, store_client: StoreClient):
+        super().__init__(store_client, "node_heartbeat", binary=True)
+
+
+class StateTableReader:
+    """
+    Reader which keeps the decoded rows of a state table in memory and
+    refreshes them with the table changes since the last read.
+    If the table is not versioned, all the rows are read for each refresh.
+    """
+
+    def __init__(self, state_table: StateTable, decoder=None):
+        self._state_table = state_table
+        self._decoder = decoder
+        self._versions = {}
+        self._rows_by_shards = {}
+        self._rows = {}
+
+    def _decode(self, value):
+        if self._decoder is None:
+            return value
+        return self._decoder(value)
+
+    def read(self):
+        """Return the map of key to the decoded value of all the rows.
+        The returned map and values are shared and should not be modified."""
+        if not self._state_table.is_versioned():
+            self._rows = {key: self._decode(value)
+                          for key, value in self._state_table.iter_all()}
+            return self._rows
+
+        changes_by_shards = self._state_table.get_changes(self._versions)
+        if not changes_by_shards:
+            return self._rows
+
+        for shard_index, shard_changes in changes_by_shards.items():
+            self._versions[shard_index] = shard_changes.version
+            if shard_changes.full:
+                shard_rows = {}
+                self._rows_by_shards[shard_index] = shard_rows
+            else:
+                shard_rows = self._rows_by_shards.setdefault(shard_index, {})
+                for key in shard_changes.deleted:
+                    shard_rows.pop(key, None)
+            for key, value in shard_changes.updated.items():
+                shard_rows[key] = self._decode(value)
+
+        rows = {}
+        for shard_rows in self._rows_by_shards.values():
+            rows.update(shard_rows)
+        self._rows = rows
+        return self._rows
+
+
 class StateTableStore:
     """
     Class wraps the access of all the table tables from Redis sharding
     """
 
     def __init__(self, redis_shards_client: RedisShardsClient):
-        self._store_client = StoreClient(redis_shards_client)
+        if CLOUDTIK_STATE_TABLE_STORAGE == CLOUDTIK_STATE_TABLE_STORAGE_KEY:
+            self._store_client = StoreClient(redis_shards_client)
+        else:
+            self._store_client = HashStoreClient(redis_shards_client)
         self._node_table = NodeStateTable(self._store_client)
+        self._node_heartbeat_table = NodeHeartbeatStateTable(self._store_client)
         self._user_state_tables = {}
 
     def get_node_table(self) -> NodeStateTable:
         return self._node_table
 
-    def get_user_state_table(self, table_name) -> StateTable:
-        user_state_table = self._user_state_tables.get(table_name)
+    def get_node_heartbeat_table(self) -> NodeHeartbeatStateTable:
+        return self._node_heartbeat_table
+
+    def get_user_state_table(self, table_name, binary=False) -> StateTable:
+        # The same table can be accessed with the values decoded or not
+        user_state_table_key = (table_name, binary)
+        user_state_table = self._user_state_tables.get(user_state_table_key)
         if user_state_table is not None:
             return user_state_table
 
-        user_state_table = StateTable(self._store_client, table_name)
-        self._user_state_tables[table_name] = user_state_table
+        user_state_table = StateTable(self._store_client, table_name, binary)
+        self._user_state_tables[user_state_table_key] = user_state_table
         return user_state_table
@@ -1,8 +1,11 @@
 import logging
 
+from cloudtik.core._private.constants import CLOUDTIK_STATE_TABLE_CHANGES_RETAINED
 from cloudtik.core._private.state.redis_shards_client import \
-    RedisShardsClient, generate_match_pattern, generate_redis_key
-from cloudtik.core._private.state.redis_shards_scanner import RedisShardsScanner
+    RedisShardsClient, generate_match_pattern, generate_redis_key, get_real_key, \
+    TableShardChanges
+from cloudtik.core._private.state.redis_shards_scanner import RedisShardsScanner, get_scan_by_shards, \
+    SCAN_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +30,146 @@ class StoreClient:
         redis_shard.delete(redis_key)
 
     def get_all(self, table_name):
+        return dict(self.iter_all(table_name))
+
+    def iter_all(self, table_name):
         match_pattern = generate_match_pattern(table_name)
         scanner = RedisShardsScanner(self._redis_shards_client, table_name)
-        return scanner.scan_keys_and_values(match_pattern)
+        return scanner.iter_keys_and_values(match_pattern)
+
+    def put_many(self, table_name, key_values):
+        """Put the key values with one pipeline for each shard"""
+        redis_key_values = {
+            generate_redis_key(table_name, key): value for key, value in key_values.items()}
+        scan_by_shards = get_scan_by_shards(
+            self._redis_shards_client, redis_key_values.keys())
+        for redis_shard, shard_keys in scan_by_shards.items():
+            redis_shard.put_many(
+                {redis_key: redis_key_values[redis_key] for redis_key in shard_keys})
+
+    def get_many(self, table_name, keys):
+        """Get the values of the keys with one mget for each shard.
+        The keys not existing will not be returned in the result map."""
+        redis_keys = [generate_redis_key(table_name, key) for key in keys]
+        scan_by_shards = get_scan_by_shards(self._redis_shards_client, redis_keys)
+        key_value_map = {}
+        for redis_shard, shard_keys in scan_by_shards.items():
+            values = redis_shard.mget(shard_keys)
+            for redis_key, value in zip(shard_keys, values):
+                if value is not None:
+                    key_value_map[get_real_key(redis_key, table_name)] = value
+        return key_value_map
+
+    def delete_many(self, table_name, keys):
+        redis_keys = [generate_redis_key(table_name, key) for key in keys]
+        scan_by_shards = get_scan_by_shards(self._redis_shards_client, redis_keys)
+        for redis_shard, shard_keys in scan_by_shards.items():
+            redis_shard.delete_many(shard_keys)
+
+    def is_versioned(self):
+        return False
+
+    def get_changes(self, table_name, since_versions):
+        """The key storage has no versions. All the rows are returned
+        as the full changes of the primary shard."""
+        return {0: TableShardChanges(-1, True, self.get_all(table_name), [])}
+
+
+class HashStoreClient(StoreClient):
+    """Store client which stores a table as one Redis hash on each shard.
+
+    Each table on a shard has a version which increases on every change, so
+    that a reader can skip the unchanged shards or read only the rows changed
+    since its last read.
+    """
+
+    def __init__(self, redis_shards_client: RedisShardsClient,
+                 changes_retained=CLOUDTIK_STATE_TABLE_CHANGES_RETAINED):
+        super().__init__(redis_shards_client)
+        self._changes_retained = changes_retained
+
+    def _get_shard(self, table_name, key):
+        # Use the same key distribution as the key storage
+        return self._redis_shards_client.get_shard(
+            generate_redis_key(table_name, key))
+
+    def _get_keys_by_shards(self, table_name, keys):
+        return get_scan_by_shards(
+            self._redis_shards_client, keys,
+            lambda key: generate_redis_key(table_name, key))
+
+    def put(self, table_name, key, value):
+        redis_shard = self._get_shard(table_name, key)
+        redis_shard.table_put_many(
+            table_name, {key: value}, self._changes_retained)
+
+    def get(self, table_name, key):
+        redis_shard = self._get_shard(table_name, key)
+        return redis_shard.table_get(table_name, key)
+
+    def delete(self, table_name, key):
+        redis_shard = self._get_shard(table_name, key)
+        redis_shard.table_delete_many(
+            table_name, [key], self._changes_retained)
+
+    def get_all(self, table_name):
+        all_key_value = {}
+        values_by_shards = self._redis_shards_client.map_shards(
+            lambda redis_shard: redis_shard.table_get_all(table_name))
+        for shard_key_value in values_by_shards.values():
+            all_key_value.update(shard_key_value)
+        return all_key_value
+
+    def iter_all(self, table_name):
+        return self._redis_shards_client.iter_shards(
+            lambda redis_shard: redis_shard.table_scan(table_name, SCAN_BATCH_SIZE))
+
+    def put_many(self, table_name, key_values):
+        keys_by_shards = self._get_keys_by_shards(table_name, key_values.keys())
+        for redis_shard, shard_keys in keys_by_shards.items():
+            redis_shard.table_put_many(
+                table_name, {key: key_values[key] for key in shard_keys},
+                self._changes_retained)
+
+    def get_many(self, table_name, keys):
+        key_value_map = {}
+        keys_by_shards = self._get_keys_by_shards(table_name, keys)
+        for redis_shard, shard_keys in keys_by_shards.items():
+            values = redis_shard.table_get_many(table_name, shard_keys)
+            for key, value in zip(shard_keys, values):
+                if value is not None:
+                    key_value_map[key] = value
+        return key_value_map
+
+    def delete_many(self, table_name, keys):
+        keys_by_shards = self._get_keys_by_shards(table_name, keys)
+        for redis_shard, shard_keys in keys_by_shards.items():
+            redis_shard.table_delete_many(
+                table_name, shard_keys, self._changes_retained)
+
+    def is_versioned(self):
+        return True
+
+    def get_changes(self, table_name, since_versions):
+        """Get the table changes of each shard since the versions.
+
+        Args:
+            table_name: The name of the table
+            since_versions: The map of shard index to the table version of
+                the last read. A shard not in the map will be read fully.
 
+        Returns:
+            The map of shard index to TableShardChanges for the changed shards.
+        """
+        shard_indices = {redis_shard: shard_index for shard_index, redis_shard
+                         in self._redis_shards_client.get_shards().items()}
 
+        def get_shard_changes(redis_shard):
+            return redis_shard.table_get_changes(
+                table_name, since_versions.get(shard_indices[redis_shard], -1),
+                self._changes_retained)
 
+        changes_by_shards = self._redis_shards_client.map_shards(get_shard_changes)
+        return {shard_index: shard_changes
+                for shard_index, shard_changes in changes_by_shards.items()
+                if shard_changes is not None}
@@ -0,0 +1,139 @@
+"""Cache of the parsed configuration templates.
+
+The YAML files of the provider defaults, the templates and the runtime
+defaults are parsed once and stored with pickle in a cache directory of the
+user, keyed by the file path, the modification time, the size and the
+CloudTik version. The files loaded while resolving a config can be recorded,
+so that a cached resolved config can be checked to be up to date with stat
+calls only.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+import cloudtik
+from cloudtik.core._private import constants
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_DIR_NAME = "cloudtik-templates"
+
+# The pickled templates parsed in this process
+_templates: Dict[Any, bytes] = {}
+_templates_lock = threading.Lock()
+# The stack of the files recorders of the current thread
+_recorders = threading.local()
+
+
+def _get_file_state(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def record_file(path: str) -> Optional[List[int]]:
+    """Record the state of a file or directory the config resolution
+    depends on. A path not existing is recorded as None."""
+    state = _get_file_state(path)
+    for files in getattr(_recorders, "stack", []):
+        files[path] = state
+    return state
+
+
+@contextmanager
+def record_template_files():
+    """Record the files loaded in the context of the current thread.
+
+    Yields the dict of the path to the state of the file.
+    """
+    if not hasattr(_recorders, "stack"):
+        _recorders.stack = []
+    files = {}
+    _recorders.stack.append(files)
+    try:
+        yield files
+    finally:
+        _recorders.stack.remove(files)
+
+
+def is_template_files_up_to_date(files: Dict[str, Optional[List[int]]]) -> bool:
+    """Check whether the recorded files are not modified since recorded."""
+    for path, state in files.items():
+        if _get_file_state(path) != state:
+            return False
+    return True
+
+
+def _get_cache_dir() -> Optional[str]:
+    cache_dir = os.path.join(
+        tempfile.gettempdir(), "{}-{}".format(
+            TEMPLATE_CACHE_DIR_NAME, os.getuid()))
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat = os.stat(cache_dir)
+    except OSError:
+        return None
+    # Never load the pickles from a directory writable by the others
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        return None
+    return cache_dir
+
+
+def _get_cache_file(cache_dir: str, path: str, state: List[int]) -> str:
+    hasher = hashlib.sha1()
+    hasher.update("{}:{}:{}:{}".format(
+        path, state[0], state[1], cloudtik.__version__).encode("utf-8"))
+    return os.path.join(cache_dir, hasher.hexdigest())
+
+
+def _load_pickled_template(path: str, state: List[int]) -> bytes:
+    cache_dir = _get_cache_dir() if constants.CLOUDTIK_TEMPLATE_CACHE else None
+    if cache_dir is not None:
+        cache_file = _get_cache_file(cache_dir, path, state)
+        try:
+            with open(cache_file, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+
+    with open(path) as f:
+        pickled = pickle.dumps(yaml.safe_load(f))
+
+    if cache_dir is not None:
+        try:
+            # Write to a temp file and rename for the concurrent processes
+            fd, temp_file = tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(pickled)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.debug("Failed to cache the template {}: {}".format(path, e))
+    return pickled
+
+
+def load_template_file(path: str) -> Any:
+    """Load the YAML file of a template.
+
+    The returned object is a new copy which can be modified by the caller.
+    """
+    state = record_file(path)
+    if state is None:
+        raise FileNotFoundError("Template file {} doesn't exist.".format(path))
+
+    key = (path, state[0], state[1])
+    pickled = _templates.get(key)
+    if pickled is None:
+        pickled = _load_pickled_template(path, state)
+        with _templates_lock:
+            _templates[key] = pickled
+    return pickle.loads(pickled)
@@ -40,6 +40,7 @@ from cloudtik.core._private.constants import CLOUDTIK_WHEELS, CLOUDTIK_CLUSTER_P
 from cloudtik.core._private.core_utils import _load_class, double_quote, check_process_exists
 from cloudtik.core._private.crypto import AESCipher
 from cloudtik.core._private.runtime_factory import _get_runtime, _get_runtime_cls, DEFAULT_RUNTIMES
+from cloudtik.core._private.template_cache import load_template_file, record_file
 from cloudtik.core.node_provider import NodeProvider
 from cloudtik.core._private.providers import _get_default_config, _get_node_provider, _get_provider_config_object, \
     _get_node_provider_cls
@@ -403,6 +404,8 @@ def _get_user_template_file(template_name: str):
         if user_template_dirs_str:
             user_template_dirs = [user_template_dir.strip() for user_template_dir in user_template_dirs_str.split(',')]
             for user_template_dir in user_template_dirs:
+                # The templates added to the directory change the resolution
+                record_file(user_template_dir)
                 template_file = os.path.join(user_template_dir, template_name)
                 if os.path.exists(template_file):
                     return template_file
@@ -430,9 +433,7 @@ def _get_template_config(template_name: str, system: bool = False) -> Dict[str,
             template_file = os.path.join(
                 os.path.dirname(cloudtik_home.__file__), "templates", template_name)
 
-    with open(template_file) as f:
-        template_config = yaml.safe_load(f)
-
+    template_config = load_template_file(template_file)
     return template_config
 
 
@@ -489,9 +490,7 @@ def _get_rooted_template_config(root: str, template_name: str) -> Dict[str, Any]
         template_name += ".yaml"
 
     template_file = os.path.join(root, template_name)
-    with open(template_file) as f:
-        template_config = yaml.safe_load(f)
-
+    template_config = load_template_file(template_file)
     return template_config
 
 
@@ -969,6 +968,18 @@ def _get_node_specific_docker_config(config, provider, node_id):
     return docker_config
 
 
+def _get_node_type_specific_docker_config(config, node_type: str):
+    if DOCKER_CONFIG_KEY not in config:
+        return {}
+    docker_config = config[DOCKER_CONFIG_KEY]
+    node_specific_docker = _get_node_type_specific_fields(
+        config, node_type, DOCKER_CONFIG_KEY)
+    if node_specific_docker is not None:
+        docker_config = copy.deepcopy(docker_config)
+        return merge_config(docker_config, node_specific_docker)
+    return docker_config
+
+
 def _get_node_specific_runtime_config(config, provider, node_id):
     node_type = get_node_type(provider, node_id)
     return _get_node_type_specific_runtime_config(config, node_type)
@@ -1204,6 +1215,20 @@ def hash_launch_conf(node_conf, auth):
     return hasher.hexdigest()
 
 
+def get_auth_key_files_mtime(auth):
+    """The modification time of each key file hashed by hash_launch_conf.
+    A launch hash is not valid anymore if the modification times changed."""
+    key_files_mtime = {}
+    for key_type in ["ssh_private_key", "ssh_public_key"]:
+        if key_type in auth:
+            try:
+                key_files_mtime[key_type] = os.stat(
+                    os.path.expanduser(auth[key_type])).st_mtime_ns
+            except OSError:
+                key_files_mtime[key_type] = None
+    return key_files_mtime
+
+
 # Cache the file hashes to avoid rescanning it each time. Also, this avoids
 # inadvertently restarting workers if the file mount content is mutated on the
 # head node.
@@ -2113,9 +2138,7 @@ def _get_runtime_config_object(config_home: str, provider_config, object_name: s
     if not os.path.exists(path_to_config_file):
         return {}
 
-    with open(path_to_config_file) as f:
-        config_object = yaml.safe_load(f) or {}
-
+    config_object = load_template_file(path_to_config_file) or {}
     return config_object
 
 
@@ -1,5 +1,6 @@
 import time
-from typing import Any, List, Tuple, Dict, Optional
+import uuid
+from typing import Any, List, Tuple, Dict, Optional, NamedTuple
 
 from cloudtik.core._private.call_context import CallContext
 
@@ -8,6 +9,82 @@ COMMAND_RUN_DEFAULT_RETRY_DELAY_S = 5
 
 MAX_COMMAND_LENGTH_TO_PRINT = 48
 
+COMMAND_BATCH_MARKER = "[cloudtik-batch]"
+COMMAND_BATCH_STATUS_FILE = "/tmp/cloudtik-batch-{}.status"
+
+
+class CommandStatus(NamedTuple):
+    # The index of the command in the batch
+    index: int
+    exit_code: int
+    # Only known for the commands of a failed batch
+    elapsed_s: Optional[int] = None
+
+
+class CommandBatchError(Exception):
+    """A command of a batch failed.
+
+    Attributes:
+        statuses: The status of each command run. The last one is the
+            failed command if it is known.
+    """
+
+    def __init__(self, message, statuses: List[CommandStatus]):
+        super().__init__(message)
+        self.statuses = statuses
+
+    @property
+    def failed_index(self) -> Optional[int]:
+        if self.statuses and self.statuses[-1].exit_code != 0:
+            return self.statuses[-1].index
+        return None
+
+
+def _with_batched_commands(cmds: List[str], status_file: str,
+                           start_index: int = 0) -> str:
+    """Make a script to run the commands one by one in a single session.
+
+    Each command runs in a sub shell as if it is run in its own session.
+    The exit status and the elapsed seconds of each command are written to
+    the status file and printed as markers in the output. The script stops
+    at the first failed command with its exit status and keeps the status
+    file to be read back. The status file is removed if all succeeded.
+    """
+    total = start_index + len(cmds)
+    lines = [": > {}".format(status_file)]
+    for i, cmd in enumerate(cmds, start=start_index):
+        lines += [
+            "echo '{} ({}/{}) {}'".format(
+                COMMAND_BATCH_MARKER, i + 1, total, "started"),
+            "__cloudtik_start=$(date +%s)",
+            "(\n{}\n)".format(cmd),
+            "__cloudtik_rc=$?",
+            "__cloudtik_elapsed=$(( $(date +%s) - __cloudtik_start ))",
+            "echo \"{} $__cloudtik_rc $__cloudtik_elapsed\" >> {}".format(
+                i, status_file),
+            "echo \"{} ({}/{}) finished with exit status $__cloudtik_rc "
+            "in ${{__cloudtik_elapsed}}s\"".format(
+                COMMAND_BATCH_MARKER, i + 1, total),
+            "if [ $__cloudtik_rc -ne 0 ]; then exit $__cloudtik_rc; fi",
+        ]
+    lines.append("rm -f {}".format(status_file))
+    return "\n".join(lines)
+
+
+def _parse_command_statuses(output) -> List[CommandStatus]:
+    if isinstance(output, bytes):
+        output = output.decode()
+    statuses = []
+    for line in (output or "").splitlines():
+        fields = line.split()
+        if len(fields) != 3:
+            continue
+        try:
+            statuses.append(CommandStatus(*[int(field) for field in fields]))
+        except ValueError:
+            continue
+    return statuses
+
 
 def get_cmd_to_print(cmd, verbose=False):
     if not verbose and len(cmd) > MAX_COMMAND_LENGTH_TO_PRINT:
@@ -119,6 +196,81 @@ class CommandExecutor:
                 else:
                     raise e
 
+    def resolve_run_env(self, cmd: str, run_env: str) -> str:
+        """Resolve the environment the command runs in for run_env of "auto"."""
+        return run_env
+
+    def run_batch(
+            self,
+            cmds: List[str],
+            timeout: int = 120,
+            environment_variables: Dict[str, object] = None,
+            run_env: str = "auto",
+            ssh_options_override_ssh_key: str = "",
+            start_index: int = 0
+    ) -> List[CommandStatus]:
+        """Run a list of commands in one remote session for each run environment.
+
+        The environment variables are exported once for the batch. The
+        exit status and elapsed time of each command are reported as markers
+        in the output. The status of each command is read back only if the
+        batch failed. The consecutive commands which resolve
+        to the same run environment are run in the same session.
+
+        Raises:
+            CommandBatchError if a command fails. The statuses in the error
+                tell which command failed.
+        """
+        statuses = []
+        segment_start = 0
+        while segment_start < len(cmds):
+            segment_run_env = self.resolve_run_env(cmds[segment_start], run_env)
+            segment_end = segment_start + 1
+            while segment_end < len(cmds) and self.resolve_run_env(
+                    cmds[segment_end], run_env) == segment_run_env:
+                segment_end += 1
+            statuses += self._run_batch_segment(
+                cmds[segment_start:segment_end],
+                start_index=start_index + segment_start,
+                timeout=timeout,
+                environment_variables=environment_variables,
+                run_env=segment_run_env,
+                ssh_options_override_ssh_key=ssh_options_override_ssh_key,
+                statuses=statuses)
+            segment_start = segment_end
+        return statuses
+
+    def _run_batch_segment(self, cmds, start_index, timeout,
+                           environment_variables, run_env,
+                           ssh_options_override_ssh_key, statuses):
+        status_file = COMMAND_BATCH_STATUS_FILE.format(uuid.uuid4().hex[:8])
+        script = _with_batched_commands(cmds, status_file, start_index)
+        cmd_to_print = "{} {} commands".format(COMMAND_BATCH_MARKER, len(cmds))
+        try:
+            self.run(
+                script,
+                timeout=timeout,
+                environment_variables=environment_variables,
+                run_env=run_env,
+                ssh_options_override_ssh_key=ssh_options_override_ssh_key,
+                cmd_to_print=cmd_to_print)
+        except Exception as e:
+            try:
+                output = self.run(
+                    "cat {}; rm -f {}".format(status_file, status_file),
+                    with_output=True,
+                    run_env=run_env,
+                    ssh_options_override_ssh_key=ssh_options_override_ssh_key,
+                    silent=True)
+                segment_statuses = _parse_command_statuses(output)
+            except Exception:
+                segment_statuses = []
+            raise CommandBatchError(
+                "Command batch failed: {}".format(e),
+                statuses + segment_statuses) from e
+
+        return [CommandStatus(start_index + i, 0) for i in range(len(cmds))]
+
     def run_rsync_up(self,
                      source: str,
                      target: str,
@@ -2290,42 +2290,67 @@ def _extract_metadata_for_node(vm, resource_group, compute_client, network_clien
     metadata = {"name": vm.name, "tags": vm.tags, "status": "", "vm_size": ""}
 
     # get status
-    instance = compute_client.virtual_machines.instance_view(
-        resource_group_name=resource_group, vm_name=vm.name).as_dict()
-    for status in instance["statuses"]:
-        status_list = status["code"].split("/")
+    metadata["status"] = _get_node_status(vm, resource_group, compute_client)
+
+    # get ip data
+    metadata.update(_get_node_network(vm, resource_group, network_client))
+
+    # get vmSize
+    metadata["vm_size"] = vm.hardware_profile.vm_size
+
+    return metadata
+
+
+def _get_power_state(status_codes):
+    for status_code in status_codes:
+        status_list = status_code.split("/")
         code = status_list[0]
         state = status_list[1]
         # skip provisioning status
         if code == "PowerState":
-            metadata["status"] = state
-            break
+            return state
+    return ""
 
-    # get ip data
+
+def _get_node_status(vm, resource_group, compute_client):
+    instance = compute_client.virtual_machines.instance_view(
+        resource_group_name=resource_group, vm_name=vm.name).as_dict()
+    return _get_power_state(
+        [status["code"] for status in instance["statuses"]])
+
+
+def _get_node_nic_name(vm):
     nic_id = vm.network_profile.network_interfaces[0].id
-    metadata["nic_name"] = nic_id.split("/")[-1]
-    nic = network_client.network_interfaces.get(
-        resource_group_name=resource_group,
-        network_interface_name=metadata["nic_name"])
-    ip_config = nic.ip_configurations[0]
+    return nic_id.split("/")[-1]
 
+
+def _get_node_network_of(nic, get_public_ip):
+    ip_config = nic.ip_configurations[0]
+    network = {"nic_name": nic.name}
     public_ip_address = ip_config.public_ip_address
     if public_ip_address is not None:
         public_ip_id = public_ip_address.id
-        metadata["public_ip_name"] = public_ip_id.split("/")[-1]
-        public_ip = network_client.public_ip_addresses.get(
-            resource_group_name=resource_group,
-            public_ip_address_name=metadata["public_ip_name"])
-        metadata["external_ip"] = public_ip.ip_address
+        network["public_ip_name"] = public_ip_id.split("/")[-1]
+        public_ip = get_public_ip(public_ip_id)
+        network["external_ip"] = public_ip.ip_address if public_ip else None
     else:
-        metadata["external_ip"] = None
+        network["external_ip"] = None
 
-    metadata["internal_ip"] = ip_config.private_ip_address
+    network["internal_ip"] = ip_config.private_ip_address
+    return network
 
-    # get vmSize
-    metadata["vm_size"] = vm.hardware_profile.vm_size
 
-    return metadata
+def _get_node_network(vm, resource_group, network_client):
+    nic = network_client.network_interfaces.get(
+        resource_group_name=resource_group,
+        network_interface_name=_get_node_nic_name(vm))
+
+    def get_public_ip(public_ip_id):
+        return network_client.public_ip_addresses.get(
+            resource_group_name=resource_group,
+            public_ip_address_name=public_ip_id.split("/")[-1])
+
+    return _get_node_network_of(nic, get_public_ip)
 
 
 def get_workspace_head_nodes(provider_config, workspace_name):
@@ -2,6 +2,7 @@ import copy
 import json
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from threading import RLock
 from uuid import uuid4
@@ -19,17 +20,22 @@ from cloudtik.core.tags import CLOUDTIK_TAG_CLUSTER_NAME, CLOUDTIK_TAG_NODE_NAME
 
 from cloudtik.providers._private._azure.config import (AZURE_MSI_NAME,
                                                        verify_azure_cloud_storage, bootstrap_azure,
-                                                       _extract_metadata_for_node, bootstrap_azure_for_api,
-                                                       post_prepare_azure, with_azure_environment_variables)
+                                                       bootstrap_azure_for_api,
+                                                       post_prepare_azure, with_azure_environment_variables,
+                                                       _get_power_state, _get_node_status, _get_node_network,
+                                                       _get_node_network_of)
 
 from cloudtik.providers._private._azure.utils import (_get_node_info, get_azure_sdk_function,
                                                       get_credential, get_azure_cloud_storage_config,
                                                       get_default_azure_cloud_storage)
-from cloudtik.providers._private.utils import validate_config_dict
+from cloudtik.providers._private.utils import validate_config_dict, terminate_nodes_concurrently
 
 VM_NAME_MAX_LEN = 64
 VM_NAME_UUID_LEN = 8
 RESOURCE_CHECK_TIME = 20
+# Max number of threads to get the metadata of the nodes one by one
+# for the nodes which are not resolved by the bulk listing
+METADATA_MAX_WORKERS = 8
 
 logger = logging.getLogger(__name__)
 azure_logger = logging.getLogger(
@@ -73,8 +79,16 @@ class AzureNodeProvider(NodeProvider):
 
         self.lock = RLock()
 
+        # Whether to list the power states of the vms of the whole
+        # subscription in one call instead of getting them one by one
+        self.list_subscription_power_states = provider_config.get(
+            "list_subscription_power_states", True)
+
         # cache node objects
         self.cached_nodes = {}
+        # cache the network data (nic, ips) of the nodes by node name.
+        # These never change for the lifetime of a node
+        self.cached_node_networks = {}
 
     def with_environment_variables(self, node_type_config: Dict[str, Any], node_id: str):
         return with_azure_environment_variables(self.provider_config, node_type_config, node_id)
@@ -87,20 +101,129 @@ class AzureNodeProvider(NodeProvider):
                     return False
             return True
 
-        vms = self.compute_client.virtual_machines.list(
-            resource_group_name=self.provider_config["resource_group"])
+        vms = list(self.compute_client.virtual_machines.list(
+            resource_group_name=self.provider_config["resource_group"]))
+        self._prune_node_networks(vms)
 
-        nodes = [self._extract_metadata(vm) for vm in filter(match_tags, vms)]
+        nodes = self._extract_metadata_of_vms(list(filter(match_tags, vms)))
         self.cached_nodes = {node["name"]: node for node in nodes}
         return self.cached_nodes
 
-    def _extract_metadata(self, vm):
-        return _extract_metadata_for_node(
-            vm,
-            resource_group=self.provider_config["resource_group"],
-            compute_client=self.compute_client,
-            network_client=self.network_client
-        )
+    def _extract_metadata_of_vms(self, vms):
+        """Get the metadata of the vms in bulk.
+
+        The power states are listed with the instance views in one call
+        unless disabled by the list_subscription_power_states provider
+        config, and the network data of the vms not cached yet are joined from
+        one listing of the NICs and public IPs of the resource group.
+        The vms not resolved by the bulk listing are resolved one by one
+        with a bounded thread pool.
+        """
+        if not vms:
+            return []
+        resource_group = self.provider_config["resource_group"]
+        power_states = (self._list_power_states()
+                        if self.list_subscription_power_states else {})
+        if any(vm.name not in self.cached_node_networks for vm in vms):
+            self._list_node_networks(vms)
+
+        def extract_metadata(vm):
+            metadata = {"name": vm.name, "tags": vm.tags,
+                        "vm_size": vm.hardware_profile.vm_size}
+            status = power_states.get(vm.id.lower())
+            if status is None:
+                status = _get_node_status(
+                    vm, resource_group, self.compute_client)
+            metadata["status"] = status
+
+            network = self.cached_node_networks.get(vm.name)
+            if network is None:
+                network = _get_node_network(
+                    vm, resource_group, self.network_client)
+                self._cache_node_network(vm.name, network)
+            metadata.update(network)
+            return metadata
+
+        unresolved = [
+            vm for vm in vms
+            if vm.id.lower() not in power_states
+            or vm.name not in self.cached_node_networks]
+        if len(unresolved) > 1:
+            with ThreadPoolExecutor(
+                    max_workers=min(METADATA_MAX_WORKERS, len(unresolved))) as executor:
+                resolved = dict(zip(
+                    [vm.name for vm in unresolved],
+                    executor.map(extract_metadata, unresolved)))
+        else:
+            resolved = {}
+        return [
+            resolved[vm.name] if vm.name in resolved else extract_metadata(vm)
+            for vm in vms]
+
+    def _list_power_states(self):
+        """List the power states of the vms in the resource group.
+
+        The instance views can be listed only for the whole subscription,
+        so the vms of the other resource groups are listed and dropped too.
+        It saves a call for each vm but the listing grows with the number
+        of vms in the subscription. For a subscription with many more vms
+        than the cluster, set list_subscription_power_states to false in
+        the provider config to get the power states one by one.
+        """
+        resource_group_path = "/resourcegroups/{}/".format(
+            self.provider_config["resource_group"].lower())
+        try:
+            power_states = {}
+            for vm in self.compute_client.virtual_machines.list_all(
+                    status_only="true"):
+                vm_id = vm.id.lower()
+                if resource_group_path not in vm_id or vm.instance_view is None:
+                    continue
+                power_states[vm_id] = _get_power_state(
+                    [status.code for status in vm.instance_view.statuses or []])
+            return power_states
+        except Exception as e:
+            logger.warning(
+                "Failed to list the power states of the virtual machines. "
+                "Getting them one by one: {}".format(e))
+            return {}
+
+    def _list_node_networks(self, vms):
+        resource_group = self.provider_config["resource_group"]
+        nics = {
+            nic.id.lower(): nic
+            for nic in self.network_client.network_interfaces.list(
+                resource_group_name=resource_group)}
+        public_ips = {
+            public_ip.id.lower(): public_ip
+            for public_ip in self.network_client.public_ip_addresses.list(
+                resource_group_name=resource_group)}
+
+        def get_public_ip(public_ip_id):
+            return public_ips.get(public_ip_id.lower())
+
+        for vm in vms:
+            if vm.name in self.cached_node_networks:
+                continue
+            nic_id = vm.network_profile.network_interfaces[0].id
+            nic = nics.get(nic_id.lower())
+            if nic is None:
+                continue
+            self._cache_node_network(
+                vm.name, _get_node_network_of(nic, get_public_ip))
+
+    def _cache_node_network(self, node_id, network):
+        # Don't cache the ips which are not allocated yet
+        if network["internal_ip"] is None or (
+                "public_ip_name" in network and network["external_ip"] is None):
+            return
+        self.cached_node_networks[node_id] = network
+
+    def _prune_node_networks(self, vms):
+        vm_names = {vm.name for vm in vms}
+        for node_id in list(self.cached_node_networks):
+            if node_id not in vm_names:
+                self.cached_node_networks.pop(node_id, None)
 
     def non_terminated_nodes(self, tag_filters):
         """Return a list of node ids filtered by the specified tags dict.
@@ -218,7 +341,6 @@ class AzureNodeProvider(NodeProvider):
         """Terminates the specified node. This will delete the VM and
            associated resources (NIC, IP, Storage) for the specified node."""
 
-        resource_group = self.provider_config["resource_group"]
         try:
             # get metadata for node
             metadata = self._get_node(node_id)
@@ -226,6 +348,31 @@ class AzureNodeProvider(NodeProvider):
             # node no longer exists
             return
 
+        self._delete_node(node_id, metadata)
+
+    def terminate_nodes(self, node_ids):
+        """Terminates the nodes concurrently with a bounded thread pool.
+           The metadata of the nodes is listed once for all the nodes."""
+        if not node_ids:
+            return None
+
+        with self.lock:
+            # Take a snapshot as the cache is replaced by other listings
+            nodes = dict(self._get_filtered_nodes({}))
+
+        def terminate_node(node_id):
+            metadata = nodes.get(node_id)
+            if metadata is None:
+                # node no longer exists
+                return
+            self._delete_node(node_id, metadata)
+
+        terminate_nodes_concurrently(terminate_node, node_ids)
+        return None
+
+    def _delete_node(self, node_id, metadata):
+        resource_group = self.provider_config["resource_group"]
+
         # TODO: deallocate instead of delete to allow possible reuse
         # self.compute_client.virtual_machines.deallocate(
         #   resource_group_name=resource_group,
@@ -281,6 +428,9 @@ class AzureNodeProvider(NodeProvider):
                     else:
                         cli_logger.error("Failed to delete public ip address. {}", str(e))
 
+        with self.lock:
+            self.cached_node_networks.pop(node_id, None)
+
         # delete disks
         for disk in disks:
             try:
@@ -291,8 +441,9 @@ class AzureNodeProvider(NodeProvider):
                 logger.warning("Failed to delete disk: {}".format(e))
 
     def _get_node(self, node_id):
-        self._get_filtered_nodes({})  # Side effect: updates cache
-        return self.cached_nodes[node_id]
+        with self.lock:
+            self._get_filtered_nodes({})  # Side effect: updates cache
+            return self.cached_nodes[node_id]
 
     def _get_cached_node(self, node_id):
         if node_id in self.cached_nodes:
@@ -22,67 +22,105 @@ from cloudtik.providers._private._kubernetes.config import bootstrap_kubernetes,
     bootstrap_kubernetes_for_api, cleanup_kubernetes_cluster, with_kubernetes_environment_variables, get_head_hostname, \
     get_worker_hostname, prepare_kubernetes_config, get_head_external_service_address, _get_node_info, \
     _get_node_public_ip, get_default_kubernetes_cloud_storage
+from cloudtik.providers._private._kubernetes.pod_informer import PodInformer, KUBERNETES_POD_INFORMER
 from cloudtik.providers._private._kubernetes.utils import to_label_selector, \
     create_and_configure_pvc_for_pod, delete_persistent_volume_claims, get_pod_persistent_volume_claims, \
     delete_persistent_volume_claims_by_name
-from cloudtik.providers._private.utils import validate_config_dict
+from cloudtik.providers._private.utils import validate_config_dict, terminate_nodes_concurrently
 
 logger = logging.getLogger(__name__)
 
 MAX_TAG_RETRIES = 3
 DELAY_BEFORE_TAG_RETRY = .5
 
+# Unfortunately there is no OR operator in field selectors, so we
+# have to match on NOT any of the other phases.
+TERMINATED_POD_PHASES = ["Failed", "Unknown", "Succeeded", "Terminating"]
+
+
+def _is_pod_non_terminated(pod):
+    # Don't return pods marked for deletion,
+    # i.e. pods with non-null metadata.DeletionTimestamp.
+    return (pod.status.phase not in TERMINATED_POD_PHASES
+            and pod.metadata.deletion_timestamp is None)
+
+
+def _is_pod_labels_matched(pod, tag_filters):
+    labels = pod.metadata.labels or {}
+    for k, v in tag_filters.items():
+        if labels.get(k) != v:
+            return False
+    return True
+
 
 class KubernetesNodeProvider(NodeProvider):
     def __init__(self, provider_config, cluster_name):
         NodeProvider.__init__(self, provider_config, cluster_name)
         self.cluster_name = cluster_name
         self.namespace = provider_config["namespace"]
+        # The pods of the cluster are cached and watched for changes
+        # so that reads of the pods don't go to the API server each time
+        self.pod_informer = None
+        if KUBERNETES_POD_INFORMER:
+            self.pod_informer = PodInformer(
+                self.namespace,
+                to_label_selector({CLOUDTIK_TAG_CLUSTER_NAME: cluster_name}))
 
     def with_environment_variables(self, node_type_config: Dict[str, Any], node_id: str):
         """Export necessary environment variables for running node commands"""
         return with_kubernetes_environment_variables(self.provider_config, node_type_config, node_id)
 
+    def _get_pod(self, node_id):
+        if self.pod_informer is not None:
+            pod = self.pod_informer.get_pod(node_id)
+            if pod is not None:
+                return pod
+        # Not watched yet or a pod just created
+        return core_api().read_namespaced_pod(node_id, self.namespace)
+
     def non_terminated_nodes(self, tag_filters):
+        tag_filters[CLOUDTIK_TAG_CLUSTER_NAME] = self.cluster_name
+        if self.pod_informer is not None:
+            self.pod_informer.start()
+            pods = self.pod_informer.pods()
+            if pods is not None:
+                return [
+                    pod.metadata.name for pod in pods
+                    if _is_pod_non_terminated(pod) and _is_pod_labels_matched(
+                        pod, tag_filters)
+                ]
+
         # Match pods that are in the 'Pending' or 'Running' phase.
-        # Unfortunately there is no OR operator in field selectors, so we
-        # have to match on NOT any of the other phases.
         field_selector = ",".join([
-            "status.phase!=Failed",
-            "status.phase!=Unknown",
-            "status.phase!=Succeeded",
-            "status.phase!=Terminating",
+            "status.phase!={}".format(phase) for phase in TERMINATED_POD_PHASES
         ])
 
-        tag_filters[CLOUDTIK_TAG_CLUSTER_NAME] = self.cluster_name
         label_selector = to_label_selector(tag_filters)
         pod_list = core_api().list_namespaced_pod(
             self.namespace,
             field_selector=field_selector,
             label_selector=label_selector)
 
-        # Don't return pods marked for deletion,
-        # i.e. pods with non-null metadata.DeletionTimestamp.
         return [
             pod.metadata.name for pod in pod_list.items
-            if pod.metadata.deletion_timestamp is None
+            if _is_pod_non_terminated(pod)
         ]
 
     def get_node_info(self, node_id):
-        pod = core_api().read_namespaced_pod(node_id, self.namespace)
+        pod = self._get_pod(node_id)
         return _get_node_info(pod, self.provider_config, self.namespace, self.cluster_name)
 
     def is_running(self, node_id):
-        pod = core_api().read_namespaced_pod(node_id, self.namespace)
+        pod = self._get_pod(node_id)
         return pod.status.phase == "Running"
 
     def is_terminated(self, node_id):
-        pod = core_api().read_namespaced_pod(node_id, self.namespace)
+        pod = self._get_pod(node_id)
         return pod.status.phase not in ["Running", "Pending"]
 
     def node_tags(self, node_id):
-        pod = core_api().read_namespaced_pod(node_id, self.namespace)
-        return pod.metadata.labels
+        pod = self._get_pod(node_id)
+        return dict(pod.metadata.labels or {})
 
     def external_ip(self, node_id):
         if _is_use_internal_ip(self.provider_config):
@@ -94,7 +132,7 @@ class KubernetesNodeProvider(NodeProvider):
         return _get_node_public_ip(tags, self.namespace, self.cluster_name)
 
     def internal_ip(self, node_id):
-        pod = core_api().read_namespaced_pod(node_id, self.namespace)
+        pod = self._get_pod(node_id)
         return pod.status.pod_ip
 
     def get_node_id(self, ip_address, use_internal_ip=True) -> str:
@@ -122,6 +160,8 @@ class KubernetesNodeProvider(NodeProvider):
         pod = core_api().read_namespaced_pod(node_id, self.namespace)
         pod.metadata.labels.update(tags)
         core_api().patch_namespaced_pod(node_id, self.namespace, pod)
+        if self.pod_informer is not None:
+            self.pod_informer.update_labels(node_id, tags)
 
     def create_node(self, node_config, tags, count):
         conf = copy.deepcopy(node_config)
@@ -195,6 +235,8 @@ class KubernetesNodeProvider(NodeProvider):
         logger.debug(log_prefix + "Calling delete_namespaced_pod")
         try:
             core_api().delete_namespaced_pod(node_id, self.namespace)
+            if self.pod_informer is not None:
+                self.pod_informer.mark_deleting(node_id)
         except ApiException as e:
             if e.status == 404:
                 logger.warning(log_prefix + f"Tried to delete pod {node_id},"
@@ -222,8 +264,8 @@ class KubernetesNodeProvider(NodeProvider):
             pass
 
     def terminate_nodes(self, node_ids):
-        for node_id in node_ids:
-            self.terminate_node(node_id)
+        # The pods, PVCs and services are deleted concurrently
+        terminate_nodes_concurrently(self.terminate_node, node_ids)
 
     def get_command_executor(self,
                              call_context: CallContext,
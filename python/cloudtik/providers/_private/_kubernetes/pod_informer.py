@@ -0,0 +1,205 @@
+import copy
+import datetime
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+from cloudtik.core._private.constants import env_bool, env_integer
+from cloudtik.providers._private._kubernetes import core_api, log_prefix
+
+logger = logging.getLogger(__name__)
+
+# Whether the Kubernetes node provider serves the pod reads from a local
+# cache which is kept up to date by watching the pods of the cluster
+KUBERNETES_POD_INFORMER = env_bool("CLOUDTIK_KUBERNETES_POD_INFORMER", True)
+# Interval to list all the pods again to correct any drift of the cache
+KUBERNETES_POD_INFORMER_RESYNC_INTERVAL_S = env_integer(
+    "CLOUDTIK_KUBERNETES_POD_INFORMER_RESYNC_INTERVAL_S", 300)
+KUBERNETES_POD_INFORMER_RETRY_DELAY_S = 5
+
+HTTP_GONE = 410
+
+
+class PodInformer:
+    """A local cache of the pods matching a label selector.
+
+    The cache is filled by a LIST of the pods and kept up to date by a
+    WATCH started from the resource version of the list. The pods are listed
+    again when the resource version is too old to resume the watch, when the
+    watch fails and periodically every resync interval.
+
+    The reads return None when the cache is not synced so that the callers
+    can fall back to read from the API server.
+
+    The labels updated ahead of the watch events are kept over the pods
+    listed or watched until the pods show the labels, so that a delayed
+    event doesn't revert the labels.
+    """
+
+    def __init__(self, namespace: str, label_selector: str,
+                 resync_interval_s: int = KUBERNETES_POD_INFORMER_RESYNC_INTERVAL_S):
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.resync_interval_s = resync_interval_s
+        self._lock = threading.Lock()
+        self._pods = {}
+        # The labels updated but not shown by the listed or watched pods yet
+        self._pending_labels: Dict[str, Dict[str, str]] = {}
+        self._resource_version = None
+        self._last_resync_time = 0
+        self._synced = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def synced(self) -> bool:
+        return self._synced
+
+    @property
+    def resource_version(self) -> Optional[str]:
+        return self._resource_version
+
+    def start(self):
+        """List the pods and start watching in the background.
+        It is a no-op if already started."""
+        if self._thread is not None:
+            return
+        self.resync()
+        self._thread = threading.Thread(
+            target=self._run, name="PodInformer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def resync(self):
+        pod_list = core_api().list_namespaced_pod(
+            self.namespace, label_selector=self.label_selector)
+        with self._lock:
+            self._pods = {pod.metadata.name: self._with_pending_labels(pod)
+                          for pod in pod_list.items}
+            for name in list(self._pending_labels):
+                if name not in self._pods:
+                    del self._pending_labels[name]
+            self._resource_version = pod_list.metadata.resource_version
+            self._last_resync_time = time.time()
+            self._synced = True
+
+    def get_pod(self, name: str):
+        """The cached pod or None if not found or the cache is not synced."""
+        with self._lock:
+            if not self._synced:
+                return None
+            return self._pods.get(name)
+
+    def pods(self) -> Optional[List]:
+        """All the cached pods or None if the cache is not synced."""
+        with self._lock:
+            if not self._synced:
+                return None
+            return list(self._pods.values())
+
+    def update_labels(self, name: str, labels: Dict[str, str]):
+        """Update the labels of the cached pod ahead of the watch event."""
+        with self._lock:
+            pod = self._pods.get(name)
+            if pod is None:
+                return
+            self._pending_labels[name] = {
+                **self._pending_labels.get(name, {}), **labels}
+            self._pods[name] = self._copy_with_labels(pod, labels)
+
+    def mark_deleting(self, name: str):
+        """Mark the cached pod as being deleted ahead of the watch event."""
+        with self._lock:
+            pod = self._pods.get(name)
+            if pod is None or pod.metadata.deletion_timestamp is not None:
+                return
+            pod = copy.copy(pod)
+            pod.metadata = copy.copy(pod.metadata)
+            pod.metadata.deletion_timestamp = datetime.datetime.now(
+                datetime.timezone.utc)
+            self._pods[name] = pod
+
+    def handle_event(self, event):
+        event_type = event["type"]
+        pod = event["object"]
+        if event_type == "ERROR":
+            # The raw object is the status of the error
+            status = pod if isinstance(pod, dict) else {}
+            raise ApiException(
+                status=status.get("code"), reason=status.get("message"))
+
+        with self._lock:
+            if event_type in ["ADDED", "MODIFIED"]:
+                self._pods[pod.metadata.name] = self._with_pending_labels(pod)
+            elif event_type == "DELETED":
+                self._pods.pop(pod.metadata.name, None)
+                self._pending_labels.pop(pod.metadata.name, None)
+            # BOOKMARK only advances the resource version
+            self._resource_version = pod.metadata.resource_version
+
+    def _with_pending_labels(self, pod):
+        # Called with the lock held
+        name = pod.metadata.name
+        pending_labels = self._pending_labels.get(name)
+        if pending_labels is None:
+            return pod
+        labels = pod.metadata.labels or {}
+        if all(labels.get(key) == value
+               for key, value in pending_labels.items()):
+            # The pod shows the labels updated
+            del self._pending_labels[name]
+            return pod
+        return self._copy_with_labels(pod, pending_labels)
+
+    @staticmethod
+    def _copy_with_labels(pod, labels: Dict[str, str]):
+        pod = copy.copy(pod)
+        pod.metadata = copy.copy(pod.metadata)
+        pod.metadata.labels = {**(pod.metadata.labels or {}), **labels}
+        return pod
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if time.time() - self._last_resync_time >= self.resync_interval_s:
+                    self.resync()
+                self._watch()
+            except ApiException as e:
+                if e.status == HTTP_GONE:
+                    logger.info(log_prefix + "Pod watch expired. Listing the pods again.")
+                    self._last_resync_time = 0
+                    continue
+                self._watch_failed(e)
+            except Exception as e:
+                self._watch_failed(e)
+
+    def _watch_failed(self, e):
+        logger.warning(log_prefix + "Error watching the pods: {}. "
+                       "Reading from the API server until listed again.".format(e))
+        with self._lock:
+            self._synced = False
+        self._last_resync_time = 0
+        self._stop_event.wait(KUBERNETES_POD_INFORMER_RETRY_DELAY_S)
+
+    def _watch(self):
+        # Watch until it is the time to resync
+        timeout_seconds = max(
+            int(self.resync_interval_s - (time.time() - self._last_resync_time)), 1)
+        w = watch.Watch()
+        for event in w.stream(
+                core_api().list_namespaced_pod,
+                self.namespace,
+                label_selector=self.label_selector,
+                resource_version=self._resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=timeout_seconds):
+            self.handle_event(event)
+            if self._stop_event.is_set():
+                w.stop()
+                break
@@ -29,6 +29,7 @@ import logging
 import abc
 import time
 import re
+from threading import RLock
 from uuid import uuid4
 from collections import UserDict
 from enum import Enum
@@ -49,6 +50,8 @@ MAX_POLLS = 12
 # TPU deletion uses MAX_POLLS
 MAX_POLLS_TPU = MAX_POLLS * 8
 POLL_INTERVAL = 5
+# The max number of calls in a batch HTTP request
+MAX_BATCH_REQUESTS = 100
 
 
 def _retry_on_exception(exception: Union[Exception, Tuple[Exception]],
@@ -202,11 +205,14 @@ class GCPResource(metaclass=abc.ABCMeta):
     """Abstraction around compute and TPU resources"""
 
     def __init__(self, resource: Resource, project_id: str,
-                 availability_zone: str, cluster_name: str) -> None:
+                 availability_zone: str, cluster_name: str,
+                 lock: Optional[RLock] = None) -> None:
         self.resource = resource
         self.project_id = project_id
         self.availability_zone = availability_zone
         self.cluster_name = cluster_name
+        # The lock held for the API calls of the resource client
+        self.lock = lock if lock is not None else RLock()
 
     @abc.abstractmethod
     def wait_for_operation(self,
@@ -216,6 +222,18 @@ class GCPResource(metaclass=abc.ABCMeta):
         """Waits a preset amount of time for operation to complete."""
         return None
 
+    def wait_for_operations(self,
+                            operations: List[dict],
+                            max_polls: int = MAX_POLLS,
+                            poll_interval: int = POLL_INTERVAL) -> List[dict]:
+        """Waits for multiple operations to complete.
+
+        Returns the results in the order of the operations.
+        """
+        return [self.wait_for_operation(
+            operation, max_polls=max_polls, poll_interval=poll_interval)
+            for operation in operations]
+
     @abc.abstractmethod
     def list_instances(
             self, label_filters: Optional[dict] = None) -> List["GCPNode"]:
@@ -242,6 +260,41 @@ class GCPResource(metaclass=abc.ABCMeta):
         Completely replaces the labels dictionary."""
         return
 
+    def get_instances(self, node_ids: List[str]
+                      ) -> Dict[str, Union["GCPNode", Exception]]:
+        """Returns a dict of node id to the instance or the exception."""
+        instances = {}
+        for node_id in node_ids:
+            try:
+                instances[node_id] = self.get_instance(node_id)
+            except Exception as e:
+                instances[node_id] = e
+        return instances
+
+    def set_labels_of_instances(
+            self, node_labels: Dict[str, Tuple["GCPNode", dict]]
+    ) -> Dict[str, Exception]:
+        """Sets labels on multiple instances and waits for the operations.
+
+        An instance failed to set labels doesn't stop the others.
+        Returns a dict of node id to the exception for the failed instances.
+        """
+        failed_nodes = {}
+        operations = {}
+        for node_id, (node, labels) in node_labels.items():
+            try:
+                operations[node_id] = self.set_labels(
+                    node, labels, wait_for_operation=False)
+            except Exception as e:
+                failed_nodes[node_id] = e
+
+        for node_id, operation in operations.items():
+            try:
+                self.wait_for_operation(operation, max_polls=MAX_POLLS)
+            except Exception as e:
+                failed_nodes[node_id] = e
+        return failed_nodes
+
     @abc.abstractmethod
     def create_instance(self,
                         base_config: dict,
@@ -270,8 +323,10 @@ class GCPResource(metaclass=abc.ABCMeta):
         ]
 
         if wait_for_operation:
-            results = [(self.wait_for_operation(operation), node_name)
-                       for operation, node_name in operations]
+            results = list(zip(
+                self.wait_for_operations(
+                    [operation for operation, _ in operations]),
+                [node_name for _, node_name in operations]))
         else:
             results = operations
 
@@ -283,6 +338,28 @@ class GCPResource(metaclass=abc.ABCMeta):
         """Deletes an instance and returns result."""
         return
 
+    def delete_instances(self, node_ids: List[str]) -> Dict[str, Exception]:
+        """Deletes multiple instances and waits for the operations together.
+
+        An instance failed to delete doesn't stop deleting the others.
+        Returns a dict of node id to the exception for the failed instances.
+        """
+        failed_nodes = {}
+        operations = {}
+        for node_id in node_ids:
+            try:
+                operations[node_id] = self.delete_instance(
+                    node_id, wait_for_operation=False)
+            except Exception as e:
+                failed_nodes[node_id] = e
+
+        for node_id, operation in operations.items():
+            try:
+                self.wait_for_operation(operation, max_polls=MAX_POLLS)
+            except Exception as e:
+                failed_nodes[node_id] = e
+        return failed_nodes
+
     @abc.abstractmethod
     def from_instance(self, instance) -> "GCPNode":
         """Construct an instance."""
@@ -317,6 +394,87 @@ class GCPCompute(GCPResource):
 
         return result
 
+    def wait_for_operations(self,
+                            operations: List[dict],
+                            max_polls: int = MAX_POLLS,
+                            poll_interval: int = POLL_INTERVAL) -> List[dict]:
+        """Poll for multiple compute zone operations until finished.
+
+        The pending operations are polled together with batch requests.
+        """
+        results = self._poll_operations(
+            operations, max_polls=max_polls, poll_interval=poll_interval)
+        for operation in operations:
+            result = results[operation["name"]]
+            if isinstance(result, Exception):
+                raise result
+        return [results[operation["name"]] for operation in operations]
+
+    def _poll_operations(self,
+                         operations: List[dict],
+                         max_polls: int = MAX_POLLS,
+                         poll_interval: int = POLL_INTERVAL
+                         ) -> Dict[str, Union[dict, Exception]]:
+        """Poll for the operations together until all finished or failed.
+
+        Returns a dict of operation name to the result or the exception
+        of the operation.
+        """
+        logger.debug("wait_for_compute_zone_operations: "
+                     f"Waiting for {len(operations)} operations to finish...")
+
+        results = {}
+        pending = [operation["name"] for operation in operations]
+        for _ in range(max_polls):
+            if not pending:
+                break
+
+            responses = self._execute_batch([
+                (name, self.resource.zoneOperations().get(
+                    project=self.project_id,
+                    operation=name,
+                    zone=self.availability_zone))
+                for name in pending])
+            for name in pending:
+                result, exception = responses[name]
+                if exception is not None:
+                    results[name] = exception
+                elif "error" in result:
+                    results[name] = Exception(result["error"])
+                else:
+                    results[name] = result
+
+            pending = [name for name in pending
+                       if isinstance(results[name], dict)
+                       and results[name]["status"] != "DONE"]
+            if not pending:
+                logger.debug("wait_for_compute_zone_operations: "
+                             f"{len(operations)} operations finished.")
+                break
+
+            time.sleep(poll_interval)
+
+        return results
+
+    def _execute_batch(self, requests: List[Tuple[str, Any]]
+                       ) -> Dict[str, Tuple[Any, Optional[Exception]]]:
+        """Execute the requests with batch requests.
+
+        Returns a dict of request id to a tuple of (response, exception).
+        """
+        responses = {}
+
+        def callback(request_id, response, exception):
+            responses[request_id] = (response, exception)
+
+        for i in range(0, len(requests), MAX_BATCH_REQUESTS):
+            batch = self.resource.new_batch_http_request(callback=callback)
+            for request_id, request in requests[i:i + MAX_BATCH_REQUESTS]:
+                batch.add(request, request_id=request_id)
+            with self.lock:
+                batch.execute()
+        return responses
+
     def list_instances(self, label_filters: Optional[dict] = None
                        ) -> List[GCPComputeNode]:
         label_filters = label_filters or {}
@@ -367,20 +525,30 @@ class GCPCompute(GCPResource):
 
         return GCPComputeNode(instance, self)
 
+    def get_instances(self, node_ids: List[str]
+                      ) -> Dict[str, Union[GCPComputeNode, Exception]]:
+        """Returns the instances got with batch requests."""
+        responses = self._execute_batch([
+            (node_id, self.resource.instances().get(
+                project=self.project_id,
+                zone=self.availability_zone,
+                instance=node_id))
+            for node_id in node_ids])
+
+        instances = {}
+        for node_id in node_ids:
+            instance, exception = responses[node_id]
+            if exception is not None:
+                instances[node_id] = exception
+            else:
+                instances[node_id] = GCPComputeNode(instance, self)
+        return instances
+
     def set_labels(self,
                    node: GCPComputeNode,
                    labels: dict,
                    wait_for_operation: bool = True) -> dict:
-        body = {
-            "labels": dict(node["labels"], **labels),
-            "labelFingerprint": node["labelFingerprint"]
-        }
-        node_id = node["name"]
-        operation = self.resource.instances().setLabels(
-            project=self.project_id,
-            zone=self.availability_zone,
-            instance=node_id,
-            body=body).execute()
+        operation = self._get_set_labels_request(node, labels).execute()
 
         if wait_for_operation:
             result = self.wait_for_operation(operation)
@@ -389,6 +557,46 @@ class GCPCompute(GCPResource):
 
         return result
 
+    def set_labels_of_instances(
+            self, node_labels: Dict[str, Tuple[GCPComputeNode, dict]]
+    ) -> Dict[str, Exception]:
+        """Sets labels on multiple instances with batch requests.
+
+        The set labels operations are polled together.
+        """
+        responses = self._execute_batch([
+            (node_id, self._get_set_labels_request(node, labels))
+            for node_id, (node, labels) in node_labels.items()])
+
+        failed_nodes = {}
+        operations = {}
+        for node_id in node_labels:
+            operation, exception = responses[node_id]
+            if exception is not None:
+                failed_nodes[node_id] = exception
+            else:
+                operations[node_id] = operation
+
+        results = self._poll_operations(list(operations.values()))
+        for node_id, operation in operations.items():
+            result = results[operation["name"]]
+            if isinstance(result, Exception):
+                failed_nodes[node_id] = result
+        return failed_nodes
+
+    def _get_set_labels_request(self,
+                                node: GCPComputeNode,
+                                labels: dict) -> Any:
+        body = {
+            "labels": dict(node["labels"], **labels),
+            "labelFingerprint": node["labelFingerprint"]
+        }
+        return self.resource.instances().setLabels(
+            project=self.project_id,
+            zone=self.availability_zone,
+            instance=node["name"],
+            body=body)
+
     def _convert_resources_to_urls(
             self, configuration_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Ensures that resources are in their full URL form.
@@ -428,7 +636,54 @@ class GCPCompute(GCPResource):
                         base_config: dict,
                         labels: dict,
                         wait_for_operation: bool = True) -> Tuple[dict, str]:
+        request, name = self._get_insert_request(base_config, labels)
+        operation = request.execute()
+
+        if wait_for_operation:
+            result = self.wait_for_operation(operation)
+        else:
+            result = operation
+
+        return result, name
+
+    def create_instances(
+            self,
+            base_config: dict,
+            labels: dict,
+            count: int,
+            wait_for_operation: bool = True) -> List[Tuple[dict, str]]:
+        """Creates multiple instances with batch requests.
+
+        The instances are inserted with batch requests and the insert
+        operations are polled together.
+        """
+        requests = []
+        for _ in range(count):
+            request, name = self._get_insert_request(base_config, labels)
+            requests.append((name, request))
+        responses = self._execute_batch(requests)
+
+        operations = []
+        for name, _ in requests:
+            operation, exception = responses[name]
+            if exception is not None:
+                raise exception
+            operations.append((operation, name))
+
+        if wait_for_operation:
+            results = list(zip(
+                self.wait_for_operations(
+                    [operation for operation, _ in operations]),
+                [node_name for _, node_name in operations]))
+        else:
+            results = operations
 
+        return results
+
+    def _get_insert_request(self,
+                            base_config: dict,
+                            labels: dict) -> Tuple[Any, str]:
+        """Returns a tuple of (insert request, node_name)."""
         config = self._convert_resources_to_urls(base_config)
         # removing TPU-specific default key set in config.py
         config.pop("networkConfig", None)
@@ -458,18 +713,12 @@ class GCPCompute(GCPResource):
         # https://cloud.google.com/compute/docs/reference/rest/v1/instances/insert
         source_instance_template = config.pop("sourceInstanceTemplate", None)
 
-        operation = self.resource.instances().insert(
+        request = self.resource.instances().insert(
             project=self.project_id,
             zone=self.availability_zone,
             sourceInstanceTemplate=source_instance_template,
-            body=config).execute()
-
-        if wait_for_operation:
-            result = self.wait_for_operation(operation)
-        else:
-            result = operation
-
-        return result, name
+            body=config)
+        return request, name
 
     def delete_instance(self, node_id: str,
                         wait_for_operation: bool = True) -> dict:
@@ -486,6 +735,34 @@ class GCPCompute(GCPResource):
 
         return result
 
+    def delete_instances(self, node_ids: List[str]) -> Dict[str, Exception]:
+        """Deletes multiple instances with batch requests.
+
+        The delete operations are polled together.
+        """
+        responses = self._execute_batch([
+            (node_id, self.resource.instances().delete(
+                project=self.project_id,
+                zone=self.availability_zone,
+                instance=node_id))
+            for node_id in node_ids])
+
+        failed_nodes = {}
+        operations = {}
+        for node_id in node_ids:
+            operation, exception = responses[node_id]
+            if exception is not None:
+                failed_nodes[node_id] = exception
+            else:
+                operations[node_id] = operation
+
+        results = self._poll_operations(list(operations.values()))
+        for node_id, operation in operations.items():
+            result = results[operation["name"]]
+            if isinstance(result, Exception):
+                failed_nodes[node_id] = result
+        return failed_nodes
+
     def from_instance(self, instance) -> GCPComputeNode:
         return GCPComputeNode(instance, self)
 
@@ -1,6 +1,8 @@
-from typing import Any, Dict
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
 from functools import wraps
 from threading import RLock
+import threading
 import time
 import logging
 
@@ -20,10 +22,12 @@ from cloudtik.providers._private.gcp.node import (
 
 from cloudtik.providers._private.gcp.utils import _get_node_info, \
     construct_clients_from_provider_config, get_node_type, get_gcp_cloud_storage_config, get_default_gcp_cloud_storage
-from cloudtik.providers._private.utils import validate_config_dict
+from cloudtik.providers._private.utils import validate_config_dict, report_failed_terminations
 
 logger = logging.getLogger(__name__)
 
+TAG_BATCH_DELAY = 1
+
 
 def _retry(method, max_tries=5, backoff_s=1):
     """Retry decorator for methods of GCPNodeProvider.
@@ -59,9 +63,31 @@ class GCPNodeProvider(NodeProvider):
         self.lock = RLock()
         self._construct_clients()
 
+        # Labels that we believe to actually be on GCP.
+        self.tag_cache = {}
+        # Labels that we will soon upload.
+        self.tag_cache_pending = defaultdict(dict)
+        # Labels of the batch being uploaded. They are folded into the
+        # tag cache only after the upload succeeds.
+        self.tag_cache_updating = {}
+        # Number of threads waiting for a batched tag update.
+        self.batch_thread_count = 0
+        self.batch_update_done = threading.Event()
+        self.batch_update_done.set()
+        self.ready_for_new_batch = threading.Event()
+        self.ready_for_new_batch.set()
+        self.tag_cache_lock = threading.Lock()
+        # Lock of the tag cache and the updating labels which is never held
+        # while waiting for the other locks or the batch events
+        self.tag_update_lock = threading.Lock()
+        self.count_lock = threading.Lock()
+
         # Cache of node objects from the last nodes() call. This avoids
         # excessive DescribeInstances requests.
         self.cached_nodes: Dict[str, GCPNode] = {}
+        # The nodes of which the cached label fingerprint is out of date
+        # because of the label updates since the last nodes() call.
+        self.stale_label_fingerprints = set()
 
     def with_environment_variables(self, node_type_config: Dict[str, Any], node_id: str):
         return with_gcp_environment_variables(self.provider_config, node_type_config, node_id)
@@ -77,13 +103,15 @@ class GCPNodeProvider(NodeProvider):
         # Compute is always required
         self.resources[GCPNodeType.COMPUTE] = GCPCompute(
             compute, self.provider_config["project_id"],
-            self.provider_config["availability_zone"], self.cluster_name)
+            self.provider_config["availability_zone"], self.cluster_name,
+            lock=self.lock)
 
         # if there are no TPU nodes defined in config, tpu will be None.
         if tpu is not None:
             self.resources[GCPNodeType.TPU] = GCPTPU(
                 tpu, self.provider_config["project_id"],
-                self.provider_config["availability_zone"], self.cluster_name)
+                self.provider_config["availability_zone"], self.cluster_name,
+                lock=self.lock)
 
     def _get_resource_depending_on_node_name(self,
                                              node_name: str) -> GCPResource:
@@ -103,8 +131,16 @@ class GCPNodeProvider(NodeProvider):
                 node_instances = resource.list_instances(tag_filters)
                 instances += node_instances
 
+            # Populate the tag cache with initial information if necessary
+            for instance in instances:
+                if instance["name"] in self.tag_cache:
+                    continue
+
+                self.tag_cache[instance["name"]] = dict(instance.get_labels())
+
             # Note: All the operations use "name" as the unique instance id
             self.cached_nodes = {i["name"]: i for i in instances}
+            self.stale_label_fingerprints = set()
             return [i["name"] for i in instances]
 
     def is_running(self, node_id: str):
@@ -118,26 +154,169 @@ class GCPNodeProvider(NodeProvider):
             return node.is_terminated()
 
     def node_tags(self, node_id: str):
-        with self.lock:
-            node = self._get_cached_node(node_id)
-            return node.get_labels()
+        with self.tag_cache_lock:
+            with self.tag_update_lock:
+                d1 = self.tag_cache.get(node_id)
+                d2 = self.tag_cache_updating.get(node_id, {})
+            if d1 is None:
+                with self.lock:
+                    node = self._get_cached_node(node_id)
+                    d1 = dict(node.get_labels())
+                with self.tag_update_lock:
+                    d1 = self.tag_cache.setdefault(node_id, d1)
+            d3 = self.tag_cache_pending.get(node_id, {})
+            return dict(d1, **d2, **d3)
 
     def get_node_info(self, node_id):
         with self.lock:
             node = self._get_cached_node(node_id)
             return _get_node_info(node)
 
-    @_retry
     def set_node_tags(self, node_id: str, tags: dict):
-        with self.lock:
-            labels = tags
-            node = self._get_node(node_id)
+        is_batching_thread = False
+        with self.tag_cache_lock:
+            if not self.tag_cache_pending:
+                is_batching_thread = True
+                # Wait for threads in the last batch to exit
+                self.ready_for_new_batch.wait()
+                self.ready_for_new_batch.clear()
+                self.batch_update_done.clear()
+            self.tag_cache_pending[node_id].update(tags)
+            # Count the thread before the batch can be uploaded
+            with self.count_lock:
+                self.batch_thread_count += 1
+
+        try:
+            if is_batching_thread:
+                time.sleep(TAG_BATCH_DELAY)
+                try:
+                    self._update_node_tags()
+                finally:
+                    self.batch_update_done.set()
+
+            self.batch_update_done.wait()
+        finally:
+            with self.count_lock:
+                self.batch_thread_count -= 1
+                if self.batch_thread_count == 0:
+                    self.ready_for_new_batch.set()
+
+    def _update_node_tags(self):
+        with self.tag_cache_lock:
+            batch_updates = self.tag_cache_pending
+            self.tag_cache_pending = defaultdict(dict)
+            with self.tag_update_lock:
+                self.tag_cache_updating = batch_updates
+
+        try:
+            self._set_labels(batch_updates)
+        except Exception:
+            with self.tag_update_lock:
+                # Some labels may be set or not. The tags of the nodes
+                # will be loaded again from the nodes.
+                for node_id in batch_updates:
+                    self.tag_cache.pop(node_id, None)
+                self.tag_cache_updating = {}
+            raise
+
+        with self.tag_update_lock:
+            for node_id, tags in batch_updates.items():
+                if node_id in self.tag_cache:
+                    self.tag_cache[node_id].update(tags)
+            self.tag_cache_updating = {}
 
-            resource = self._get_resource_depending_on_node_name(node_id)
+    @_retry
+    def _set_labels(self, batch_updates: Dict[str, Dict[str, str]]):
+        """Set the labels of the nodes without waiting for each other.
 
-            result = resource.set_labels(node=node, labels=labels)
+        The labels are applied to the cached nodes only after the operations
+        succeed. The failed nodes are dropped from the cached nodes.
+        """
+        updates_of_resources = defaultdict(dict)
+        for node_id, labels in batch_updates.items():
+            resource = self._get_resource_depending_on_node_name(node_id)
+            updates_of_resources[resource][node_id] = labels
+
+        failed_nodes = {}
+        for resource, resource_updates in updates_of_resources.items():
+            if isinstance(resource, GCPCompute):
+                # Compute resource holds the lock for each batch request only
+                failed_nodes.update(
+                    self._set_labels_of_nodes(resource, resource_updates))
+            else:
+                with self.lock:
+                    failed_nodes.update(
+                        self._set_labels_of_nodes(resource, resource_updates))
+
+        if failed_nodes:
+            for node_id, error in failed_nodes.items():
+                logger.warning(
+                    f"Failed to set the labels of node {node_id}: {error}")
+            raise next(iter(failed_nodes.values()))
+
+    def _set_labels_of_nodes(self, resource: GCPResource,
+                             batch_updates: Dict[str, Dict[str, str]]
+                             ) -> Dict[str, Exception]:
+        nodes, failed_nodes = self._get_nodes_to_label(
+            resource, list(batch_updates.keys()))
+        failed_nodes.update(resource.set_labels_of_instances(
+            {node_id: (node, batch_updates[node_id])
+             for node_id, node in nodes.items()}))
+
+        # The labels were changed since the label fingerprint
+        changed_node_ids = [
+            node_id for node_id, error in failed_nodes.items()
+            if isinstance(error, googleapiclient.errors.HttpError) and (
+                error.resp.status == 412)]
+        if changed_node_ids:
+            for node_id in changed_node_ids:
+                failed_nodes.pop(node_id)
+            with self.lock:
+                self.stale_label_fingerprints.update(changed_node_ids)
+            changed_nodes, get_failed_nodes = self._get_nodes_to_label(
+                resource, changed_node_ids)
+            nodes.update(changed_nodes)
+            failed_nodes.update(get_failed_nodes)
+            failed_nodes.update(resource.set_labels_of_instances(
+                {node_id: (node, batch_updates[node_id])
+                 for node_id, node in changed_nodes.items()}))
 
-            return result
+        with self.lock:
+            for node_id, labels in batch_updates.items():
+                if node_id in failed_nodes:
+                    # The labels may be set or not. The node will be
+                    # got again with the labels.
+                    self.cached_nodes.pop(node_id, None)
+                else:
+                    node = nodes[node_id]
+                    node["labels"] = dict(node.get_labels(), **labels)
+                    self.cached_nodes[node_id] = node
+                self.stale_label_fingerprints.add(node_id)
+        return failed_nodes
+
+    def _get_nodes_to_label(self, resource: GCPResource, node_ids: List[str]
+                            ) -> Tuple[Dict[str, GCPNode], Dict[str, Exception]]:
+        """Returns the nodes with the label fingerprints up to date and
+        the nodes failed to get."""
+        nodes = {}
+        with self.lock:
+            for node_id in node_ids:
+                node = self.cached_nodes.get(node_id)
+                if node is not None and (
+                        node_id not in self.stale_label_fingerprints):
+                    nodes[node_id] = node
+
+        failed_nodes = {}
+        node_ids_to_get = [
+            node_id for node_id in node_ids if node_id not in nodes]
+        if node_ids_to_get:
+            instances = resource.get_instances(node_ids_to_get)
+            for node_id, instance in instances.items():
+                if isinstance(instance, Exception):
+                    failed_nodes[node_id] = instance
+                else:
+                    nodes[node_id] = instance
+        return nodes, failed_nodes
 
     def external_ip(self, node_id: str):
         with self.lock:
@@ -163,13 +342,18 @@ class GCPNodeProvider(NodeProvider):
 
     @_retry
     def create_node(self, base_config: dict, tags: dict, count: int) -> None:
-        with self.lock:
-            labels = tags  # gcp uses "labels" instead of aws "tags"
+        labels = tags  # gcp uses "labels" instead of aws "tags"
 
-            node_type = get_node_type(base_config)
-            resource = self.resources[node_type]
+        node_type = get_node_type(base_config)
+        resource = self.resources[node_type]
 
+        if node_type == GCPNodeType.COMPUTE:
+            # The compute resource holds the lock only for each batch request
+            # and releases it while waiting for the operations
             resource.create_instances(base_config, labels, count)
+        else:
+            with self.lock:
+                resource.create_instances(base_config, labels, count)
 
     @_retry
     def terminate_node(self, node_id: str):
@@ -189,6 +373,34 @@ class GCPNodeProvider(NodeProvider):
                     raise http_error from None
             return result
 
+    @_retry
+    def terminate_nodes(self, node_ids):
+        node_ids_of_resources = defaultdict(list)
+        for node_id in node_ids:
+            resource = self._get_resource_depending_on_node_name(node_id)
+            node_ids_of_resources[resource].append(node_id)
+
+        failed_nodes = {}
+        for resource, resource_node_ids in node_ids_of_resources.items():
+            if isinstance(resource, GCPCompute):
+                # Compute resource holds the lock for each batch request only
+                failed_nodes.update(
+                    resource.delete_instances(resource_node_ids))
+            else:
+                with self.lock:
+                    failed_nodes.update(
+                        resource.delete_instances(resource_node_ids))
+
+        for node_id, error in list(failed_nodes.items()):
+            if isinstance(error, googleapiclient.errors.HttpError) and (
+                    error.resp.status == 404):
+                logger.warning(
+                    f"Tried to delete the node with id {node_id} "
+                    "but it was already gone."
+                )
+                failed_nodes.pop(node_id)
+        report_failed_terminations(failed_nodes)
+
     @_retry
     def _get_node(self, node_id: str) -> GCPNode:
         self.non_terminated_nodes({})  # Side effect: updates cache
@@ -1,8 +1,14 @@
 import logging
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from cloudtik.core._private.cli_logger import cli_logger
 
 logger = logging.getLogger(__name__)
 
+# Max number of threads to terminate the nodes concurrently
+TERMINATE_NODES_MAX_WORKERS = 16
+
 
 class StorageTestingError(RuntimeError):
     pass
@@ -17,3 +23,39 @@ def validate_config_dict(provider_type, config_dict: Dict[str, Any]) -> None:
     if provider_config_failed:
         raise RuntimeError("{} provider must be provided the right config, "
                            "please refer to config-schema.json.".format(provider_type))
+
+
+def terminate_nodes_concurrently(
+        terminate_node: Callable[[str], Any], node_ids: List[str],
+        max_workers: int = TERMINATE_NODES_MAX_WORKERS) -> Dict[str, Exception]:
+    """Terminate the nodes one by one with a bounded thread pool.
+
+    A node failed to terminate doesn't stop terminating the other nodes.
+    Returns the dict of node id to the exception for the nodes failed.
+    """
+    if not node_ids:
+        return {}
+
+    def try_terminate_node(node_id):
+        try:
+            terminate_node(node_id)
+        except Exception as e:
+            return e
+        return None
+
+    with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(node_ids))) as executor:
+        errors = executor.map(try_terminate_node, node_ids)
+        failed_nodes = {
+            node_id: error for node_id, error in zip(node_ids, errors)
+            if error is not None}
+    report_failed_terminations(failed_nodes)
+    return failed_nodes
+
+
+def report_failed_terminations(failed_nodes: Dict[str, Exception]) -> None:
+    for node_id, error in failed_nodes.items():
+        logger.debug(
+            "Failed to terminate node {}.".format(node_id), exc_info=error)
+        cli_logger.warning(
+            "Failed to terminate node {}: {}", node_id, str(error))
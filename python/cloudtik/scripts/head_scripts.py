@@ -5,25 +5,15 @@ from typing import Optional
 
 import click
 
-from cloudtik.core._private import services
 from cloudtik.core._private.cli_logger import (add_click_logging_options,
                                                cli_logger)
-from cloudtik.core._private.cluster.cluster_operator import (
-    debug_status_string, get_cluster_dump_archive_on_head,
-    RUN_ENV_TYPES, teardown_cluster_on_head, cluster_process_status_on_head, rsync_node_on_head, attach_node_on_head,
-    start_node_on_head, stop_node_on_head, kill_node_on_head, scale_cluster_on_head,
-    _wait_for_ready, _get_worker_node_ips, _get_head_node_ip,
-    _show_cluster_status, _monitor_cluster, _show_cluster_info, _show_worker_cpus, _show_worker_memory,
-    cli_call_context, _exec_node_on_head)
 from cloudtik.core._private.constants import CLOUDTIK_REDIS_DEFAULT_PASSWORD, \
-    CLOUDTIK_KV_NAMESPACE_HEALTHCHECK
-from cloudtik.core._private.state import kv_store
-from cloudtik.core._private.state.kv_store import kv_initialize_with_address
-from cloudtik.core._private.utils import CLOUDTIK_CLUSTER_SCALING_ERROR, \
-    CLOUDTIK_CLUSTER_SCALING_STATUS, decode_cluster_scaling_time, is_alive_time, get_head_bootstrap_config, \
-    load_head_cluster_config
+    CLOUDTIK_KV_NAMESPACE_HEALTHCHECK, RUN_ENV_TYPES
 from cloudtik.scripts.utils import NaturalOrderGroup, add_command_alias
 
+# NOTE: The modules of the cluster operations are imported when
+# a command is executed to keep the CLI start fast.
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,6 +50,7 @@ def head():
 @add_click_logging_options
 def attach(node_ip, screen, tmux, new, port_forward, host):
     """Attach to worker node from head."""
+    from cloudtik.core._private.cluster.cluster_operator import attach_node_on_head
     port_forward = [(port, port) for port in list(port_forward)]
     attach_node_on_head(node_ip,
                         screen,
@@ -133,6 +124,8 @@ def exec(cmd, node_ip, all_nodes, run_env, screen, tmux,
          wait_for_workers, min_workers, wait_timeout,
          port_forward, with_output, parallel, job_waiter):
     """Execute command on the worker node from head."""
+    from cloudtik.core._private.cluster.cluster_operator import _exec_node_on_head, cli_call_context
+    from cloudtik.core._private.utils import load_head_cluster_config
     port_forward = [(port, port) for port in list(port_forward)]
     config = load_head_cluster_config()
     call_context = cli_call_context()
@@ -175,6 +168,7 @@ def exec(cmd, node_ip, all_nodes, run_env, screen, tmux,
 @add_click_logging_options
 def scale(yes, cpus, workers):
     """Scale the cluster with a specific number cpus or nodes."""
+    from cloudtik.core._private.cluster.cluster_operator import scale_cluster_on_head
     scale_cluster_on_head(yes, cpus, workers)
 
 
@@ -196,6 +190,8 @@ def scale(yes, cpus, workers):
 @add_click_logging_options
 def rsync_up(source, target, node_ip, all_workers):
     """Rsync up specific file from or to the worker node."""
+    from cloudtik.core._private.cluster.cluster_operator import rsync_node_on_head, cli_call_context
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     call_context = cli_call_context()
     rsync_node_on_head(
@@ -220,6 +216,8 @@ def rsync_up(source, target, node_ip, all_workers):
 @add_click_logging_options
 def rsync_down(source, target, node_ip):
     """Rsync down specific file from or to the worker node."""
+    from cloudtik.core._private.cluster.cluster_operator import rsync_node_on_head, cli_call_context
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     call_context = cli_call_context()
     rsync_node_on_head(
@@ -236,6 +234,8 @@ def rsync_down(source, target, node_ip):
 @add_click_logging_options
 def status():
     """Show cluster summary status."""
+    from cloudtik.core._private.cluster.cluster_operator import _show_cluster_status
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     _show_cluster_status(config)
 
@@ -254,6 +254,9 @@ def status():
 @add_click_logging_options
 def info(worker_cpus, worker_memory):
     """Show cluster summary information and useful links to use the cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import (
+        _show_cluster_info, _show_worker_cpus, _show_worker_memory)
+    from cloudtik.core._private.utils import get_head_bootstrap_config, load_head_cluster_config
     cluster_config_file = get_head_bootstrap_config()
     config = load_head_cluster_config()
 
@@ -275,6 +278,8 @@ def info(worker_cpus, worker_memory):
 @add_click_logging_options
 def head_ip(public):
     """Return the head node IP of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import _get_head_node_ip
+    from cloudtik.core._private.utils import load_head_cluster_config
     try:
         config = load_head_cluster_config()
         head_node_ip = _get_head_node_ip(config, public)
@@ -294,6 +299,8 @@ def head_ip(public):
     help="Get the worker ips for specific runtime.")
 def worker_ips(runtime):
     """Return the list of worker IPs of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import _get_worker_node_ips
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     workers = _get_worker_node_ips(config, runtime=runtime)
     if len(workers) > 0:
@@ -316,6 +323,8 @@ def worker_ips(runtime):
 @add_click_logging_options
 def monitor(lines, file_type):
     """Tails the monitor logs of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import _monitor_cluster
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     _monitor_cluster(config, lines, file_type=file_type)
 
@@ -347,6 +356,7 @@ def monitor(lines, file_type):
 @add_click_logging_options
 def teardown(yes, keep_min_workers, hard, indent_level):
     """Tear down a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import teardown_cluster_on_head
     if indent_level is not None:
         with cli_logger.indented_by(indent_level):
             teardown_cluster_on_head(yes, keep_min_workers, hard=hard)
@@ -382,6 +392,7 @@ def teardown(yes, keep_min_workers, hard, indent_level):
 @add_click_logging_options
 def kill_node(yes, hard, node_ip, indent_level):
     """Kills a specified worker node and a random worker node."""
+    from cloudtik.core._private.cluster.cluster_operator import kill_node_on_head
 
     def do_kill_node():
         killed_node_ip = kill_node_on_head(
@@ -412,6 +423,8 @@ def kill_node(yes, hard, node_ip, indent_level):
 @add_click_logging_options
 def wait_for_ready(min_workers, timeout):
     """Wait for the minimum number of workers to be ready."""
+    from cloudtik.core._private.cluster.cluster_operator import _wait_for_ready, cli_call_context
+    from cloudtik.core._private.utils import load_head_cluster_config
     config = load_head_cluster_config()
     call_context = cli_call_context()
     _wait_for_ready(config, call_context, min_workers, timeout)
@@ -432,6 +445,12 @@ def wait_for_ready(min_workers, timeout):
 @add_click_logging_options
 def debug_status(address, redis_password):
     """Print cluster status, including autoscaling info."""
+    from cloudtik.core._private import services
+    from cloudtik.core._private.cluster.cluster_operator import debug_status_string
+    from cloudtik.core._private.state import kv_store
+    from cloudtik.core._private.state.kv_store import kv_initialize_with_address
+    from cloudtik.core._private.utils import (
+        CLOUDTIK_CLUSTER_SCALING_ERROR, CLOUDTIK_CLUSTER_SCALING_STATUS)
     if not address:
         address = services.get_address_to_use_or_die()
     kv_initialize_with_address(address, redis_password)
@@ -457,6 +476,8 @@ def debug_status(address, redis_password):
 @add_click_logging_options
 def process_status(address, redis_password):
     """Show cluster process status."""
+    from cloudtik.core._private import services
+    from cloudtik.core._private.cluster.cluster_operator import cluster_process_status_on_head
     if not address:
         address = services.get_address_to_use_or_die()
     cluster_process_status_on_head(
@@ -486,6 +507,11 @@ def health_check(address, redis_password, component):
     """
     Health check a cluster or a specific component. Exit code 0 is healthy.
     """
+    from cloudtik.core._private import services
+    from cloudtik.core._private.state import kv_store
+    from cloudtik.core._private.state.kv_store import kv_initialize_with_address
+    from cloudtik.core._private.utils import (
+        CLOUDTIK_CLUSTER_SCALING_STATUS, decode_cluster_scaling_time, is_alive_time)
 
     if not address:
         address = services.get_address_to_use_or_die()
@@ -618,6 +644,7 @@ def cluster_dump(host: Optional[str] = None,
 
         This script is called on head node to fetch the cluster data.
         """
+    from cloudtik.core._private.cluster.cluster_operator import get_cluster_dump_archive_on_head
     if verbosity is not None:
         cli_logger.set_verbosity(verbosity)
 
@@ -678,6 +705,7 @@ def runtime():
 @add_click_logging_options
 def start(node_ip, all_nodes, runtimes, indent_level, parallel, yes):
     """Run start commands on the specific node or all nodes."""
+    from cloudtik.core._private.cluster.cluster_operator import start_node_on_head
     def do_start_node():
         start_node_on_head(node_ip=node_ip, all_nodes=all_nodes,
                            runtimes=runtimes, parallel=parallel, yes=yes)
@@ -726,6 +754,7 @@ def start(node_ip, all_nodes, runtimes, indent_level, parallel, yes):
 @add_click_logging_options
 def stop(node_ip, all_nodes, runtimes, indent_level, parallel, yes):
     """Run stop commands on the specific node or all nodes."""
+    from cloudtik.core._private.cluster.cluster_operator import stop_node_on_head
     def do_stop_node():
         stop_node_on_head(node_ip=node_ip, all_nodes=all_nodes,
                           runtimes=runtimes, parallel=parallel, yes=yes)
@@ -14,33 +14,18 @@ from typing import Optional
 from shlex import quote
 
 import click
-import psutil
 
 from cloudtik.core._private import constants
-from cloudtik.core._private import services, utils, logging_utils
+from cloudtik.core._private import logging_utils
 from cloudtik.core._private.cli_logger import (add_click_logging_options,
                                                cli_logger, cf)
-from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
-from cloudtik.core._private.cluster.cluster_operator import (
-    attach_cluster, create_or_update_cluster, monitor_cluster,
-    teardown_cluster, get_head_node_ip, kill_node_from_head, get_worker_node_ips,
-    get_cluster_dump_archive, get_local_dump_archive, RUN_ENV_TYPES,
-    show_worker_cpus, show_worker_memory, show_cluster_info, show_cluster_status,
-    start_proxy, stop_proxy, cluster_debug_status,
-    cluster_health_check, cluster_process_status, attach_worker, scale_cluster,
-    exec_on_nodes, submit_and_exec, _wait_for_ready, _rsync, cli_call_context)
 from cloudtik.core._private.constants import CLOUDTIK_PROCESSES, \
     CLOUDTIK_REDIS_DEFAULT_PASSWORD, \
-    CLOUDTIK_DEFAULT_PORT
-from cloudtik.core._private.node.node_services import NodeServicesStarter
-from cloudtik.core._private.parameter import StartParams
-from cloudtik.core._private.resource_spec import ResourceSpec
-from cloudtik.core._private.utils import with_script_args
+    CLOUDTIK_DEFAULT_PORT, RUN_ENV_TYPES
 from cloudtik.scripts.utils import NaturalOrderGroup, add_command_alias
-from cloudtik.scripts.workspace import workspace
-from cloudtik.scripts.runtime_scripts import runtime
-from cloudtik.scripts.head_scripts import head
 
+# NOTE: The modules of the cluster operations and the sub-command groups
+# are imported when a command is executed to keep the CLI start fast.
 
 logger = logging.getLogger(__name__)
 
@@ -175,6 +160,9 @@ def node_start(node_ip_address, address, port, head,
           cluster_scaling_config, temp_dir, metrics_export_port,
           no_redirect_output, runtimes, no_controller):
     """Start the main daemon processes on the local machine."""
+    from cloudtik.core._private import services, utils
+    from cloudtik.core._private.node.node_services import NodeServicesStarter
+    from cloudtik.core._private.parameter import StartParams
     # Convert hostnames to numerical IP address.
     if node_ip_address is not None:
         node_ip_address = services.address_to_ip(node_ip_address)
@@ -324,6 +312,8 @@ def node_start(node_ip_address, address, port, head,
 @add_click_logging_options
 def node_stop(force):
     """Stop CloudTik processes manually on the local machine."""
+    import psutil
+    from cloudtik.core._private import utils
 
     is_linux = sys.platform.startswith("linux")
     processes_to_kill = CLOUDTIK_PROCESSES
@@ -468,6 +458,8 @@ def start(cluster_config_file, min_workers, max_workers, no_restart, restart_onl
        yes, cluster_name, workspace_name, redirect_command_output,
        use_login_shells):
     """Start or update a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import (
+        create_or_update_cluster, cli_call_context)
     if restart_only or no_restart:
         cli_logger.doassert(restart_only != no_restart,
                             "`{}` is incompatible with `{}`.",
@@ -536,6 +528,7 @@ def start(cluster_config_file, min_workers, max_workers, no_restart, restart_onl
 def stop(cluster_config_file, yes, workers_only, cluster_name,
          keep_min_workers, hard):
     """Stop a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import teardown_cluster
     teardown_cluster(cluster_config_file, yes, workers_only, cluster_name,
                      keep_min_workers, proxy_stop=True, hard=hard)
 
@@ -578,6 +571,7 @@ def stop(cluster_config_file, yes, workers_only, cluster_name,
 def attach(cluster_config_file, screen, tmux, cluster_name,
            no_config_cache, new, port_forward, node_ip, host):
     """Create or attach to SH session to a cluster or a worker node."""
+    from cloudtik.core._private.cluster.cluster_operator import attach_cluster, attach_worker
     port_forward = [(port, port) for port in list(port_forward)]
     try:
         if not node_ip:
@@ -705,6 +699,8 @@ def exec(cluster_config_file, cmd, cluster_name, run_env, screen, tmux, stop, st
          force_update, wait_for_workers, min_workers, wait_timeout,
          no_config_cache, port_forward, node_ip, all_nodes, parallel, yes, job_waiter):
     """Execute a command via SSH on a cluster or a specified node."""
+    from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
+    from cloudtik.core._private.cluster.cluster_operator import exec_on_nodes, cli_call_context
     port_forward = [(port, port) for port in list(port_forward)]
 
     try:
@@ -840,6 +836,8 @@ def submit(cluster_config_file, cluster_name, screen, tmux, stop, start,
     Example:
         >>> cloudtik submit [CLUSTER.YAML] experiment.py -- --smoke-test
     """
+    from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
+    from cloudtik.core._private.cluster.cluster_operator import submit_and_exec, cli_call_context
     # Don't use config cache so that we will run a full bootstrap needed for start
     if start:
         no_config_cache = True
@@ -896,6 +894,7 @@ def submit(cluster_config_file, cluster_name, screen, tmux, stop, start,
 @add_click_logging_options
 def scale(cluster_config_file, yes, cluster_name, cpus, workers):
     """Scale the cluster with a specific number cpus or nodes."""
+    from cloudtik.core._private.cluster.cluster_operator import scale_cluster
     scale_cluster(cluster_config_file, yes, cluster_name, cpus, workers)
 
 
@@ -923,6 +922,8 @@ def scale(cluster_config_file, yes, cluster_name, cpus, workers):
 @add_click_logging_options
 def rsync_up(cluster_config_file, source, target, cluster_name, node_ip, all_nodes):
     """Upload specific files to a cluster or a specified node."""
+    from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
+    from cloudtik.core._private.cluster.cluster_operator import _rsync, cli_call_context
 
     try:
         config = _load_cluster_config(
@@ -962,6 +963,8 @@ def rsync_up(cluster_config_file, source, target, cluster_name, node_ip, all_nod
 @add_click_logging_options
 def rsync_down(cluster_config_file, source, target, cluster_name, node_ip):
     """Download specific files from a cluster or a specified node."""
+    from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
+    from cloudtik.core._private.cluster.cluster_operator import _rsync, cli_call_context
     try:
         config = _load_cluster_config(
             cluster_config_file, cluster_name)
@@ -988,6 +991,7 @@ def rsync_down(cluster_config_file, source, target, cluster_name, node_ip):
 @add_click_logging_options
 def status(cluster_config_file, cluster_name):
     """Show cluster summary status."""
+    from cloudtik.core._private.cluster.cluster_operator import show_cluster_status
     show_cluster_status(
         cluster_config_file,
         cluster_name)
@@ -1014,6 +1018,8 @@ def status(cluster_config_file, cluster_name):
 @add_click_logging_options
 def info(cluster_config_file, cluster_name, worker_cpus, worker_memory):
     """Show cluster summary information and useful links to use the cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import (
+        show_cluster_info, show_worker_cpus, show_worker_memory)
     if worker_cpus:
         return show_worker_cpus(cluster_config_file, cluster_name)
 
@@ -1041,6 +1047,7 @@ def info(cluster_config_file, cluster_name, worker_cpus, worker_memory):
 @add_click_logging_options
 def head_ip(cluster_config_file, cluster_name, public):
     """Return the head node IP of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import get_head_node_ip
     try:
         click.echo(get_head_node_ip(cluster_config_file, cluster_name, public))
     except RuntimeError as re:
@@ -1068,6 +1075,7 @@ def head_ip(cluster_config_file, cluster_name, public):
 @add_click_logging_options
 def worker_ips(cluster_config_file, cluster_name, runtime):
     """Return the list of worker IPs of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import get_worker_node_ips
     workers = get_worker_node_ips(cluster_config_file, cluster_name, runtime=runtime)
     if len(workers) > 0:
         click.echo("\n".join(workers))
@@ -1096,6 +1104,7 @@ def worker_ips(cluster_config_file, cluster_name, runtime):
 @add_click_logging_options
 def monitor(cluster_config_file, lines, cluster_name, file_type):
     """Tails the monitor logs of a cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import monitor_cluster
     try:
         monitor_cluster(cluster_config_file, lines, cluster_name, file_type=file_type)
     except RuntimeError as re:
@@ -1129,6 +1138,7 @@ def monitor(cluster_config_file, lines, cluster_name, file_type):
 def enable_proxy(cluster_config_file, no_config_cache, cluster_name,
                  bind_address):
     """Start the SOCKS5 proxy to the cluster through SSH tunnel forwarding to the head."""
+    from cloudtik.core._private.cluster.cluster_operator import start_proxy
     start_proxy(
         cluster_config_file,
         override_cluster_name=cluster_name,
@@ -1147,6 +1157,7 @@ def enable_proxy(cluster_config_file, no_config_cache, cluster_name,
 @add_click_logging_options
 def disable_proxy(cluster_config_file, cluster_name):
     """Stop the SOCKS5 proxy to the cluster."""
+    from cloudtik.core._private.cluster.cluster_operator import stop_proxy
     stop_proxy(cluster_config_file, cluster_name)
 
 
@@ -1178,6 +1189,7 @@ def disable_proxy(cluster_config_file, cluster_name):
 @add_click_logging_options
 def kill_node(cluster_config_file, yes, hard, cluster_name, node_ip):
     """Kills a specified node or a random node."""
+    from cloudtik.core._private.cluster.cluster_operator import kill_node_from_head
     kill_node_from_head(
         cluster_config_file, yes, hard, cluster_name,
         node_ip)
@@ -1212,6 +1224,8 @@ def kill_node(cluster_config_file, yes, hard, cluster_name, node_ip):
 def wait_for_ready(cluster_config_file, cluster_name, no_config_cache,
                    min_workers, timeout):
     """Wait for the minimum number of workers to be ready."""
+    from cloudtik.core._private.cluster.cluster_config import _load_cluster_config
+    from cloudtik.core._private.cluster.cluster_operator import _wait_for_ready, cli_call_context
     config = _load_cluster_config(cluster_config_file, cluster_name,
                                   no_config_cache=no_config_cache)
     call_context = cli_call_context()
@@ -1229,6 +1243,7 @@ def wait_for_ready(cluster_config_file, cluster_name, no_config_cache,
 @add_click_logging_options
 def process_status(cluster_config_file, cluster_name):
     """Show process status of cluster nodes."""
+    from cloudtik.core._private.cluster.cluster_operator import cluster_process_status
     try:
         cluster_process_status(
             cluster_config_file,
@@ -1252,6 +1267,7 @@ def process_status(cluster_config_file, cluster_name):
 @add_click_logging_options
 def debug_status(cluster_config_file, cluster_name):
     """Show debug status of cluster scaling."""
+    from cloudtik.core._private.cluster.cluster_operator import cluster_debug_status
     try:
         cluster_debug_status(cluster_config_file, cluster_name)
     except RuntimeError as re:
@@ -1273,6 +1289,7 @@ def debug_status(cluster_config_file, cluster_name):
 @add_click_logging_options
 def health_check(cluster_config_file, cluster_name):
     """Do cluster health check."""
+    from cloudtik.core._private.cluster.cluster_operator import cluster_health_check
     try:
         cluster_health_check(cluster_config_file, cluster_name)
     except RuntimeError as re:
@@ -1392,6 +1409,7 @@ def cluster_dump(cluster_config_file: Optional[str] = None,
     You can also manually specify a list of hosts using the
     ``--host <host1,host2,...>`` parameter.
     """
+    from cloudtik.core._private.cluster.cluster_operator import get_cluster_dump_archive
     archive_path = get_cluster_dump_archive(
         config_file=cluster_config_file,
         override_cluster_name=cluster_name,
@@ -1492,6 +1510,7 @@ def local_dump(stream: bool = False,
 
     This script is called on remote nodes to fetch their data.
     """
+    from cloudtik.core._private.cluster.cluster_operator import get_local_dump_archive
     # This may stream data to stdout, so no printing here
     if verbosity is not None:
         cli_logger.set_verbosity(verbosity)
@@ -1513,6 +1532,7 @@ def local_dump(stream: bool = False,
 @click.argument("script_args", nargs=-1)
 def run_script(script, script_args):
     """Runs a bash script within this python package."""
+    from cloudtik.core._private.utils import with_script_args
     root_path = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
     target = os.path.join(root_path, script)
     command_parts = ["bash", quote(target)]
@@ -1547,6 +1567,7 @@ def run_script(script, script_args):
     help="Show total memory in MB.")
 def resources(cpu, memory, in_mb):
     """Show system resource information"""
+    from cloudtik.core._private.resource_spec import ResourceSpec
     resource_spec = ResourceSpec().resolve(is_head=False, available_memory=False)
     if cpu:
         click.echo(resource_spec.num_cpus)
@@ -1618,13 +1639,19 @@ cli.add_command(run_script)
 cli.add_command(resources)
 
 # workspace commands
-cli.add_command(workspace)
+cli.add_lazy_command(
+    "cloudtik.scripts.workspace:workspace", name="workspace",
+    short_help="Commands for working with workspace.")
 
 # runtime commands
-cli.add_command(runtime)
+cli.add_lazy_command(
+    "cloudtik.scripts.runtime_scripts:runtime", name="runtime",
+    short_help="Commands for runtime service control")
 
 # head commands
-cli.add_command(head)
+cli.add_lazy_command(
+    "cloudtik.scripts.head_scripts:head", name="head",
+    short_help="Commands running on head node only.")
 
 
 def main():
@@ -1,4 +1,5 @@
 import copy
+import importlib
 from collections import OrderedDict
 
 import click
@@ -10,6 +11,22 @@ def add_command_alias(group, command, name, hidden):
     group.add_command(new_command, name=name)
 
 
+class LazyCommand(click.Command):
+    """The placeholder of a command which is imported on the first use.
+
+    The import path is in the form of "module:attribute".
+    """
+
+    def __init__(self, name, import_path, short_help=None):
+        click.Command.__init__(self, name=name, short_help=short_help)
+        self.import_path = import_path
+
+    def load(self):
+        module_name, attr = self.import_path.split(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, attr)
+
+
 class NaturalOrderGroup(click.Group):
     def __init__(self, name=None, commands=None, **attrs):
         if commands is None:
@@ -22,3 +39,31 @@ class NaturalOrderGroup(click.Group):
 
     def list_commands(self, ctx):
         return self.commands.keys()
+
+    def add_lazy_command(self, import_path, name, short_help=None):
+        self.commands[name] = LazyCommand(
+            name, import_path, short_help=short_help)
+
+    def get_command(self, ctx, cmd_name):
+        command = self.commands.get(cmd_name)
+        if isinstance(command, LazyCommand):
+            command = command.load()
+            self.commands[cmd_name] = command
+        return command
+
+    def format_commands(self, ctx, formatter):
+        # Use the short help of the lazy commands without importing them
+        commands = []
+        for subcommand in self.list_commands(ctx):
+            command = self.commands.get(subcommand)
+            if command is None or command.hidden:
+                continue
+            commands.append((subcommand, command))
+
+        if commands:
+            limit = formatter.width - 6 - max(
+                len(subcommand) for subcommand, _ in commands)
+            rows = [(subcommand, command.get_short_help_str(limit))
+                    for subcommand, command in commands]
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
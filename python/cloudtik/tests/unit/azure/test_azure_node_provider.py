@@ -0,0 +1,294 @@
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from cloudtik.core.tags import CLOUDTIK_TAG_CLUSTER_NAME
+from cloudtik.providers._private._azure import node_provider as azure_node_provider
+from cloudtik.providers._private._azure.node_provider import AzureNodeProvider
+
+_SUBSCRIPTION_ID = "subscription-one"
+_RESOURCE_GROUP = "cloudtik-group"
+_CLUSTER_NAME = "cluster-one"
+
+
+def _resource_id(provider, resource_type, name):
+    return "/subscriptions/{}/resourceGroups/{}/providers/{}/{}/{}".format(
+        _SUBSCRIPTION_ID, _RESOURCE_GROUP, provider, resource_type, name)
+
+
+def _vm(name, cluster_name=_CLUSTER_NAME):
+    nic_id = _resource_id(
+        "Microsoft.Network", "networkInterfaces", name + "-nic")
+    return SimpleNamespace(
+        name=name,
+        id=_resource_id("Microsoft.Compute", "virtualMachines", name),
+        tags={CLOUDTIK_TAG_CLUSTER_NAME: cluster_name},
+        hardware_profile=SimpleNamespace(vm_size="Standard_D4s_v3"),
+        network_profile=SimpleNamespace(
+            network_interfaces=[SimpleNamespace(id=nic_id)]))
+
+
+def _vm_status(vm, power_state="running"):
+    # The resource group in the ids listed across the subscription
+    # may differ in case
+    return SimpleNamespace(
+        id=vm.id.upper(),
+        instance_view=SimpleNamespace(statuses=[
+            SimpleNamespace(code="ProvisioningState/succeeded"),
+            SimpleNamespace(code="PowerState/" + power_state)]))
+
+
+def _nic(vm, private_ip):
+    public_ip_id = _resource_id(
+        "Microsoft.Network", "publicIPAddresses", vm.name + "-ip")
+    return SimpleNamespace(
+        id=vm.network_profile.network_interfaces[0].id,
+        name=vm.name + "-nic",
+        ip_configurations=[SimpleNamespace(
+            private_ip_address=private_ip,
+            public_ip_address=SimpleNamespace(id=public_ip_id))])
+
+
+def _public_ip(nic, ip_address):
+    return SimpleNamespace(
+        id=nic.ip_configurations[0].public_ip_address.id,
+        ip_address=ip_address)
+
+
+class MockAzure:
+    """The VMs, NICs and public IPs listed by the mocked clients."""
+
+    def __init__(self):
+        self.vms = []
+        self.vm_statuses = []
+        self.nics = []
+        self.public_ips = []
+        # All the NICs and public IPs by name including the ones not listed
+        self._nics_by_name = {}
+        self._public_ips_by_name = {}
+        self.compute_client = mock.MagicMock()
+        self.network_client = mock.MagicMock()
+
+        virtual_machines = self.compute_client.virtual_machines
+        virtual_machines.list.side_effect = lambda **kwargs: list(self.vms)
+        virtual_machines.list_all.side_effect = \
+            lambda **kwargs: list(self.vm_statuses)
+        virtual_machines.instance_view.return_value.as_dict.return_value = {
+            "statuses": [{"code": "PowerState/starting"}]}
+        virtual_machines.delete.side_effect = self._delete_vm
+
+        network_interfaces = self.network_client.network_interfaces
+        network_interfaces.list.side_effect = lambda **kwargs: list(self.nics)
+        network_interfaces.get.side_effect = self._get_nic
+        public_ip_addresses = self.network_client.public_ip_addresses
+        public_ip_addresses.list.side_effect = \
+            lambda **kwargs: list(self.public_ips)
+        public_ip_addresses.get.side_effect = self._get_public_ip
+
+    def add_vm(self, name, private_ip="10.0.0.1", public_ip="1.1.1.1",
+               listed=True):
+        """Add a running VM. The status and the network of the VM not
+        listed are got one by one only."""
+        vm = _vm(name)
+        nic = _nic(vm, private_ip)
+        public_ip_address = _public_ip(nic, public_ip)
+        self.vms.append(vm)
+        self._nics_by_name[nic.name] = nic
+        self._public_ips_by_name[
+            public_ip_address.id.split("/")[-1]] = public_ip_address
+        if listed:
+            self.vm_statuses.append(_vm_status(vm))
+            self.nics.append(nic)
+            self.public_ips.append(public_ip_address)
+        return vm
+
+    def _delete_vm(self, resource_group_name, vm_name):
+        self.vms = [vm for vm in self.vms if vm.name != vm_name]
+        return mock.MagicMock()
+
+    def _get_nic(self, resource_group_name, network_interface_name):
+        return self._nics_by_name[network_interface_name]
+
+    def _get_public_ip(self, resource_group_name, public_ip_address_name):
+        return self._public_ips_by_name[public_ip_address_name]
+
+
+def _make_provider(azure, **provider_config):
+    with mock.patch.object(azure_node_provider, "get_credential"), \
+            mock.patch.object(azure_node_provider, "ComputeManagementClient",
+                              return_value=azure.compute_client), \
+            mock.patch.object(azure_node_provider, "NetworkManagementClient",
+                              return_value=azure.network_client), \
+            mock.patch.object(azure_node_provider, "ResourceManagementClient"):
+        return AzureNodeProvider(
+            dict({"subscription_id": _SUBSCRIPTION_ID,
+                  "resource_group": _RESOURCE_GROUP}, **provider_config),
+            _CLUSTER_NAME)
+
+
+def test_join_node_networks():
+    azure = MockAzure()
+    azure.add_vm("node-1", "10.0.0.1", "1.1.1.1")
+    azure.add_vm("node-2", "10.0.0.2", "1.1.1.2")
+    provider = _make_provider(azure)
+
+    assert sorted(provider.non_terminated_nodes({})) == ["node-1", "node-2"]
+    assert provider.internal_ip("node-2") == "10.0.0.2"
+    assert provider.external_ip("node-2") == "1.1.1.2"
+    node = provider.cached_nodes["node-1"]
+    assert node["status"] == "running"
+    assert node["vm_size"] == "Standard_D4s_v3"
+    assert node["nic_name"] == "node-1-nic"
+    assert node["public_ip_name"] == "node-1-ip"
+
+    # The nodes are resolved by the bulk listing only
+    azure.compute_client.virtual_machines.instance_view.assert_not_called()
+    azure.network_client.network_interfaces.get.assert_not_called()
+    azure.network_client.public_ip_addresses.get.assert_not_called()
+
+    # The network of the cached nodes is not listed again
+    provider.non_terminated_nodes({})
+    assert azure.network_client.network_interfaces.list.call_count == 1
+    assert azure.network_client.public_ip_addresses.list.call_count == 1
+    assert azure.compute_client.virtual_machines.list_all.call_count == 2
+
+
+def test_filter_nodes_of_cluster():
+    azure = MockAzure()
+    azure.add_vm("node-1")
+    azure.vms.append(_vm("node-other", cluster_name="cluster-other"))
+    provider = _make_provider(azure)
+
+    assert provider.non_terminated_nodes({}) == ["node-1"]
+    assert "node-other" not in provider.cached_node_networks
+
+
+@pytest.mark.parametrize("num_unlisted", [1, 3])
+def test_fallback_for_unresolved_nodes(num_unlisted):
+    azure = MockAzure()
+    azure.add_vm("node-1", "10.0.0.1", "1.1.1.1")
+    for i in range(num_unlisted):
+        azure.add_vm("node-unlisted-{}".format(i), "10.0.1.{}".format(i),
+                     "1.1.2.{}".format(i), listed=False)
+    provider = _make_provider(azure)
+
+    assert len(provider.non_terminated_nodes({})) == 1 + num_unlisted
+    assert provider.cached_nodes["node-1"]["status"] == "running"
+    for i in range(num_unlisted):
+        node = provider.cached_nodes["node-unlisted-{}".format(i)]
+        assert node["status"] == "starting"
+        assert node["internal_ip"] == "10.0.1.{}".format(i)
+        assert node["external_ip"] == "1.1.2.{}".format(i)
+    assert azure.compute_client.virtual_machines.instance_view.call_count == \
+        num_unlisted
+    assert azure.network_client.network_interfaces.get.call_count == \
+        num_unlisted
+
+    # The network of the nodes resolved one by one is cached too
+    provider.non_terminated_nodes({})
+    assert azure.network_client.network_interfaces.get.call_count == \
+        num_unlisted
+
+
+def test_get_power_states_one_by_one():
+    azure = MockAzure()
+    azure.add_vm("node-1")
+    azure.add_vm("node-2")
+    provider = _make_provider(azure, list_subscription_power_states=False)
+
+    assert sorted(provider.non_terminated_nodes({})) == ["node-1", "node-2"]
+    assert provider.cached_nodes["node-1"]["status"] == "starting"
+    azure.compute_client.virtual_machines.list_all.assert_not_called()
+    assert azure.compute_client.virtual_machines.instance_view.call_count == 2
+    # The networks are still listed in bulk
+    azure.network_client.network_interfaces.get.assert_not_called()
+
+
+@pytest.mark.parametrize("private_ip,public_ip", [
+    (None, "1.1.1.1"),
+    ("10.0.0.1", None),
+])
+def test_skip_unallocated_ips(private_ip, public_ip):
+    azure = MockAzure()
+    azure.add_vm("node-1", private_ip, public_ip)
+    provider = _make_provider(azure)
+
+    provider.non_terminated_nodes({})
+    node = provider.cached_nodes["node-1"]
+    assert node["internal_ip"] == private_ip
+    assert node["external_ip"] == public_ip
+    assert "node-1" not in provider.cached_node_networks
+
+    # The network is listed again until the ips are allocated
+    azure.nics[0].ip_configurations[0].private_ip_address = "10.0.0.1"
+    azure.public_ips[0].ip_address = "1.1.1.1"
+    provider.non_terminated_nodes({})
+    assert azure.network_client.network_interfaces.list.call_count == 2
+    assert provider.cached_node_networks["node-1"]["internal_ip"] == "10.0.0.1"
+    assert provider.cached_node_networks["node-1"]["external_ip"] == "1.1.1.1"
+
+
+def test_prune_node_networks():
+    azure = MockAzure()
+    azure.add_vm("node-1")
+    azure.add_vm("node-2")
+    azure.add_vm("node-3")
+    provider = _make_provider(azure)
+    provider.non_terminated_nodes({})
+    assert set(provider.cached_node_networks) == {"node-1", "node-2", "node-3"}
+
+    # The network of a node terminated is removed
+    provider.terminate_node("node-1")
+    assert set(provider.cached_node_networks) == {"node-2", "node-3"}
+    assert [vm.name for vm in azure.vms] == ["node-2", "node-3"]
+    delete_nic = azure.network_client.network_interfaces.delete
+    delete_nic.assert_called_once_with(
+        resource_group_name=_RESOURCE_GROUP,
+        network_interface_name="node-1-nic")
+
+    # The network of a node gone from the listing is removed
+    azure.vms = [vm for vm in azure.vms if vm.name != "node-3"]
+    provider.non_terminated_nodes({})
+    assert set(provider.cached_node_networks) == {"node-2"}
+
+
+def test_terminate_nodes():
+    azure = MockAzure()
+    for i in range(4):
+        azure.add_vm("node-{}".format(i))
+    provider = _make_provider(azure)
+    provider.non_terminated_nodes({})
+    azure.compute_client.virtual_machines.list.reset_mock()
+
+    def is_locked():
+        # Try to take the provider lock from another thread
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(provider.lock.acquire(blocking=False)))
+        thread.start()
+        thread.join()
+        if acquired[0]:
+            provider.lock.release()
+        return not acquired[0]
+
+    listed_with_lock = []
+
+    def list_vms(**kwargs):
+        listed_with_lock.append(is_locked())
+        return list(azure.vms)
+
+    azure.compute_client.virtual_machines.list.side_effect = list_vms
+    provider.terminate_nodes(["node-0", "node-2", "node-not-exist"])
+
+    # The nodes are listed once with the provider lock held
+    assert listed_with_lock == [True]
+    assert [vm.name for vm in azure.vms] == ["node-1", "node-3"]
+    assert set(provider.cached_node_networks) == {"node-1", "node-3"}
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
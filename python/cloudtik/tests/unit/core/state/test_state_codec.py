@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from cloudtik.core._private.state import state_codec
+from cloudtik.core._private.state.state_codec import encode_heartbeat, decode_heartbeat, \
+    encode_record, decode_record
+
+TEST_RECORD = {
+    "node_id": "node-1",
+    "node_ip": "10.0.0.1",
+    "resource_time": 1677000000.123,
+    "total_resources": {"CPU": 8, "memory": 34359738368},
+    "available_resources": {"CPU": 2, "memory": 1073741824},
+    "resource_load": {"utilization": {"CPU": 0.75}, "in_use": True}
+}
+
+
+class TestStateCodec:
+    def test_heartbeat(self):
+        last_heartbeat_time = 1677000000.123
+        data = encode_heartbeat(last_heartbeat_time)
+        assert len(data) == 9
+        assert decode_heartbeat(data) == last_heartbeat_time
+
+    def test_heartbeat_unknown_codec(self):
+        with pytest.raises(ValueError):
+            decode_heartbeat(b"\xff" + encode_heartbeat(0)[1:])
+
+    def test_record(self):
+        data = encode_record(TEST_RECORD)
+        assert len(data) < len(json.dumps(TEST_RECORD))
+        assert decode_record(data) == TEST_RECORD
+
+    def test_json_record(self):
+        data = json.dumps(TEST_RECORD).encode("utf-8")
+        assert decode_record(data) == TEST_RECORD
+
+    def test_record_without_msgpack(self, monkeypatch):
+        monkeypatch.setattr(state_codec, "msgpack", None)
+        data = encode_record(TEST_RECORD)
+        assert decode_record(data) == TEST_RECORD
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -12,6 +12,8 @@ CLOUDTIK_REDIS_EXECUTABLE = os.path.join(
 from cloudtik.core._private.services import start_cloudtik_process, wait_for_redis_to_start
 import cloudtik.core._private.constants as constants
 from cloudtik.core._private.state.control_state import ControlState
+from cloudtik.core._private.state.state_table_store import StateTable, StateTableReader
+from cloudtik.core._private.state.store_client import StoreClient
 
 processes = []
 TEST_KEYS = ['node-1', 'node-2', 'node-3', 'node-4', 'node-5']
@@ -79,6 +81,80 @@ class TestNodeTable:
         for key in TEST_KEYS:
             assert key in res.keys()
 
+    def test_iter_all(self):
+        res = dict(self.node_table.iter_all())
+        assert res == self.node_table.get_all()
+        for key in TEST_KEYS:
+            assert key in res.keys()
+
+    def test_put_many(self):
+        key_values = {key: json.dumps({"ip": "127.0.1.1", "key": key}) for key in TEST_KEYS}
+        self.node_table.put_many(key_values)
+        res = self.node_table.get_many(TEST_KEYS + ["node-not-exist"])
+        assert res == key_values
+
+    def test_delete_many(self):
+        keys_to_delete = ["batch-node-1", "batch-node-2"]
+        self.node_table.put_many({key: json.dumps({"ip": "127.0.2.1"}) for key in keys_to_delete})
+        self.node_table.delete_many(keys_to_delete)
+        assert self.node_table.get_many(keys_to_delete) == {}
+        res = self.node_table.get_all()
+        for key in TEST_KEYS:
+            assert key in res.keys()
+
+    def test_table_reader(self):
+        state_table = self.control_state.get_user_state_table("test_reader_table")
+        reader = StateTableReader(state_table, json.loads)
+        assert reader.read() == {}
+
+        state_table.put_many({key: json.dumps({"key": key}) for key in TEST_KEYS})
+        rows = reader.read()
+        assert rows == {key: {"key": key} for key in TEST_KEYS}
+        if state_table.is_versioned():
+            # Table not changed
+            assert reader.read() is rows
+
+        state_table.delete(TEST_KEYS[0])
+        state_table.put(TEST_KEYS[1], json.dumps({"key": "updated"}))
+        rows = reader.read()
+        assert TEST_KEYS[0] not in rows
+        assert rows[TEST_KEYS[1]] == {"key": "updated"}
+        assert rows == {key: json.loads(value) for key, value in state_table.get_all().items()}
+
+    def test_table_reader_many_changes(self):
+        # More changed rows on a shard than a Lua stack can unpack
+        keys = ["many-node-{}".format(i) for i in range(20000)]
+        state_table = self.control_state.get_user_state_table("test_many_changes_table")
+        reader = StateTableReader(state_table)
+        state_table.put_many({key: "created" for key in keys})
+        assert len(reader.read()) == len(keys)
+
+        state_table.put_many({key: "updated" for key in keys})
+        state_table.delete_many(keys[:2])
+        rows = reader.read()
+        assert len(rows) == len(keys) - 2
+        assert set(rows.values()) == {"updated"}
+
+    def test_key_storage_changes(self):
+        redis_shards_client = self.control_state.control_state_accessor.redis_shard_client
+        state_table = StateTable(StoreClient(redis_shards_client), "test_key_table")
+        reader = StateTableReader(state_table)
+        state_table.put_many({key: key for key in TEST_KEYS})
+        # The key storage has no changes but all the rows
+        changes_by_shards = state_table.get_changes({})
+        assert changes_by_shards[0].full
+        assert changes_by_shards[0].updated == {key: key for key in TEST_KEYS}
+        assert reader.read() == {key: key for key in TEST_KEYS}
+
+    def test_user_state_table_binary(self):
+        str_table = self.control_state.get_user_state_table("test_user_table")
+        binary_table = self.control_state.get_user_state_table(
+            "test_user_table", binary=True)
+        assert self.control_state.get_user_state_table("test_user_table") is str_table
+        str_table.put("node-1", "value")
+        assert str_table.get_all() == {"node-1": "value"}
+        assert binary_table.get_all() == {"node-1": b"value"}
+
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,124 @@
+import time
+import types
+
+import pytest
+
+from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
+from cloudtik.core._private.cluster.cluster_metrics_updater import ClusterMetricsUpdater
+from cloudtik.core._private.state import scaling_state
+from cloudtik.core._private.state.scaling_state import NodeHeartbeatState, NodeHeartbeatSubscriber
+
+
+class ScalingStateClientForTest:
+    def __init__(self, node_heartbeat_states):
+        self.node_heartbeat_states = node_heartbeat_states
+        self.num_reads = 0
+
+    def iter_node_heartbeat_states(self, timeout):
+        self.num_reads += 1
+        return iter(self.node_heartbeat_states)
+
+
+class HeartbeatSubscriberForTest:
+    def __init__(self):
+        self.node_heartbeat_states = {}
+        self.missed = True
+
+    def drain(self):
+        node_heartbeat_states, missed = self.node_heartbeat_states, self.missed
+        self.node_heartbeat_states = {}
+        self.missed = False
+        return node_heartbeat_states, missed
+
+
+class PubSubForTest:
+    def __init__(self):
+        self.closed = False
+
+    def subscribe(self, channel):
+        pass
+
+    def listen(self):
+        raise ConnectionError("Connection lost.")
+
+    def close(self):
+        self.closed = True
+
+
+class RedisClientForTest:
+    def __init__(self):
+        self.pubsubs = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.pubsubs.append(PubSubForTest())
+        return self.pubsubs[-1]
+
+
+class StopSubscriber(BaseException):
+    pass
+
+
+class TestClusterMetricsUpdater:
+    def test_pushed_heartbeats(self):
+        now = time.time()
+        scaling_state_client = ScalingStateClientForTest(
+            [NodeHeartbeatState("node-1", "1.1.1.1", now)])
+        heartbeat_subscriber = HeartbeatSubscriberForTest()
+        cluster_metrics = ClusterMetrics()
+        updater = ClusterMetricsUpdater(
+            cluster_metrics, None, scaling_state_client,
+            heartbeat_subscriber=heartbeat_subscriber)
+
+        # The first update reconciles with the state table
+        heartbeat_nodes = {}
+        updater._update_node_heartbeats(heartbeat_nodes)
+        assert scaling_state_client.num_reads == 1
+        assert heartbeat_nodes == {"node-1": "1.1.1.1"}
+
+        # The following updates use the pushed heartbeats only
+        heartbeat_subscriber.node_heartbeat_states = {
+            "node-2": NodeHeartbeatState("node-2", "1.1.1.2", now + 1)}
+        heartbeat_nodes = {}
+        updater._update_node_heartbeats(heartbeat_nodes)
+        assert scaling_state_client.num_reads == 1
+        assert heartbeat_nodes == {"node-1": "1.1.1.1", "node-2": "1.1.1.2"}
+        assert cluster_metrics.last_heartbeat_time_by_ip["1.1.1.2"] == now + 1
+
+        # Reconcile again if heartbeats may have been missed
+        heartbeat_subscriber.missed = True
+        updater._update_node_heartbeats({})
+        assert scaling_state_client.num_reads == 2
+
+    def test_stale_heartbeats(self):
+        now = time.time()
+        scaling_state_client = ScalingStateClientForTest(
+            [NodeHeartbeatState("node-1", "1.1.1.1", now - 3600)])
+        updater = ClusterMetricsUpdater(
+            ClusterMetrics(), None, scaling_state_client)
+        heartbeat_nodes = {}
+        updater._update_node_heartbeats(heartbeat_nodes)
+        assert heartbeat_nodes == {}
+
+
+class TestNodeHeartbeatSubscriber:
+    def test_close_pubsub_on_reconnect(self, monkeypatch):
+        redis_client = RedisClientForTest()
+        subscriber = NodeHeartbeatSubscriber(redis_client)
+
+        def sleep(seconds):
+            if len(redis_client.pubsubs) == 2:
+                raise StopSubscriber()
+
+        monkeypatch.setattr(scaling_state, "time", types.SimpleNamespace(sleep=sleep))
+        with pytest.raises(StopSubscriber):
+            subscriber._run()
+        assert len(redis_client.pubsubs) == 2
+        assert all(pubsub.closed for pubsub in redis_client.pubsubs)
+        _, missed = subscriber.drain()
+        assert missed
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,158 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from cloudtik.core._private.cluster import cluster_rest_request
+from cloudtik.core._private.cluster.cluster_rest_request import \
+    SSHTunnelManager, request_rest_direct, request_rest_to_server
+
+CONFIG = {"auth": {"ssh_user": "ubuntu"}}
+
+
+class FakeTunnel:
+    def __init__(self, local_bind_port, broken=False):
+        self.local_bind_port = local_bind_port
+        self.is_active = False
+        self.stopped = False
+        # Whether the tunnel is broken without being noticed
+        self.broken = broken
+
+    def start(self):
+        self.is_active = True
+
+    def stop(self, force=False):
+        self.is_active = False
+        self.stopped = True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        status = 200 if self.path == "/ok" else 404
+        body = b"ok" if status == 200 else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    Handler.connections = set()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def opened_tunnels(monkeypatch):
+    tunnels = []
+
+    def open_tunnel(*args, **kwargs):
+        # The first tunnel to a "broken" address is broken
+        broken = not tunnels and kwargs["remote_bind_address"][0] == "broken"
+        tunnel = FakeTunnel(10000 + len(tunnels), broken=broken)
+        tunnels.append((kwargs["remote_bind_address"], tunnel))
+        return tunnel
+
+    monkeypatch.setattr(
+        cluster_rest_request.sshtunnel, "open_tunnel", open_tunnel)
+    return tunnels
+
+
+class TestClusterRestRequest:
+    def test_reuse_tunnel(self, opened_tunnels):
+        manager = SSHTunnelManager()
+        port = manager.get_local_port(CONFIG, "1.1.1.1", "10.0.0.1", 8080)
+        assert manager.get_local_port(
+            CONFIG, "1.1.1.1", "10.0.0.1", 8080) == port
+        assert manager.get_local_port(
+            CONFIG, "1.1.1.1", "10.0.0.1", 8081) != port
+        assert [address for address, _ in opened_tunnels] == [
+            ("10.0.0.1", 8080), ("10.0.0.1", 8081)]
+
+        manager.close_all()
+        assert all(tunnel.stopped for _, tunnel in opened_tunnels)
+
+    def test_reconnect_inactive_tunnel(self, opened_tunnels):
+        manager = SSHTunnelManager()
+        port = manager.get_local_port(CONFIG, "1.1.1.1", "10.0.0.1", 8080)
+        _, tunnel = opened_tunnels[0]
+        tunnel.is_active = False
+        assert manager.get_local_port(
+            CONFIG, "1.1.1.1", "10.0.0.1", 8080) != port
+        assert tunnel.stopped
+        assert len(opened_tunnels) == 2
+
+    def test_open_tunnels_concurrently(self, opened_tunnels, monkeypatch):
+        manager = SSHTunnelManager()
+        opening = threading.Event()
+        opened = threading.Event()
+        open_tunnel = cluster_rest_request.sshtunnel.open_tunnel
+
+        def open_tunnel_slowly(*args, **kwargs):
+            if kwargs["remote_bind_address"] == ("10.0.0.1", 8080):
+                opening.set()
+                assert opened.wait(10)
+            return open_tunnel(*args, **kwargs)
+
+        monkeypatch.setattr(
+            cluster_rest_request.sshtunnel, "open_tunnel", open_tunnel_slowly)
+        thread = threading.Thread(
+            target=manager.get_local_port,
+            args=(CONFIG, "1.1.1.1", "10.0.0.1", 8080))
+        thread.start()
+        assert opening.wait(10)
+        # The tunnel to another address is not blocked by the one opening
+        manager.get_local_port(CONFIG, "1.1.1.1", "10.0.0.2", 8080)
+        opened.set()
+        thread.join(10)
+        assert [address for address, _ in opened_tunnels] == [
+            ("10.0.0.2", 8080), ("10.0.0.1", 8080)]
+
+    def test_reconnect_broken_tunnel(self, opened_tunnels, monkeypatch):
+        monkeypatch.setattr(
+            cluster_rest_request, "_ssh_tunnel_manager", SSHTunnelManager())
+        tunnels_by_port = {}
+
+        def request_through_tunnel(rest_api_ip, rest_api_port, endpoint):
+            for _, tunnel in opened_tunnels:
+                tunnels_by_port[tunnel.local_bind_port] = tunnel
+            if tunnels_by_port[rest_api_port].broken:
+                raise requests.ConnectionError("Connection refused")
+            return b"ok"
+
+        monkeypatch.setattr(
+            cluster_rest_request, "request_rest_direct", request_through_tunnel)
+        assert request_rest_to_server(
+            CONFIG, "1.1.1.1", "broken", 8080, "ok") == b"ok"
+        # The broken tunnel is closed and opened again for one retry
+        assert len(opened_tunnels) == 2
+        assert opened_tunnels[0][1].stopped
+        assert not opened_tunnels[1][1].stopped
+
+    def test_keep_alive_connections(self, http_server):
+        port = http_server.server_address[1]
+        for _ in range(3):
+            assert request_rest_direct("127.0.0.1", port, "ok") == b"ok"
+        assert len(Handler.connections) == 1
+
+        with pytest.raises(requests.HTTPError):
+            request_rest_direct("127.0.0.1", port, "missing")
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,84 @@
+import subprocess
+
+import pytest
+
+from cloudtik.core._private.call_context import CallContext
+from cloudtik.core.command_executor import CommandExecutor, \
+    CommandBatchError, _with_batched_commands, _parse_command_statuses
+
+
+class LocalCommandExecutor(CommandExecutor):
+    """Run the commands locally with bash and record each session."""
+
+    def __init__(self):
+        super().__init__(CallContext())
+        self.sessions = []
+
+    def resolve_run_env(self, cmd, run_env):
+        if run_env == "auto":
+            return "host" if cmd.endswith("# host") else "docker"
+        return run_env
+
+    def run(self, cmd=None, timeout=120, exit_on_fail=False,
+            port_forward=None, with_output=False, environment_variables=None,
+            run_env="auto", ssh_options_override_ssh_key="",
+            shutdown_after_run=False, cmd_to_print=None, silent=False):
+        self.sessions.append((run_env, cmd_to_print))
+        env = {k: str(v) for k, v in (environment_variables or {}).items()}
+        result = subprocess.run(
+            ["bash", "-c", cmd], env=env, capture_output=True)
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, cmd)
+        if with_output:
+            return result.stdout
+
+
+class TestCommandBatch:
+    def test_batched_script(self, tmpdir):
+        status_file = str(tmpdir.join("batch.status"))
+        script = _with_batched_commands(
+            ["true", "echo hello", "exit 3", "echo unreachable"],
+            status_file, start_index=2)
+        result = subprocess.run(["bash", "-c", script], capture_output=True)
+        assert result.returncode == 3
+        assert b"hello" in result.stdout
+        assert b"unreachable" not in result.stdout
+        with open(status_file) as f:
+            statuses = _parse_command_statuses(f.read())
+        assert [(s.index, s.exit_code) for s in statuses] == [
+            (2, 0), (3, 0), (4, 3)]
+
+    def test_run_batch(self):
+        executor = LocalCommandExecutor()
+        statuses = executor.run_batch(
+            ["test \"$NAME\" = batch", "cd /", "test \"$(pwd)\" != /"],
+            environment_variables={"NAME": "batch"}, run_env="host")
+        # Each command runs in a sub shell
+        assert [s.index for s in statuses] == [0, 1, 2]
+        assert len(executor.sessions) == 1
+
+    def test_run_batch_failed(self):
+        executor = LocalCommandExecutor()
+        with pytest.raises(CommandBatchError) as e:
+            executor.run_batch(
+                ["true", "false", "true"], run_env="host", start_index=5)
+        assert e.value.failed_index == 6
+        assert [(s.index, s.exit_code) for s in e.value.statuses] == [
+            (5, 0), (6, 1)]
+
+    def test_run_batch_segments(self):
+        executor = LocalCommandExecutor()
+        with pytest.raises(CommandBatchError) as e:
+            executor.run_batch(
+                ["true # host", "true # host", "true", "false # host", "true"],
+                run_env="auto")
+        assert e.value.failed_index == 3
+        assert [run_env for run_env, _ in executor.sessions] == [
+            "host", "docker", "host", "host"]
+        assert [s.index for s in e.value.statuses] == [0, 1, 2, 3]
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,84 @@
+import pytest
+
+from cloudtik.core._private.cluster.config_snapshot import ConfigSnapshot
+from cloudtik.core._private.utils import hash_launch_conf
+
+CONFIG = {
+    "cluster_name": "snapshot",
+    "auth": {"ssh_user": "ubuntu"},
+    "docker": {"enabled": True, "image": "cloudtik/spark"},
+    "runtime": {"types": ["spark"], "spark": {"memory": "4g"}},
+    "merged_commands": {"worker_setup_commands": ["setup"]},
+    "available_node_types": {
+        "head.default": {
+            "resources": {"CPU": 4},
+            "node_config": {"InstanceType": "m5.xlarge"},
+        },
+        "worker.gpu": {
+            "resources": {"CPU": 8, "GPU": 1},
+            "node_config": {"InstanceType": "p3.2xlarge"},
+            "docker": {"image": "cloudtik/spark-gpu"},
+            "runtime": {"spark": {"memory": "8g"}},
+            "merged_commands": {"worker_setup_commands": ["setup-gpu"]},
+        },
+    },
+}
+
+
+class TestConfigSnapshot:
+    def test_node_type_views(self):
+        snapshot = ConfigSnapshot(CONFIG, "hash")
+        assert snapshot.config_hash == "hash"
+
+        assert snapshot.get_commands(
+            "head.default", "worker_setup_commands") == ["setup"]
+        assert snapshot.get_commands(
+            "worker.gpu", "worker_setup_commands") == ["setup-gpu"]
+        assert snapshot.get_docker_config("head.default") is CONFIG["docker"]
+        assert snapshot.get_docker_config("worker.gpu") == {
+            "enabled": True, "image": "cloudtik/spark-gpu"}
+        assert snapshot.get_runtime_config("worker.gpu") == {
+            "types": ["spark"], "spark": {"memory": "8g"}}
+        assert snapshot.get_resources("worker.gpu") == {"CPU": 8, "GPU": 1}
+        assert snapshot.get_launch_hash("worker.gpu") == hash_launch_conf(
+            {"InstanceType": "p3.2xlarge"}, CONFIG["auth"])
+        # The source config is not modified by the merges
+        assert CONFIG["docker"]["image"] == "cloudtik/spark"
+        assert CONFIG["runtime"]["spark"]["memory"] == "4g"
+
+    def test_views_resolved_once(self):
+        snapshot = ConfigSnapshot(CONFIG)
+        docker_config = snapshot.get_docker_config("worker.gpu")
+        assert snapshot.get_docker_config("worker.gpu") is docker_config
+        runtime_config = snapshot.get_runtime_config("worker.gpu")
+        assert snapshot.get_runtime_config("worker.gpu") is runtime_config
+
+    def test_key_files_modified(self, tmpdir):
+        key_file = tmpdir.join("key.pem")
+        key_file.write("key-1")
+        config = dict(CONFIG, auth={
+            "ssh_user": "ubuntu", "ssh_private_key": str(key_file)})
+        snapshot = ConfigSnapshot(config)
+        launch_hash = snapshot.get_launch_hash("worker.gpu")
+        assert not snapshot.check_key_files()
+        assert snapshot.get_launch_hash("worker.gpu") == launch_hash
+
+        key_file.write("key-2")
+        key_file.setmtime(key_file.mtime() + 10)
+        assert snapshot.check_key_files()
+        assert snapshot.get_launch_hash("worker.gpu") != launch_hash
+        assert snapshot.get_launch_hash("worker.gpu") == hash_launch_conf(
+            {"InstanceType": "p3.2xlarge"}, config["auth"])
+
+    def test_unknown_node_type(self):
+        snapshot = ConfigSnapshot(CONFIG)
+        with pytest.raises(ValueError):
+            snapshot.get_commands("worker.unknown", "worker_setup_commands")
+        assert snapshot.get_resources(None) == {}
+        assert snapshot.get_docker_config(None) is CONFIG["docker"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,142 @@
+import json
+import os
+import time
+
+import pytest
+
+from cloudtik.core._private import constants
+from cloudtik.core._private.service import cloudtik_log_monitor
+from cloudtik.core._private.service.cloudtik_log_monitor import LogMonitor
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+    def execute(self):
+        self.redis_client.executed.append(self.messages)
+
+
+class FakeRedisClient:
+    def __init__(self):
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def published_lines(self):
+        lines = {}
+        for messages in self.executed:
+            for channel, message in messages:
+                assert channel == constants.LOG_FILE_CHANNEL
+                data = json.loads(message)
+                lines.setdefault(data["pid"], []).extend(data["lines"])
+        return lines
+
+
+def _create_log_monitor(logs_dir):
+    log_monitor = LogMonitor(str(logs_dir), "127.0.0.1:6379")
+    log_monitor.redis_client = FakeRedisClient()
+    return log_monitor
+
+
+class TestLogMonitor:
+    def test_read_and_publish_in_one_pipeline(self, tmpdir):
+        log_monitor = _create_log_monitor(tmpdir)
+        with open(os.path.join(tmpdir, "worker-a-01-100.out"), "w") as f:
+            f.write("line-1\nline-2\n")
+        with open(os.path.join(tmpdir, "worker-b-01-101.err"), "w") as f:
+            f.write("error-1\npartial")
+
+        log_monitor.update_log_filenames()
+        log_monitor.open_closed_files()
+        assert log_monitor.check_log_files_and_publish_updates()
+        assert len(log_monitor.redis_client.executed) == 1
+        assert log_monitor.redis_client.published_lines() == {
+            100: ["line-1", "line-2"],
+            101: ["error-1", "partial"]}
+        assert not log_monitor.check_log_files_and_publish_updates()
+
+    def test_read_lines_in_chunks(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(
+            cloudtik_log_monitor, "LOG_MONITOR_READ_BUFFER_SIZE", 32)
+        log_monitor = _create_log_monitor(tmpdir)
+        lines = ["line-{}".format(i) * (i % 4) for i in range(100)]
+        lines.append("x" * 80)
+        with open(os.path.join(tmpdir, "worker-a-01-100.out"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        log_monitor.update_log_filenames()
+        log_monitor.open_closed_files()
+        assert log_monitor.check_log_files_and_publish_updates()
+        published = log_monitor.redis_client.published_lines()[100]
+        # The line longer than the buffer is split
+        assert published[:len(lines) - 1] == lines[:-1]
+        assert len(published) > len(lines)
+        assert "".join(published[len(lines) - 1:]) == lines[-1]
+
+    @pytest.mark.parametrize("watching", [False, True])
+    def test_reopen_file_closed_with_backlog(self, tmpdir, monkeypatch, watching):
+        monkeypatch.setattr(
+            cloudtik_log_monitor, "LOG_MONITOR_READ_BUFFER_SIZE", 16)
+        monkeypatch.setattr(
+            cloudtik_log_monitor, "LOG_MONITOR_MAX_READ_BYTES_PER_FILE", 16)
+        log_monitor = _create_log_monitor(tmpdir)
+        if watching:
+            log_monitor.changed_filenames = set()
+        # The worker is alive so that its log file is not moved when closed
+        pid = os.getpid()
+        lines = ["line-{}".format(i) for i in range(10)]
+        with open(os.path.join(
+                tmpdir, "worker-a-01-{}.out".format(pid)), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        log_monitor.update_log_filenames()
+        if watching:
+            log_monitor.changed_filenames.update(log_monitor.log_filenames)
+        log_monitor.open_closed_files()
+        assert log_monitor.check_log_files_and_publish_updates()
+        assert log_monitor.redis_client.published_lines()[pid] != lines
+
+        # The file is closed with a backlog and not written any more
+        for _ in range(len(lines)):
+            log_monitor.close_all_files()
+            log_monitor.open_closed_files()
+            if not log_monitor.check_log_files_and_publish_updates():
+                break
+        assert log_monitor.redis_client.published_lines()[pid] == lines
+
+    @pytest.mark.skipif(
+        cloudtik_log_monitor.Observer is None, reason="Requires watchdog")
+    def test_watch_file_changes(self, tmpdir):
+        log_monitor = _create_log_monitor(tmpdir)
+        observer = log_monitor.start_watching()
+        try:
+            log_monitor.update_log_filenames()
+            with open(os.path.join(tmpdir, "worker-a-01-100.out"), "w") as f:
+                f.write("line-1\n")
+            assert log_monitor.wakeup_event.wait(10)
+
+            deadline = time.time() + 10
+            while log_monitor.files_updated is False or not any(
+                    name.endswith("worker-a-01-100.out")
+                    for name in log_monitor.changed_filenames):
+                assert time.time() < deadline
+                time.sleep(0.1)
+            log_monitor.update_log_filenames()
+            log_monitor.open_closed_files()
+            assert log_monitor.check_log_files_and_publish_updates()
+            assert log_monitor.redis_client.published_lines() == {
+                100: ["line-1"]}
+        finally:
+            observer.stop()
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from cloudtik.core._private.cluster.node_updater_pool import NodeUpdaterPool
+
+
+class FakeUpdaterThread(threading.Thread):
+    def __init__(self, node_id, started, for_recovery=False):
+        super().__init__(daemon=True)
+        self.node_id = node_id
+        self.for_recovery = for_recovery
+        self.started = started
+        self.finish = threading.Event()
+
+    def run(self):
+        self.started.append(self.node_id)
+        assert self.finish.wait(10)
+
+
+class TestNodeUpdaterPool:
+    def test_limit_and_priority(self):
+        started = []
+        pool = NodeUpdaterPool(max_concurrent_updates=2)
+        updaters = [FakeUpdaterThread("node-{}".format(i), started)
+                    for i in range(4)]
+        updaters.append(FakeUpdaterThread("node-4", started, for_recovery=True))
+        for updater in updaters:
+            pool.submit(updater)
+        assert pool.num_running == 2
+        assert pool.num_queued == 3
+        assert pool.is_queued("node-4")
+        assert pool.cancel("node-2")
+        assert not pool.cancel("node-2")
+
+        # The recovery runs first when a slot is free
+        updaters[0].finish.set()
+        updaters[0].join(10)
+        updaters[4].finish.set()
+        updaters[4].join(10)
+        updaters[1].finish.set()
+        updaters[1].join(10)
+        updaters[3].finish.set()
+        updaters[3].join(10)
+        assert started == ["node-0", "node-1", "node-4", "node-3"]
+        assert pool.num_running == 0
+        assert pool.num_queued == 0
+        assert not updaters[2].is_alive()
+
+    def test_pending_while_starting(self):
+        pool = NodeUpdaterPool(max_concurrent_updates=1)
+        updater = FakeUpdaterThread("node-0", [])
+        states = []
+        start = updater.start
+
+        def start_with_check():
+            # Check from the scaler thread when the updater is not queued
+            # and not alive yet
+            def check():
+                states.append(
+                    pool.is_queued("node-0") or updater.is_alive())
+            checkers.append(threading.Thread(target=check))
+            checkers[0].start()
+            checkers[0].join(0.2)
+            start()
+
+        checkers = []
+        updater.start = start_with_check
+        pool.submit(updater)
+        checkers[0].join(10)
+        updater.finish.set()
+        updater.join(10)
+        assert states == [True]
+        assert not pool.is_queued("node-0")
+
+    def test_cancel_and_submit_again(self):
+        started = []
+        pool = NodeUpdaterPool(max_concurrent_updates=1)
+        updaters = [FakeUpdaterThread("node-0", started),
+                    FakeUpdaterThread("node-1", started),
+                    FakeUpdaterThread("node-2", started)]
+        for updater in updaters:
+            pool.submit(updater)
+        assert pool.cancel("node-1")
+        # Submitted again after node-2
+        updater_again = FakeUpdaterThread("node-1", started)
+        pool.submit(updater_again)
+        assert pool.num_queued == 2
+
+        # The entry of the cancelled updater doesn't start the node early
+        updaters[0].finish.set()
+        updaters[0].join(10)
+        updaters[2].finish.set()
+        updaters[2].join(10)
+        updater_again.finish.set()
+        updater_again.join(10)
+        assert started == ["node-0", "node-2", "node-1"]
+        assert pool.num_running == 0
+        assert pool.num_queued == 0
+        assert not updaters[1].is_alive()
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
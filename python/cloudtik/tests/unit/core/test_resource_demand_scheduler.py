@@ -0,0 +1,241 @@
+import collections
+import copy
+import random
+
+import pytest
+
+from cloudtik.core._private.cluster import resource_demand_scheduler
+from cloudtik.core._private.cluster.resource_bin_packing import bin_pack_residual, utilization_scores, \
+    is_exact
+from cloudtik.core._private.cluster.resource_demand_scheduler import _get_bin_pack_residual, \
+    _utilization_score, get_nodes_for, aggregate_resource_demands, expand_resource_demands, get_bin_pack_residual, \
+    _fits, _inplace_subtract
+
+NODE_TYPES = {
+    "cpu.small": {"resources": {"CPU": 2, "memory": 8}, "max_workers": 10},
+    "cpu.large": {"resources": {"CPU": 16, "memory": 64}, "max_workers": 5},
+    "gpu.large": {"resources": {"CPU": 8, "GPU": 2, "memory": 32}, "max_workers": 3},
+    "head": {"resources": {"CPU": 4, "memory": 16}, "max_workers": 0},
+}
+
+
+# The fractions which are exact in float arithmetic
+EXACT_CPUS = [0.5, 1, 2, 4]
+# The fractions which accumulate rounding errors when subtracted one by one
+INEXACT_CPUS = [0.1, 0.2, 0.3, 1, 2]
+
+
+def _random_demands(rng, count, cpus=EXACT_CPUS):
+    demands = []
+    for _ in range(count):
+        demand = {"CPU": rng.choice(cpus)}
+        if rng.random() < 0.5:
+            demand["memory"] = rng.choice([1, 2, 4, 8])
+        if rng.random() < 0.1:
+            demand["GPU"] = 1
+        demands.append(demand)
+    return demands
+
+
+def _random_nodes(rng, count, cpus=(0, 1, 1.5)):
+    nodes = []
+    for _ in range(count):
+        node_type = rng.choice(list(NODE_TYPES))
+        node = dict(NODE_TYPES[node_type]["resources"])
+        node["CPU"] = rng.choice(list(cpus) + [node["CPU"]])
+        nodes.append(node)
+    return nodes
+
+
+def _baseline_get_bin_pack_residual(node_resources, resource_demands,
+                                    strict_spread=False):
+    """A copy of get_bin_pack_residual before the demands are aggregated."""
+    unfulfilled = []
+    nodes = copy.deepcopy(node_resources)
+    used = []
+    for demand in sorted(
+            resource_demands,
+            key=lambda demand: (len(demand.values()),
+                                sum(demand.values()),
+                                sorted(demand.items())),
+            reverse=True):
+        found = False
+        node = None
+        for i in range(len(nodes)):
+            node = nodes[i]
+            if _fits(node, demand):
+                found = True
+                if strict_spread:
+                    used.append(node)
+                    del nodes[i]
+                break
+        if found and node:
+            _inplace_subtract(node, demand)
+        else:
+            unfulfilled.append(demand)
+    return unfulfilled, nodes + used
+
+
+def _baseline_get_nodes_for(node_types, existing_nodes, head_node_type,
+                            max_to_add, resources, strict_spread=False):
+    """A copy of get_nodes_for before the demands are aggregated."""
+    nodes_to_add = collections.defaultdict(int)
+    while resources and sum(nodes_to_add.values()) < max_to_add:
+        utilization_scores = []
+        for node_type in node_types:
+            max_workers_of_node_type = node_types[node_type].get(
+                "max_workers", 0)
+            if head_node_type == node_type:
+                max_workers_of_node_type = max_workers_of_node_type + 1
+            if (existing_nodes.get(node_type, 0) + nodes_to_add.get(
+                    node_type, 0) >= max_workers_of_node_type):
+                continue
+            node_resources = node_types[node_type]["resources"]
+            if strict_spread:
+                score = _utilization_score(node_resources, [resources[0]])
+            else:
+                score = _utilization_score(node_resources, resources)
+            if score is not None:
+                utilization_scores.append((score, node_type))
+        if not utilization_scores:
+            break
+        utilization_scores = sorted(utilization_scores, reverse=True)
+        best_node_type = utilization_scores[0][1]
+        nodes_to_add[best_node_type] += 1
+        if strict_spread:
+            resources = resources[1:]
+        else:
+            allocated_resource = node_types[best_node_type]["resources"]
+            residual, _ = _baseline_get_bin_pack_residual(
+                [allocated_resource], resources)
+            resources = residual
+    return nodes_to_add, resources
+
+
+class TestBinPackingParity:
+    @pytest.mark.parametrize("strict_spread", [False, True])
+    def test_bin_pack_residual(self, strict_spread):
+        rng = random.Random(7)
+        for _ in range(50):
+            nodes = _random_nodes(rng, rng.randint(0, 20))
+            demands = _random_demands(rng, rng.randint(0, 50))
+            unfulfilled, updated_nodes = bin_pack_residual(
+                nodes, aggregate_resource_demands(demands), strict_spread)
+            assert (expand_resource_demands(unfulfilled), updated_nodes) == \
+                _get_bin_pack_residual(nodes, demands, strict_spread)
+
+    def test_bin_pack_residual_empty_node(self):
+        nodes = [{}, {"CPU": 2}]
+        demands = [{}, {"CPU": 1}]
+        for strict_spread in [False, True]:
+            unfulfilled, updated_nodes = bin_pack_residual(
+                nodes, aggregate_resource_demands(demands), strict_spread)
+            assert (expand_resource_demands(unfulfilled), updated_nodes) == \
+                _get_bin_pack_residual(nodes, demands, strict_spread)
+
+    def test_utilization_scores(self):
+        rng = random.Random(11)
+        node_resources_list = [
+            node_type_config["resources"]
+            for node_type_config in NODE_TYPES.values()]
+        for _ in range(50):
+            demands = _random_demands(rng, rng.randint(1, 50))
+            demand_counts = aggregate_resource_demands(demands)
+            assert utilization_scores(node_resources_list, demand_counts) == [
+                _utilization_score(node_resources, demands)
+                for node_resources in node_resources_list]
+
+    @pytest.mark.parametrize("strict_spread", [False, True])
+    @pytest.mark.parametrize("vectorized", [False, True])
+    @pytest.mark.parametrize("cpus", [EXACT_CPUS, INEXACT_CPUS])
+    def test_get_nodes_for(self, monkeypatch, strict_spread, vectorized, cpus):
+        monkeypatch.setattr(
+            resource_demand_scheduler,
+            "CLOUDTIK_VECTORIZED_BIN_PACKING", vectorized)
+        rng = random.Random(13)
+        for _ in range(100):
+            # The demands are interleaved and unsorted
+            demands = _random_demands(rng, rng.randint(1, 100), cpus=cpus)
+            # Make runs of the identical bundles
+            demands = [demand for demand in demands
+                       for _ in range(rng.randint(1, 3))]
+            assert get_nodes_for(
+                NODE_TYPES, {"head": 1}, "head", 15, demands,
+                strict_spread=strict_spread) == _baseline_get_nodes_for(
+                NODE_TYPES, {"head": 1}, "head", 15, demands,
+                strict_spread=strict_spread)
+
+    @pytest.mark.parametrize("strict_spread", [False, True])
+    @pytest.mark.parametrize("vectorized", [False, True])
+    def test_get_bin_pack_residual(self, monkeypatch, strict_spread, vectorized):
+        monkeypatch.setattr(
+            resource_demand_scheduler,
+            "CLOUDTIK_VECTORIZED_BIN_PACKING", vectorized)
+        rng = random.Random(19)
+        for _ in range(50):
+            nodes = _random_nodes(rng, rng.randint(0, 20))
+            demands = _random_demands(rng, rng.randint(0, 50))
+            assert get_bin_pack_residual(nodes, demands, strict_spread) == \
+                _baseline_get_bin_pack_residual(nodes, demands, strict_spread)
+
+    def test_is_exact(self):
+        assert is_exact([{"CPU": 1, "memory": 2 ** 35}, {"CPU": 0.5, "GPU": 0.25}])
+        assert not is_exact([{"CPU": 1}, {"CPU": 0.1}])
+        assert not is_exact([{"memory": 2 ** 40}])
+
+    @pytest.mark.parametrize("strict_spread", [False, True])
+    def test_inexact_fractions(self, monkeypatch, strict_spread):
+        rng = random.Random(17)
+        for _ in range(50):
+            nodes = _random_nodes(rng, rng.randint(0, 20), cpus=(0, 0.3, 0.9, 1))
+            demands = _random_demands(rng, rng.randint(0, 50), cpus=INEXACT_CPUS)
+            results = []
+            for vectorized in [True, False]:
+                monkeypatch.setattr(
+                    resource_demand_scheduler,
+                    "CLOUDTIK_VECTORIZED_BIN_PACKING", vectorized)
+                results.append((
+                    get_bin_pack_residual(nodes, demands, strict_spread),
+                    get_nodes_for(NODE_TYPES, {"head": 1}, "head", 15, demands,
+                                  strict_spread=strict_spread)))
+            assert results[0] == results[1]
+            assert results[0][0] == _get_bin_pack_residual(
+                nodes, demands, strict_spread)
+
+
+class TestDemandAggregation:
+    def test_aggregate_resource_demands(self):
+        demands = [{"CPU": 1}, {"CPU": 1}, {"memory": 4, "CPU": 2},
+                   {"CPU": 2, "memory": 4}, {"CPU": 1}]
+        # Only the runs of identical bundles are collapsed to keep the order
+        assert aggregate_resource_demands(demands) == [
+            ({"CPU": 1}, 2), ({"memory": 4, "CPU": 2}, 2), ({"CPU": 1}, 1)]
+        assert expand_resource_demands(
+            aggregate_resource_demands(demands)) == demands
+        assert aggregate_resource_demands(None) == []
+        assert expand_resource_demands([({"CPU": 1}, 2), ({"GPU": 1}, 1)]) == [
+            {"CPU": 1}, {"CPU": 1}, {"GPU": 1}]
+
+    def test_bin_pack_many_identical_bundles(self):
+        nodes = [{"CPU": 4}, {"CPU": 16}, {"CPU": 8}]
+        unfulfilled, updated_nodes = bin_pack_residual(
+            nodes, [({"CPU": 3}, 10000)])
+        assert unfulfilled == [({"CPU": 3}, 10000 - 1 - 5 - 2)]
+        assert updated_nodes == [{"CPU": 1}, {"CPU": 1}, {"CPU": 2}]
+
+        unfulfilled, updated_nodes = get_bin_pack_residual(
+            nodes, [{"CPU": 3}] * 5)
+        assert unfulfilled == []
+        assert updated_nodes == [{"CPU": 1}, {"CPU": 4}, {"CPU": 8}]
+
+    def test_get_nodes_for_many_identical_bundles(self):
+        nodes_to_add, unfulfilled = get_nodes_for(
+            NODE_TYPES, {"head": 1}, "head", 3, [{"CPU": 1}] * 100000)
+        assert nodes_to_add == {"cpu.large": 3}
+        assert len(unfulfilled) == 100000 - 3 * 16
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
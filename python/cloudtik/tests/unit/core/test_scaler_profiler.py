@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+
+import pytest
+
+from cloudtik.core._private.cluster import scaler_profiler
+from cloudtik.core._private.cluster.scaler_profiler import ScalerProfiler, RedisCallCounter
+from cloudtik.core.node_provider import NodeProvider
+
+
+class FakeMetric:
+    def __init__(self):
+        self.children = {}
+        self.values = []
+
+    def labels(self, **kwargs):
+        key = tuple(sorted(kwargs.items()))
+        if key not in self.children:
+            self.children[key] = FakeMetric()
+        return self.children[key]
+
+    def observe(self, value):
+        self.values.append(value)
+
+    def inc(self, amount=1):
+        self.values.append(amount)
+
+    def set(self, value):
+        self.values.append(value)
+
+
+class FakePrometheusMetrics:
+    def __init__(self):
+        self.update_phase_time = FakeMetric()
+        self.provider_calls = FakeMetric()
+        self.provider_call_time = FakeMetric()
+        self.update_redis_calls = FakeMetric()
+
+
+class FakeProvider(NodeProvider):
+    def __init__(self):
+        super().__init__({}, "test")
+        self.nodes = ["node-1", "node-2"]
+
+    def non_terminated_nodes(self, tag_filters):
+        return list(self.nodes)
+
+    def internal_ip(self, node_id):
+        return "10.0.0.{}".format(self.nodes.index(node_id) + 1)
+
+
+class FakePipeline:
+    def __init__(self):
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(("GET", key))
+        return self
+
+    def execute(self):
+        return [None] * len(self.commands)
+
+
+class FakeRedisClient:
+    def execute_command(self, *args):
+        return None
+
+    def get(self, key):
+        return self.execute_command("GET", key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline()
+
+
+class TestScalerProfiler:
+    def test_phase_times(self):
+        metrics = FakePrometheusMetrics()
+        profiler = ScalerProfiler(metrics)
+        with profiler.tick():
+            with profiler.phase("a"):
+                time.sleep(0.01)
+            with profiler.phase("b"):
+                pass
+            with profiler.phase("a"):
+                pass
+        assert set(profiler.phase_times) == {"a", "b"}
+        assert profiler.phase_times["a"] >= 0.01
+        assert len(metrics.update_phase_time.labels(phase="a").values) == 2
+        assert len(metrics.update_phase_time.labels(phase="b").values) == 1
+
+        with profiler.tick():
+            pass
+        assert profiler.phase_times == {}
+
+    def test_instrument_provider(self):
+        metrics = FakePrometheusMetrics()
+        profiler = ScalerProfiler(metrics)
+        provider = FakeProvider()
+        profiler.instrument_provider(provider)
+        # Instrumenting again doesn't wrap the methods twice
+        profiler.instrument_provider(provider)
+        assert isinstance(provider, FakeProvider)
+
+        with profiler.tick():
+            node_ids = provider.non_terminated_nodes({})
+            for node_id in node_ids:
+                provider.internal_ip(node_id)
+        assert profiler.provider_calls == {
+            "non_terminated_nodes": 1, "internal_ip": 2}
+        assert metrics.provider_calls.labels(
+            method="internal_ip").values == [1, 1]
+        assert len(metrics.provider_call_time.labels(
+            method="non_terminated_nodes").values) == 1
+
+    def test_provider_calls_from_threads(self):
+        profiler = ScalerProfiler(FakePrometheusMetrics())
+        provider = FakeProvider()
+        profiler.instrument_provider(provider)
+
+        def call_provider():
+            for _ in range(1000):
+                provider.internal_ip("node-1")
+
+        with profiler.tick():
+            threads = [threading.Thread(target=call_provider) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert profiler.provider_calls == {"internal_ip": 8000}
+
+    def test_redis_calls(self):
+        metrics = FakePrometheusMetrics()
+        redis_clients = [FakeRedisClient()]
+        other_client = FakeRedisClient()
+        profiler = ScalerProfiler(
+            metrics, redis_call_counter=RedisCallCounter(lambda: redis_clients))
+        with profiler.tick():
+            redis_clients[0].get("a")
+            pipeline = redis_clients[0].pipeline()
+            pipeline.get("b").get("c")
+            pipeline.execute()
+            # The calls of the other clients are not counted
+            other_client.get("a")
+        assert profiler.redis_calls == 2
+
+        # The clients connected later are counted from the next tick
+        redis_clients.append(FakeRedisClient())
+        with profiler.tick():
+            for redis_client in redis_clients:
+                redis_client.get("a")
+        assert profiler.redis_calls == 2
+        assert metrics.update_redis_calls.values == [2, 2]
+
+        # The clients are not wrapped again
+        with profiler.tick():
+            redis_clients[0].get("a")
+        assert profiler.redis_calls == 1
+
+    def test_keep_slowest_profiles(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(scaler_profiler, "CLOUDTIK_SCALER_PROFILE", True)
+        profiler = ScalerProfiler.from_logs_dir(
+            FakePrometheusMetrics(), str(tmpdir))
+        profiler.slowest_ticks = 2
+        for sleep_s in [0.03, 0.0, 0.05, 0.0]:
+            with profiler.tick():
+                time.sleep(sleep_s)
+        profile_dir = os.path.join(
+            str(tmpdir), scaler_profiler.SCALER_PROFILES_DIR)
+        profiles = sorted(os.listdir(profile_dir))
+        assert len(profiles) == 2
+        assert sorted(int(profile.split("-")[-2]) for profile in profiles) == [1, 3]
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,143 @@
+import subprocess
+
+import click
+import pytest
+
+from cloudtik.core._private import command_executor
+from cloudtik.core._private.call_context import CallContext
+from cloudtik.core._private.command_executor import SSHCommandExecutor, SSHControlMasterPool
+
+
+class FakeProcessRunner:
+    """Model the SSH masters of the targets. A command with
+    ControlMaster=auto uses the master of the target if there is one,
+    otherwise it becomes the master which is kept for ControlPersist."""
+
+    def __init__(self):
+        self.calls = []
+        # target -> the ControlPersist of the master
+        self.masters = {}
+        # The targets which are not accepting connections
+        self.unreachable = set()
+
+    def expire(self):
+        """The masters not persisted forever exit."""
+        self.masters = {
+            target: persist for target, persist in self.masters.items()
+            if persist == "yes"}
+
+    def _ssh(self, cmd):
+        self.calls.append(cmd)
+        target = [arg for arg in cmd if "@" in arg][0]
+        if "-O" in cmd:
+            command = cmd[cmd.index("-O") + 1]
+            if command == "check" and target not in self.masters:
+                raise subprocess.CalledProcessError(255, cmd)
+            if command == "exit":
+                self.masters.pop(target, None)
+            return
+        if target in self.unreachable:
+            raise subprocess.CalledProcessError(255, cmd)
+        options = dict(
+            cmd[i + 1].split("=", 1) for i, arg in enumerate(cmd) if arg == "-o")
+        control_master = options.get("ControlMaster")
+        if control_master == "yes" or (
+                control_master == "auto" and target not in self.masters):
+            self.masters[target] = options.get("ControlPersist")
+
+    def check_call(self, cmd, **kwargs):
+        self._ssh(cmd)
+        return 0
+
+    def check_output(self, cmd, **kwargs):
+        self._ssh(cmd)
+        return b""
+
+
+def _create_executor(process_runner, ip):
+    executor = SSHCommandExecutor(
+        CallContext(), "", "node-1", None,
+        {"ssh_user": "ubuntu", "ssh_private_key": "~/.ssh/key.pem"},
+        "cluster", process_runner, True)
+    executor.ssh_ip = ip
+    return executor
+
+
+def _commands(process_runner, name):
+    return [cmd for cmd in process_runner.calls if name in cmd]
+
+
+class TestSSHControlMasterPool:
+    def test_connect_check_and_close(self):
+        process_runner = FakeProcessRunner()
+        pool = SSHControlMasterPool(check_interval_s=0)
+        executor = _create_executor(process_runner, "10.0.0.1")
+
+        # No master yet so the pool starts one
+        assert pool.connect(executor)
+        assert "ControlMaster=yes" in process_runner.calls[1]
+        assert "ControlPersist=yes" in process_runner.calls[1]
+        assert process_runner.masters == {"ubuntu@10.0.0.1": "yes"}
+        assert pool.ips == ["10.0.0.1"]
+
+        # Alive master is reused after the check
+        assert pool.connect(executor)
+        assert len(_commands(process_runner, "check")) == 2
+        assert len(process_runner.calls) == 3
+
+        # Gone master is started again
+        process_runner.masters.clear()
+        assert pool.connect(executor)
+        assert len(process_runner.calls) == 5
+
+        pool.connect(_create_executor(process_runner, "10.0.0.2"))
+        pool.prune(["10.0.0.2"])
+        assert pool.ips == ["10.0.0.2"]
+        assert len(_commands(process_runner, "exit")) == 1
+
+    def test_executor_uses_pool(self, monkeypatch):
+        process_runner = FakeProcessRunner()
+        pool = SSHControlMasterPool()
+        monkeypatch.setattr(command_executor, "_ssh_control_master_pool", pool)
+        executor = _create_executor(process_runner, "10.0.0.1")
+        for i in range(3):
+            executor.run("echo {}".format(i), with_output=True)
+        # The first command is the master which is checked by the pool
+        assert len(process_runner.calls) == 4
+        assert len(_commands(process_runner, "check")) == 1
+        assert pool.ips == ["10.0.0.1"]
+
+        # The master is kept after the command
+        process_runner.expire()
+        assert process_runner.masters == {"ubuntu@10.0.0.1": "yes"}
+
+    def test_unreachable_node(self, monkeypatch):
+        process_runner = FakeProcessRunner()
+        process_runner.unreachable.add("ubuntu@10.0.0.1")
+        pool = SSHControlMasterPool()
+        monkeypatch.setattr(command_executor, "_ssh_control_master_pool", pool)
+        executor = _create_executor(process_runner, "10.0.0.1")
+
+        # The failed probes don't try to start the master
+        for _ in range(3):
+            with pytest.raises(click.ClickException):
+                executor.run("uptime", timeout=5, with_output=True)
+        assert len(process_runner.calls) == 3
+        assert pool.ips == []
+
+        # A failed master is not started again within the check interval
+        assert not pool.connect(executor, timeout=5)
+        assert "ConnectTimeout=5s" in process_runner.calls[-1]
+        assert not pool.connect(executor, timeout=5)
+        assert len(process_runner.calls) == 5
+
+        pool.prune([])
+        process_runner.unreachable.clear()
+        executor.run("uptime", timeout=5, with_output=True)
+        assert pool.ips == ["10.0.0.1"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+import pytest
+
+from cloudtik.core._private import template_cache
+from cloudtik.core._private.template_cache import load_template_file, \
+    record_template_files, is_template_files_up_to_date
+
+
+@pytest.fixture
+def cache_dir(tmpdir, monkeypatch):
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmpdir))
+    monkeypatch.setattr(template_cache, "_templates", {})
+    return tmpdir
+
+
+def _write_template(path, value):
+    with open(path, "w") as f:
+        f.write("provider:\n  type: {}\n".format(value))
+
+
+class TestTemplateCache:
+    def test_load_template_file(self, cache_dir):
+        path = str(cache_dir.join("template.yaml"))
+        _write_template(path, "aws")
+
+        config = load_template_file(path)
+        assert config == {"provider": {"type": "aws"}}
+
+        # The caller can modify the returned config
+        config["provider"]["type"] = "gcp"
+        assert load_template_file(path) == {"provider": {"type": "aws"}}
+
+        with pytest.raises(FileNotFoundError):
+            load_template_file(str(cache_dir.join("not-exist.yaml")))
+
+    def test_pickled_template(self, cache_dir, monkeypatch):
+        path = str(cache_dir.join("template.yaml"))
+        _write_template(path, "aws")
+        load_template_file(path)
+
+        cache_files = os.listdir(
+            template_cache._get_cache_dir())
+        assert len(cache_files) == 1
+
+        # A new process loads the pickled template without parsing
+        monkeypatch.setattr(template_cache, "_templates", {})
+
+        def fail_load(stream):
+            raise AssertionError("Template should be loaded from cache.")
+
+        monkeypatch.setattr(template_cache.yaml, "safe_load", fail_load)
+        assert load_template_file(path) == {"provider": {"type": "aws"}}
+
+    def test_record_template_files(self, cache_dir):
+        path = str(cache_dir.join("template.yaml"))
+        _write_template(path, "aws")
+
+        with record_template_files() as template_files:
+            load_template_file(path)
+        assert list(template_files.keys()) == [path]
+        assert is_template_files_up_to_date(template_files)
+
+        # Files loaded out of the context are not recorded
+        load_template_file(path)
+        assert len(template_files) == 1
+
+        _write_template(path, "azure")
+        os.utime(path, ns=(0, 0))
+        assert not is_template_files_up_to_date(template_files)
+        assert load_template_file(path) == {"provider": {"type": "azure"}}
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
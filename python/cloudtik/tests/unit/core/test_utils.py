@@ -6,6 +6,7 @@ import pytest
 from cloudtik.core._private.call_context import CallContext
 from cloudtik.core._private.utils import update_nested_dict, process_config_with_privacy, encrypt_config, \
     decrypt_config, hash_runtime_conf, run_in_parallel_on_nodes, ParallelTaskSkipped
+from cloudtik.providers._private.utils import terminate_nodes_concurrently
 
 TARGET_DICT_WITH_MATCHED_LIST = {
     "test_list": [
@@ -252,6 +253,24 @@ class TestUtils:
         assert failures == 1
         assert skipped == 1
 
+    def test_terminate_nodes_concurrently(self):
+        test_nodes = ["node-{}".format(i) for i in range(20)]
+        terminated = []
+
+        def terminate_node(node_id):
+            if node_id == "node-3":
+                raise RuntimeError("Node {} is busy.".format(node_id))
+            time.sleep(0.1)
+            terminated.append(node_id)
+
+        start = time.time()
+        failed_nodes = terminate_nodes_concurrently(
+            terminate_node, test_nodes, max_workers=10)
+        assert time.time() - start < 1
+        assert list(failed_nodes.keys()) == ["node-3"]
+        assert sorted(terminated) == sorted(
+            node_id for node_id in test_nodes if node_id != "node-3")
+
 
 if __name__ == "__main__":
     import sys
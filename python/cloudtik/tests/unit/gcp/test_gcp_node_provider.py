@@ -1,9 +1,14 @@
+import threading
 from typing import List
+from unittest import mock
 
 import pytest
+from googleapiclient.errors import HttpError
 
-from cloudtik.providers._private.gcp.node import GCPCompute
-from cloudtik.providers._private.gcp.node_provider import _retry
+from cloudtik.core.tags import CLOUDTIK_TAG_NODE_NAME
+from cloudtik.providers._private.gcp import node as gcp_node
+from cloudtik.providers._private.gcp.node import GCPCompute, GCPComputeNode
+from cloudtik.providers._private.gcp.node_provider import _retry, GCPNodeProvider
 
 _PROJECT_NAME = "project-one"
 _AZ = "us-west1-b"
@@ -106,6 +111,275 @@ def test_convert_resources_to_urls_accelerators(test_case):
                "acceleratorType"] == result_accel
 
 
+class MockRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response()
+
+
+class MockBatchRequest:
+    def __init__(self, compute, callback):
+        self.compute = compute
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.compute.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class MockZoneOperations:
+    def __init__(self):
+        self.polls = {}
+
+    def get(self, project, operation, zone):
+        def poll():
+            self.polls[operation] = self.polls.get(operation, 0) + 1
+            status = "DONE" if self.polls[operation] >= 2 else "RUNNING"
+            if "failed" in operation:
+                return {"name": operation, "status": "DONE",
+                        "error": {"errors": [{"code": "RESOURCE_IN_USE"}]}}
+            return {"name": operation, "status": status}
+        return MockRequest(poll)
+
+
+class MockInstances:
+    def __init__(self):
+        self.labels = {}
+        self.label_fingerprint = 0
+        self.calls = []
+        self.names = []
+
+    def insert(self, project, zone, sourceInstanceTemplate, body):
+        return MockRequest(lambda: {"name": "op-" + body["name"]})
+
+    def delete(self, project, zone, instance):
+        def delete_instance():
+            if "missing" in instance:
+                raise HttpError(mock.Mock(status=404), b"")
+            return {"name": "op-delete-" + instance}
+        return MockRequest(delete_instance)
+
+    def list(self, project, zone, filter):
+        return MockRequest(lambda: {"items": [
+            self._get_instance(name) for name in self.names]})
+
+    def get(self, project, zone, instance):
+        self.calls.append(("get", instance))
+        return MockRequest(lambda: self._get_instance(instance))
+
+    def _get_instance(self, name):
+        return {"name": name,
+                "status": "RUNNING",
+                "labels": dict(self.labels),
+                "labelFingerprint": str(self.label_fingerprint)}
+
+    def setLabels(self, project, zone, instance, body):
+        self.calls.append(("setLabels", body["labelFingerprint"]))
+
+        def set_labels():
+            if body["labelFingerprint"] != str(self.label_fingerprint):
+                raise HttpError(mock.Mock(status=412), b"")
+            if "failed" in instance:
+                return {"name": f"op-labels-failed-{instance}"}
+            self.labels = body["labels"]
+            self.label_fingerprint += 1
+            return {"name": f"op-labels-{self.label_fingerprint}"}
+        return MockRequest(set_labels)
+
+
+class MockCompute:
+    """A compute client of which the operations are done at the second poll."""
+
+    def __init__(self):
+        self.batches = []
+        self._instances = MockInstances()
+        self._zone_operations = MockZoneOperations()
+
+    def new_batch_http_request(self, callback):
+        return MockBatchRequest(self, callback)
+
+    def instances(self):
+        return self._instances
+
+    def zoneOperations(self):
+        return self._zone_operations
+
+
+def test_create_instances_batched(monkeypatch):
+    monkeypatch.setattr(gcp_node.time, "sleep", lambda _: None)
+    compute = MockCompute()
+    gcp_compute = GCPCompute(compute, _PROJECT_NAME, _AZ, "cluster_name")
+    results = gcp_compute.create_instances(
+        {"machineType": "n1-standard-4"},
+        {CLOUDTIK_TAG_NODE_NAME: "cloudtik-cluster_name-worker"}, 3)
+
+    assert len(results) == 3
+    for result, node_name in results:
+        assert result == {"name": "op-" + node_name, "status": "DONE"}
+    # One batch of inserts and two batches of polls
+    assert compute.batches == [3, 3, 3]
+
+
+def test_wait_for_operations_batch_size(monkeypatch):
+    monkeypatch.setattr(gcp_node.time, "sleep", lambda _: None)
+    monkeypatch.setattr(gcp_node, "MAX_BATCH_REQUESTS", 2)
+    compute = MockCompute()
+    gcp_compute = GCPCompute(compute, _PROJECT_NAME, _AZ, "cluster_name")
+    results = gcp_compute.wait_for_operations(
+        [{"name": f"op-{i}"} for i in range(3)])
+
+    assert [result["name"] for result in results] == ["op-0", "op-1", "op-2"]
+    assert compute.batches == [2, 1, 2, 1]
+
+
+def _make_provider(compute):
+    with mock.patch(
+            "cloudtik.providers._private.gcp.node_provider."
+            "construct_clients_from_provider_config",
+            return_value=(None, None, compute, None)):
+        return GCPNodeProvider(
+            provider_config={"project_id": _PROJECT_NAME,
+                             "availability_zone": _AZ},
+            cluster_name="cluster_name")
+
+
+def test_set_node_tags_batched(monkeypatch):
+    num_threads = 100
+    batches = []
+    provider = _make_provider(None)
+    monkeypatch.setattr(
+        provider, "_set_labels", lambda batch_updates: batches.append(
+            dict(batch_updates)))
+    provider.tag_cache = {
+        f"node-{x}-compute": {"status": "uninitialized"}
+        for x in range(num_threads)}
+
+    threads = [
+        threading.Thread(target=provider.set_node_tags, args=(
+            f"node-{x}-compute", {"status": "up-to-date"}))
+        for x in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(batches) < num_threads / 10
+    assert sum(len(batch_updates) for batch_updates in batches) == num_threads
+    for x in range(num_threads):
+        assert provider.node_tags(f"node-{x}-compute") == {
+            "status": "up-to-date"}
+
+
+def test_set_node_tags_failed(monkeypatch):
+    monkeypatch.setattr(
+        "cloudtik.providers._private.gcp.node_provider.TAG_BATCH_DELAY", 0)
+    provider = _make_provider(None)
+    node_id = "node-compute"
+    provider.cached_nodes[node_id] = GCPComputeNode(
+        {"name": node_id, "labels": {"status": "uninitialized"}},
+        provider.resources[gcp_node.GCPNodeType.COMPUTE])
+    provider.tag_cache[node_id] = {"status": "uninitialized"}
+    batches = []
+
+    def set_labels(batch_updates):
+        batches.append(dict(batch_updates))
+        if len(batches) == 1:
+            raise HttpError(mock.Mock(status=404), b"")
+
+    monkeypatch.setattr(provider, "_set_labels", set_labels)
+
+    with pytest.raises(HttpError):
+        provider.set_node_tags(node_id, {"status": "waiting-for-ssh"})
+    # The failed labels are not taken as set
+    assert provider.node_tags(node_id) == {"status": "uninitialized"}
+
+    # The next batch is not blocked by the failed one
+    thread = threading.Thread(
+        target=provider.set_node_tags, args=(node_id, {"status": "up-to-date"}))
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(batches) == 2
+    assert provider.batch_thread_count == 0
+    assert provider.node_tags(node_id) == {"status": "up-to-date"}
+
+
+def test_set_node_tags_fingerprint(monkeypatch):
+    monkeypatch.setattr(gcp_node.time, "sleep", lambda _: None)
+    monkeypatch.setattr(
+        "cloudtik.providers._private.gcp.node_provider.TAG_BATCH_DELAY", 0)
+    compute = MockCompute()
+    instances = compute.instances()
+    provider = _make_provider(compute)
+    node_id = "node-compute"
+    # The labels were changed since the node was listed
+    provider.cached_nodes[node_id] = GCPComputeNode(
+        {"name": node_id, "labels": {}, "labelFingerprint": "0"},
+        provider.resources[gcp_node.GCPNodeType.COMPUTE])
+    instances.label_fingerprint = 1
+    instances.labels = {"owner": "other"}
+
+    provider.set_node_tags(node_id, {"status": "waiting-for-ssh"})
+    provider.set_node_tags(node_id, {"status": "up-to-date"})
+
+    assert instances.labels == {"owner": "other", "status": "up-to-date"}
+    assert provider.node_tags(node_id) == instances.labels
+    # The node is got for the out of date fingerprints and never listed
+    assert instances.calls == [
+        ("setLabels", "0"), ("get", node_id), ("setLabels", "1"),
+        ("get", node_id), ("setLabels", "2")]
+
+
+def test_set_node_tags_operation_failed(monkeypatch):
+    monkeypatch.setattr(gcp_node.time, "sleep", lambda _: None)
+    monkeypatch.setattr(
+        "cloudtik.providers._private.gcp.node_provider.TAG_BATCH_DELAY", 0)
+    compute = MockCompute()
+    instances = compute.instances()
+    provider = _make_provider(compute)
+    node_id = "node-failed-compute"
+    instances.names = [node_id]
+    instances.labels = {"status": "uninitialized"}
+    provider.non_terminated_nodes({})
+
+    with pytest.raises(Exception):
+        provider.set_node_tags(node_id, {"status": "waiting-for-ssh"})
+    # The labels of the failed operation are not taken as set
+    assert node_id not in provider.cached_nodes
+    assert provider.node_tags(node_id) == {"status": "uninitialized"}
+    # One batch of set labels and one batch of polls
+    assert compute.batches == [1, 1]
+
+
+def test_terminate_nodes_batched(monkeypatch):
+    monkeypatch.setattr(gcp_node.time, "sleep", lambda _: None)
+    compute = MockCompute()
+    provider = _make_provider(compute)
+    reported = []
+    monkeypatch.setattr(
+        "cloudtik.providers._private.gcp.node_provider."
+        "report_failed_terminations", reported.append)
+
+    node_ids = [f"node-{x}-compute" for x in range(5)] + [
+        "node-failed-compute", "node-missing-compute"]
+    provider.terminate_nodes(node_ids)
+
+    # One batch of deletes and two batches of polls
+    assert compute.batches == [7, 6, 5]
+    # The node already deleted is not a failure
+    assert list(reported[0].keys()) == ["node-failed-compute"]
+
+
 if __name__ == "__main__":
     import sys
 
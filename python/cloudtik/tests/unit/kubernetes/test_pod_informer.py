@@ -0,0 +1,122 @@
+import pytest
+from kubernetes.client import V1ListMeta, V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+
+from cloudtik.core.tags import CLOUDTIK_TAG_CLUSTER_NAME, CLOUDTIK_TAG_NODE_KIND
+from cloudtik.providers._private._kubernetes import node_provider, pod_informer
+from cloudtik.providers._private._kubernetes.node_provider import KubernetesNodeProvider
+
+_CLUSTER_NAME = "cluster-one"
+_NAMESPACE = "cloudtik"
+
+
+def _pod(name, node_kind="worker", phase="Running", resource_version="1"):
+    return V1Pod(
+        metadata=V1ObjectMeta(
+            name=name,
+            labels={CLOUDTIK_TAG_CLUSTER_NAME: _CLUSTER_NAME,
+                    CLOUDTIK_TAG_NODE_KIND: node_kind},
+            resource_version=resource_version),
+        status=V1PodStatus(phase=phase, pod_ip="10.0.0.{}".format(name[-1])))
+
+
+class FakeCoreApi:
+    def __init__(self, pods):
+        self.pods = {pod.metadata.name: pod for pod in pods}
+        self.list_calls = 0
+        self.read_calls = 0
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        self.list_calls += 1
+        return V1PodList(
+            items=list(self.pods.values()),
+            metadata=V1ListMeta(resource_version="10"))
+
+    def read_namespaced_pod(self, name, namespace):
+        self.read_calls += 1
+        return self.pods[name]
+
+
+@pytest.fixture
+def core_api(monkeypatch):
+    api = FakeCoreApi([_pod("pod-1", "head"), _pod("pod-2"), _pod("pod-3", phase="Pending")])
+    monkeypatch.setattr(pod_informer, "core_api", lambda: api)
+    monkeypatch.setattr(node_provider, "core_api", lambda: api)
+    # Don't watch in the tests
+    monkeypatch.setattr(pod_informer.PodInformer, "_run", lambda self: None)
+    return api
+
+
+def _create_provider():
+    return KubernetesNodeProvider({"namespace": _NAMESPACE}, _CLUSTER_NAME)
+
+
+class TestPodInformer:
+    def test_reads_from_cache(self, core_api):
+        provider = _create_provider()
+        assert provider.non_terminated_nodes({}) == ["pod-1", "pod-2", "pod-3"]
+        assert provider.non_terminated_nodes(
+            {CLOUDTIK_TAG_NODE_KIND: "worker"}) == ["pod-2", "pod-3"]
+        assert provider.internal_ip("pod-2") == "10.0.0.2"
+        assert provider.is_running("pod-2")
+        assert not provider.is_running("pod-3")
+        assert provider.node_tags("pod-1")[CLOUDTIK_TAG_NODE_KIND] == "head"
+        assert core_api.read_calls == 0
+
+        # Pods not in the cache are read from the API server
+        core_api.pods["pod-4"] = _pod("pod-4")
+        assert provider.internal_ip("pod-4") == "10.0.0.4"
+        assert core_api.read_calls == 1
+
+    def test_watch_events(self, core_api):
+        informer = pod_informer.PodInformer(_NAMESPACE, "")
+        assert informer.pods() is None
+        informer.resync()
+        assert informer.resource_version == "10"
+
+        informer.handle_event({"type": "ADDED", "object": _pod("pod-4", resource_version="11")})
+        informer.handle_event({"type": "MODIFIED", "object": _pod("pod-2", phase="Failed", resource_version="12")})
+        informer.handle_event({"type": "DELETED", "object": _pod("pod-3", resource_version="13")})
+        assert sorted(pod.metadata.name for pod in informer.pods()) == ["pod-1", "pod-2", "pod-4"]
+        assert informer.get_pod("pod-2").status.phase == "Failed"
+        assert informer.resource_version == "13"
+
+        with pytest.raises(pod_informer.ApiException):
+            informer.handle_event({"type": "ERROR", "object": {"code": 410, "message": "Gone"}})
+
+    def test_optimistic_updates(self, core_api, monkeypatch):
+        provider = _create_provider()
+        provider.non_terminated_nodes({})
+        monkeypatch.setattr(core_api, "patch_namespaced_pod", lambda *args: None, raising=False)
+        monkeypatch.setattr(core_api, "delete_namespaced_pod", lambda *args: None, raising=False)
+        provider._set_node_tags("pod-2", {"tag": "value"})
+        assert provider.node_tags("pod-2")["tag"] == "value"
+        assert core_api.list_calls == 1
+
+        provider.pod_informer.mark_deleting("pod-3")
+        assert provider.non_terminated_nodes({}) == ["pod-1", "pod-2"]
+
+    def test_delayed_event_after_label_update(self, core_api):
+        informer = pod_informer.PodInformer(_NAMESPACE, "")
+        informer.resync()
+        informer.update_labels("pod-2", {"tag": "value"})
+
+        # The event of a change before the update doesn't revert the labels
+        informer.handle_event({"type": "MODIFIED", "object": _pod("pod-2", phase="Failed", resource_version="11")})
+        pod = informer.get_pod("pod-2")
+        assert pod.status.phase == "Failed"
+        assert pod.metadata.labels["tag"] == "value"
+        informer.resync()
+        assert informer.get_pod("pod-2").metadata.labels["tag"] == "value"
+
+        # The labels are taken from the events once the pod shows them
+        updated_pod = _pod("pod-2", resource_version="12")
+        updated_pod.metadata.labels["tag"] = "value"
+        informer.handle_event({"type": "MODIFIED", "object": updated_pod})
+        informer.handle_event({"type": "MODIFIED", "object": _pod("pod-2", resource_version="13")})
+        assert "tag" not in informer.get_pod("pod-2").metadata.labels
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
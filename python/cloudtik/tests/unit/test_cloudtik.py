@@ -1094,6 +1094,49 @@ class CloudTikTest(unittest.TestCase):
         runner.assert_has_call("1.2.3.4", "init_cmd")
         runner.assert_has_call("1.2.3.4", "head_start_cmd")
 
+    def testNonTerminatedNodesRefresh(self):
+        provider = MockProvider()
+        provider.create_node({}, {
+            CLOUDTIK_TAG_NODE_KIND: NODE_KIND_HEAD,
+            CLOUDTIK_TAG_USER_NODE_TYPE: "head"
+        }, 1)
+        provider.create_node({}, {
+            CLOUDTIK_TAG_NODE_KIND: NODE_KIND_WORKER,
+            CLOUDTIK_TAG_USER_NODE_TYPE: "worker"
+        }, 2)
+        node_tags_calls = []
+        node_tags = provider.node_tags
+
+        def counting_node_tags(node_id):
+            node_tags_calls.append(node_id)
+            return node_tags(node_id)
+
+        provider.node_tags = counting_node_tags
+
+        nodes = NonTerminatedNodes(provider)
+        assert nodes.head_id == 0
+        assert nodes.worker_ids == [1, 2]
+        assert nodes.node_type(1) == "worker"
+        assert nodes.internal_ips() == ["172.0.0.0", "172.0.0.1", "172.0.0.2"]
+        assert len(node_tags_calls) == 3
+
+        # Only the new node is queried for tags
+        provider.create_node({}, {
+            CLOUDTIK_TAG_NODE_KIND: NODE_KIND_WORKER,
+            CLOUDTIK_TAG_USER_NODE_TYPE: "worker"
+        }, 1)
+        provider.terminate_node(1)
+        nodes.refresh()
+        assert nodes.worker_ids == [2, 3]
+        assert nodes.is_worker(3) and not nodes.is_worker(1)
+        assert node_tags_calls[3:] == [3]
+        assert 1 not in nodes.node_kinds
+
+        nodes.remove_terminating_nodes([2])
+        assert nodes.worker_ids == [3]
+        assert nodes.all_node_ids == [0, 3]
+        assert not nodes.is_worker(2)
+
     def testValidateNetworkConfig(self):
         web_yaml = ("https://raw.githubusercontent.com/oap-project/cloudtik/main/python/cloudtik/templates/aws/small"
                     ".yaml")
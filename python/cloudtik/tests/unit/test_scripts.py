@@ -0,0 +1,89 @@
+import subprocess
+import sys
+
+import pytest
+
+# The budget in microseconds of importing the CloudTik modules for the CLI
+# commands not running a cluster operation. It's well above the time
+# measured to avoid failing on slow machines while catching the heavy
+# modules being imported again at start.
+CLI_IMPORT_TIME_BUDGET = 500000
+
+# The modules which should be imported only on executing a command
+CLI_LAZY_MODULES = [
+    "cloudtik.core._private.cluster.cluster_operator",
+    "cloudtik.core._private.services",
+    "cloudtik.scripts.workspace",
+    "cloudtik.scripts.runtime_scripts",
+    "redis",
+]
+
+
+def _run_cli_with_import_time(*args):
+    """Run the CLI with -X importtime and return the cumulative import
+    time in microseconds of each module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "from cloudtik.scripts.scripts import main; main()"] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # The header line
+            continue
+        # Top level imports are indented with one space only
+        if name.startswith(" ") and not name.startswith("  "):
+            import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+def _get_cloudtik_import_time(import_times):
+    return sum(
+        import_time for name, import_time in import_times.items()
+        if name.split(".")[0] == "cloudtik")
+
+
+@pytest.mark.parametrize("args", [
+    ["--help"],
+    ["head", "--help"],
+    ["resources", "--cpu"],
+])
+def test_cli_import_time(args):
+    import_times = _run_cli_with_import_time(*args)
+    assert "cloudtik.scripts.scripts" in import_times
+    assert _get_cloudtik_import_time(import_times) < CLI_IMPORT_TIME_BUDGET
+
+
+def test_cli_lazy_modules():
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import sys\n"
+         "from cloudtik.scripts.scripts import cli\n"
+         "print('\\n'.join(sys.modules))"],
+        stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    modules = set(result.stdout.splitlines())
+    for module in CLI_LAZY_MODULES:
+        assert module not in modules
+
+
+def test_cli_lazy_command():
+    from cloudtik.scripts.scripts import cli
+    from cloudtik.scripts.utils import LazyCommand
+
+    assert isinstance(cli.commands["workspace"], LazyCommand)
+    command = cli.get_command(None, "workspace")
+    assert not isinstance(command, LazyCommand)
+    assert command.name == "workspace"
+    assert cli.get_command(None, "workspace") is command
+    assert list(cli.list_commands(None))[-3:] == [
+        "workspace", "runtime", "head"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-v", __file__]))
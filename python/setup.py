@@ -130,6 +130,7 @@ setup_spec.install_requires = [
     "dataclasses; python_version < '3.7'",
     "filelock",
     "jsonschema",
+    "msgpack",
     "numpy >= 1.16; python_version < '3.9'",
     "numpy >= 1.19.3; python_version >= '3.9'",
     "prometheus_client >= 0.7.1",
@@ -144,6 +145,7 @@ setup_spec.install_requires = [
     "pycryptodomex",
     "pyopenssl",
     "sshtunnel",
+    "watchdog",
 ]
 
 
@@ -0,0 +1,496 @@
+"""Scalability benchmarks of the cluster scaler control loop.
+
+The benchmarks run on synthetic clusters built with the MockProvider of the
+unit tests and measure:
+    bin_pack: get_bin_pack_residual of the demands on the existing nodes
+    get_nodes_to_launch: ResourceDemandScheduler.get_nodes_to_launch
+    scaler_update: a full ClusterScaler update (tick) of an up-to-date cluster
+
+For each case, the latency of each run, the peak memory allocated by a run
+and the calls to the node provider are reported. The results can be saved
+as a JSON baseline and compared with a previous baseline.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+import cloudtik
+from cloudtik.core._private.cli_logger import cli_logger
+from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
+from cloudtik.core._private.cluster.cluster_metrics_updater import ClusterMetricsUpdater
+from cloudtik.core._private.cluster.event_summarizer import EventSummarizer
+from cloudtik.core._private.cluster.resource_demand_scheduler import \
+    ResourceDemandScheduler, get_bin_pack_residual
+from cloudtik.core._private.cluster.resource_scaling_policy import ResourceScalingPolicy
+from cloudtik.core._private.cluster.scaler_profiler import ScalerProfiler
+from cloudtik.core._private.providers import _NODE_PROVIDERS, _DEFAULT_CONFIGS, _PROVIDER_HOMES, \
+    _clear_provider_cache
+from cloudtik.core._private.state.control_state import ControlState
+from cloudtik.core._private.state.scaling_state import ScalingStateClient
+from cloudtik.core._private.docker import validate_docker_config
+from cloudtik.core._private.utils import hash_launch_conf, fillout_defaults, \
+    merge_cluster_config, fill_node_type_min_max_workers
+from cloudtik.core.tags import CLOUDTIK_TAG_NODE_KIND, CLOUDTIK_TAG_USER_NODE_TYPE, \
+    CLOUDTIK_TAG_NODE_STATUS, CLOUDTIK_TAG_LAUNCH_CONFIG, CLOUDTIK_TAG_RUNTIME_CONFIG, \
+    CLOUDTIK_TAG_FILE_MOUNTS_CONTENTS, NODE_KIND_HEAD, NODE_KIND_WORKER, STATUS_UP_TO_DATE
+from cloudtik.tests.unit.test_cloudtik import MockProvider, MockProcessRunner, \
+    MockClusterScaler, SMALL_CLUSTER
+
+BENCHMARKS = ["bin_pack", "get_nodes_to_launch", "scaler_update"]
+
+DEFAULT_NODES = [10, 100, 1000, 5000]
+DEFAULT_NODE_TYPES = [4]
+DEFAULT_DEMANDS = [10, 1000, 10000, 100000]
+
+# The minimum latency increase over the baseline to count as a regression,
+# so that the noise of the sub-millisecond cases is not flagged
+DEFAULT_MIN_LATENCY_DIFF_S = 0.005
+
+HEAD_NODE_TYPE = "head.default"
+NODE_TYPE_CPUS = [2, 4, 8, 16, 32, 64]
+
+
+def _make_node_types(num_node_types: int, num_nodes: int) -> Dict[str, Any]:
+    """Make the synthetic node types. Every 4th type has GPUs."""
+    node_types = {
+        HEAD_NODE_TYPE: {
+            "resources": {"CPU": 4, "memory": 16 * 1024 ** 3},
+            "node_config": {"head_default_prop": 1},
+            "max_workers": 0,
+        }
+    }
+    max_workers = num_nodes // num_node_types + 1
+    for i in range(num_node_types):
+        cpus = NODE_TYPE_CPUS[i % len(NODE_TYPE_CPUS)]
+        resources = {"CPU": cpus, "memory": cpus * 4 * 1024 ** 3}
+        if i % 4 == 3:
+            resources["GPU"] = max(cpus // 8, 1)
+        node_types["worker.type-{}".format(i)] = {
+            "resources": resources,
+            "node_config": {"worker_prop": i},
+            "min_workers": 0,
+            "max_workers": max_workers,
+        }
+    return node_types
+
+
+def _worker_node_types(node_types: Dict[str, Any]) -> List[str]:
+    return [node_type for node_type in node_types if node_type != HEAD_NODE_TYPE]
+
+
+def _make_demands(rng: random.Random, num_demands: int) -> List[Dict[str, float]]:
+    demands = []
+    for _ in range(num_demands):
+        demand = {"CPU": rng.choice([0.5, 1, 2, 4, 8])}
+        if rng.random() < 0.5:
+            demand["memory"] = rng.choice([1, 2, 4, 8]) * 1024 ** 3
+        if rng.random() < 0.05:
+            demand["GPU"] = 1
+        demands.append(demand)
+    return demands
+
+
+def _available_resources(rng: random.Random, resources: Dict[str, float]):
+    # Randomly used nodes: fully available, partially used or fully used
+    fraction = rng.choice([0, 0.25, 0.5, 1])
+    return {name: amount * fraction for name, amount in resources.items()}
+
+
+def _create_nodes(provider: MockProvider, node_types: Dict[str, Any],
+                  num_nodes: int, tags_of: Callable[[str], Dict[str, str]]):
+    provider.create_node(
+        node_types[HEAD_NODE_TYPE]["node_config"],
+        dict(tags_of(HEAD_NODE_TYPE), **{
+            CLOUDTIK_TAG_NODE_KIND: NODE_KIND_HEAD,
+            CLOUDTIK_TAG_USER_NODE_TYPE: HEAD_NODE_TYPE}),
+        1, _skip_wait=True)
+    worker_types = _worker_node_types(node_types)
+    for i in range(num_nodes):
+        node_type = worker_types[i % len(worker_types)]
+        provider.create_node(
+            node_types[node_type]["node_config"],
+            dict(tags_of(node_type), **{
+                CLOUDTIK_TAG_NODE_KIND: NODE_KIND_WORKER,
+                CLOUDTIK_TAG_USER_NODE_TYPE: node_type}),
+            1, _skip_wait=True)
+    provider.finish_starting_nodes()
+
+
+def _fill_cluster_metrics(rng: random.Random, cluster_metrics: ClusterMetrics,
+                          provider: MockProvider, node_types: Dict[str, Any]):
+    now = time.time()
+    for node in provider.mock_nodes.values():
+        resources = node_types[node.node_type]["resources"]
+        cluster_metrics.update_heartbeat(node.internal_ip, str(node.node_id), now)
+        cluster_metrics.update_node_resources(
+            node.internal_ip, str(node.node_id), now,
+            resources, _available_resources(rng, resources), {})
+
+
+def _load_mock_provider_home():
+    import cloudtik.providers as mock_provider
+    return os.path.dirname(mock_provider.__file__)
+
+
+class BenchmarkCase:
+    """A benchmark case of the given cluster size and number of demands."""
+
+    def __init__(self, benchmark: str, num_nodes: int, num_node_types: int,
+                 num_demands: int, seed: int):
+        self.benchmark = benchmark
+        self.num_nodes = num_nodes
+        self.num_node_types = num_node_types
+        self.num_demands = num_demands
+        self.rng = random.Random(seed)
+        self.node_types = _make_node_types(num_node_types, num_nodes)
+        self.demands = _make_demands(self.rng, num_demands)
+        self.profiler = None
+
+    @property
+    def name(self) -> str:
+        return "{}[nodes={},node_types={},demands={}]".format(
+            self.benchmark, self.num_nodes, self.num_node_types,
+            self.num_demands)
+
+    def setup(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+    def provider_calls(self) -> Dict[str, int]:
+        if self.profiler is None:
+            return {}
+        return dict(self.profiler.provider_calls)
+
+    def teardown(self):
+        pass
+
+
+class BinPackCase(BenchmarkCase):
+    def setup(self):
+        worker_types = _worker_node_types(self.node_types)
+        self.node_resources = [
+            _available_resources(
+                self.rng,
+                self.node_types[worker_types[i % len(worker_types)]]["resources"])
+            for i in range(self.num_nodes)]
+
+    def run(self):
+        get_bin_pack_residual(self.node_resources, self.demands)
+
+
+class GetNodesToLaunchCase(BenchmarkCase):
+    def setup(self):
+        self.provider = MockProvider()
+        _create_nodes(self.provider, self.node_types, self.num_nodes,
+                      lambda node_type: {})
+        self.profiler = ScalerProfiler()
+        self.profiler.instrument_provider(self.provider)
+        self.scheduler = ResourceDemandScheduler(
+            self.provider, self.node_types, self.num_nodes * 2,
+            HEAD_NODE_TYPE, upscaling_speed=1)
+
+        cluster_metrics = ClusterMetrics()
+        _fill_cluster_metrics(
+            self.rng, cluster_metrics, self.provider, self.node_types)
+        self.nodes = self.provider.non_terminated_nodes({})
+        self.unused_resources_by_ip = cluster_metrics.get_resource_utilization()
+        self.max_resources_by_ip = \
+            cluster_metrics.get_static_node_resources_by_ip()
+
+    def run(self):
+        with self.profiler.tick():
+            self.scheduler.get_nodes_to_launch(
+                self.nodes, {}, self.demands, self.unused_resources_by_ip,
+                self.max_resources_by_ip)
+
+
+class ScalerUpdateCase(BenchmarkCase):
+    """A scaler update of an up-to-date cluster with the resource demands.
+
+    The cluster is at its max workers so that the updates don't launch new
+    nodes and each update sees the same cluster.
+    """
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.provider = MockProvider()
+        _clear_provider_cache()
+        _NODE_PROVIDERS["mock"] = lambda config: lambda *args: self.provider
+        _PROVIDER_HOMES["mock"] = _load_mock_provider_home
+        _DEFAULT_CONFIGS["mock"] = _DEFAULT_CONFIGS["aws"]
+
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["max_workers"] = self.num_nodes
+        config["head_node_type"] = HEAD_NODE_TYPE
+        config["available_node_types"] = copy.deepcopy(self.node_types)
+        config["provider"]["disable_node_updaters"] = True
+        config = fillout_defaults(config)
+        merge_cluster_config(config)
+        validate_docker_config(config)
+        fill_node_type_min_max_workers(config)
+        # Only the synthetic node types
+        config["available_node_types"] = {
+            node_type: node_type_config
+            for node_type, node_type_config in config["available_node_types"].items()
+            if node_type in self.node_types}
+        # Keep the nodes at the count of each type
+        worker_types = _worker_node_types(self.node_types)
+        for i, node_type in enumerate(worker_types):
+            count = len(range(i, self.num_nodes, len(worker_types)))
+            node_type_config = config["available_node_types"][node_type]
+            node_type_config["min_workers"] = count
+            node_type_config["max_workers"] = count
+        config_path = os.path.join(self.tmpdir, "cluster.yaml")
+        with open(config_path, "w") as f:
+            yaml.dump(config, f)
+
+        self.cluster_metrics = ClusterMetrics()
+        self.profiler = ScalerProfiler()
+        self.scaler = MockClusterScaler(
+            config_path,
+            self.cluster_metrics,
+            ClusterMetricsUpdater(
+                self.cluster_metrics, EventSummarizer(), ControlState()),
+            ResourceScalingPolicy(
+                "1.2.3.4", ScalingStateClient.create_from(ControlState())),
+            max_failures=0,
+            process_runner=MockProcessRunner(),
+            update_interval_s=0,
+            scaler_profiler=self.profiler)
+
+        def tags_of(node_type):
+            node_config = self.scaler.config["available_node_types"][
+                node_type]["node_config"]
+            tags = {
+                CLOUDTIK_TAG_NODE_STATUS: STATUS_UP_TO_DATE,
+                CLOUDTIK_TAG_LAUNCH_CONFIG: hash_launch_conf(
+                    node_config, self.scaler.config["auth"]),
+                CLOUDTIK_TAG_RUNTIME_CONFIG: self.scaler.get_node_runtime_hash(
+                    None, {CLOUDTIK_TAG_USER_NODE_TYPE: node_type}),
+            }
+            if self.scaler.file_mounts_contents_hash is not None:
+                tags[CLOUDTIK_TAG_FILE_MOUNTS_CONTENTS] = \
+                    self.scaler.file_mounts_contents_hash
+            return tags
+
+        _create_nodes(self.provider, self.node_types, self.num_nodes, tags_of)
+        _fill_cluster_metrics(
+            self.rng, self.cluster_metrics, self.provider, self.node_types)
+        self.cluster_metrics.resource_demands = self.demands
+
+    def run(self):
+        with self.profiler.tick():
+            self.scaler._update()
+
+    def teardown(self):
+        _clear_provider_cache()
+        _NODE_PROVIDERS.pop("mock", None)
+        _PROVIDER_HOMES.pop("mock", None)
+        _DEFAULT_CONFIGS.pop("mock", None)
+
+
+BENCHMARK_CASES = {
+    "bin_pack": BinPackCase,
+    "get_nodes_to_launch": GetNodesToLaunchCase,
+    "scaler_update": ScalerUpdateCase,
+}
+
+
+def run_case(case: BenchmarkCase, repeat: int) -> Dict[str, Any]:
+    case.setup()
+    try:
+        # Warm up and count the provider calls of a single run
+        case.run()
+        provider_calls = case.provider_calls()
+
+        latencies = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            case.run()
+            latencies.append(time.perf_counter() - start_time)
+
+        # Measure the memory in a separate run as tracing slows it down
+        tracemalloc.start()
+        try:
+            case.run()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        case.teardown()
+
+    return {
+        "benchmark": case.benchmark,
+        "nodes": case.num_nodes,
+        "node_types": case.num_node_types,
+        "demands": case.num_demands,
+        "repeat": repeat,
+        "latency_s": {
+            "min": min(latencies),
+            "median": statistics.median(latencies),
+            "mean": statistics.mean(latencies),
+            "max": max(latencies),
+        },
+        "peak_memory_bytes": peak_memory,
+        "provider_calls": provider_calls,
+    }
+
+
+def _result_key(result: Dict[str, Any]) -> str:
+    return "{}[nodes={},node_types={},demands={}]".format(
+        result["benchmark"], result["nodes"], result["node_types"],
+        result["demands"])
+
+
+def compare_results(results: List[Dict[str, Any]],
+                    baseline: Dict[str, Any], threshold: float,
+                    min_latency_diff: float = DEFAULT_MIN_LATENCY_DIFF_S
+                    ) -> List[str]:
+    """Print the results relative to the baseline. Returns the regressions."""
+    baseline_results = {
+        _result_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    print("\nCompared with baseline of version {}:".format(
+        baseline.get("version")))
+    for result in results:
+        key = _result_key(result)
+        baseline_result = baseline_results.get(key)
+        if baseline_result is None:
+            print("  {}: no baseline".format(key))
+            continue
+        latency = result["latency_s"]["median"]
+        baseline_latency = baseline_result["latency_s"]["median"]
+        latency_ratio = _ratio(latency, baseline_latency)
+        latency_regressed = (latency_ratio > threshold and
+                             latency - baseline_latency > min_latency_diff)
+        memory_ratio = _ratio(result["peak_memory_bytes"],
+                              baseline_result["peak_memory_bytes"])
+        provider_calls = sum(result["provider_calls"].values())
+        baseline_provider_calls = sum(
+            baseline_result.get("provider_calls", {}).values())
+        regressed = (latency_regressed or memory_ratio > threshold
+                     or provider_calls > baseline_provider_calls)
+        print("  {}: latency x{:.2f}, peak memory x{:.2f}, "
+              "provider calls {} -> {}{}".format(
+                  key, latency_ratio, memory_ratio, baseline_provider_calls,
+                  provider_calls, " REGRESSED" if regressed else ""))
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def _ratio(value, baseline_value):
+    if not baseline_value:
+        return 1.0
+    return value / baseline_value
+
+
+def _parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def _format_bytes(num_bytes: int) -> str:
+    return "{:.1f}MB".format(num_bytes / 1024 ** 2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scalability of the cluster scaler.")
+    parser.add_argument(
+        "--benchmarks", type=lambda value: value.split(","),
+        default=BENCHMARKS,
+        help="Comma separated benchmarks to run from: {}".format(
+            ", ".join(BENCHMARKS)))
+    parser.add_argument(
+        "--nodes", type=_parse_int_list, default=DEFAULT_NODES,
+        help="Comma separated numbers of worker nodes.")
+    parser.add_argument(
+        "--node-types", type=_parse_int_list, default=DEFAULT_NODE_TYPES,
+        help="Comma separated numbers of worker node types.")
+    parser.add_argument(
+        "--demands", type=_parse_int_list, default=DEFAULT_DEMANDS,
+        help="Comma separated numbers of resource demand bundles.")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="The number of measured runs of each case.")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="The random seed of the synthetic clusters and demands.")
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="The JSON file to save the results as a baseline.")
+    parser.add_argument(
+        "--baseline", type=str, default=None,
+        help="The JSON baseline to compare the results with.")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2,
+        help="The ratio to the baseline over which a case is a regression.")
+    parser.add_argument(
+        "--min-latency-diff", type=float, default=DEFAULT_MIN_LATENCY_DIFF_S,
+        help="The minimum seconds of the median latency over the baseline "
+             "for a case to regress in latency.")
+    args = parser.parse_args(argv)
+
+    for benchmark in args.benchmarks:
+        if benchmark not in BENCHMARK_CASES:
+            parser.error("Unknown benchmark: {}".format(benchmark))
+
+    # The scaler logs for each update
+    logging.getLogger("cloudtik").setLevel(logging.ERROR)
+    cli_logger.configure(log_style="pretty", verbosity=0)
+
+    results = []
+    for benchmark in args.benchmarks:
+        for num_nodes in args.nodes:
+            for num_node_types in args.node_types:
+                for num_demands in args.demands:
+                    case = BENCHMARK_CASES[benchmark](
+                        benchmark, num_nodes, num_node_types, num_demands,
+                        args.seed)
+                    result = run_case(case, args.repeat)
+                    results.append(result)
+                    print("{}: median {:.4f}s, max {:.4f}s, peak memory {}, "
+                          "provider calls {}".format(
+                              case.name, result["latency_s"]["median"],
+                              result["latency_s"]["max"],
+                              _format_bytes(result["peak_memory_bytes"]),
+                              sum(result["provider_calls"].values())))
+                    sys.stdout.flush()
+
+    report = {
+        "version": cloudtik.__version__,
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print("Results saved to {}".format(args.output))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.threshold,
+                           args.min_latency_diff):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+"""Load generator and latency benchmark of the Redis state store.
+
+The benchmark starts a local Redis with the given number of shards in the
+same way as the head node and simulates:
+    node writers: the heartbeats of the node controllers. Each heartbeat
+        writes the node heartbeat table, publishes to the heartbeat channel
+        and writes the node table when the node info needs a refresh.
+    scaling writers: the scaling policies writing the autoscaling
+        instructions and the resource states of the nodes.
+    controller reader: the cluster controller reading the heartbeats and the
+        scaling state with the ClusterMetricsUpdater.
+
+It reports the p50/p99 latencies and the throughput of each operation, the
+Redis memory per node and the CPU usage of the Redis servers and the
+benchmark clients.
+"""
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+import redis
+
+from cloudtik.core._private import constants, services
+from cloudtik.core._private.cluster.cluster_metrics import ClusterMetrics
+from cloudtik.core._private.cluster.cluster_metrics_updater import ClusterMetricsUpdater
+from cloudtik.core._private.cluster.event_summarizer import EventSummarizer
+from cloudtik.core._private.resource_spec import ResourceSpec
+from cloudtik.core._private.state.control_state import ControlState
+from cloudtik.core._private.state.kv_store import kv_initialize_with_address
+from cloudtik.core._private.state.scaling_state import ScalingStateClient, \
+    NodeHeartbeatSubscriber
+from cloudtik.core._private.state.state_codec import encode_heartbeat, encode_record
+from cloudtik.core.scaling_policy import ScalingState
+
+logger = logging.getLogger(__name__)
+
+NODE_RESOURCES = {"CPU": 16, "memory": 64 * 1024 ** 3}
+
+
+class LatencyRecorder:
+    """Record the latencies of an operation from multiple threads."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._latencies: List[float] = []
+        self.errors = 0
+
+    def reset(self):
+        with self._lock:
+            self._latencies = []
+            self.errors = 0
+
+    def record(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        count = len(latencies)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "throughput_per_s": count / duration if duration > 0 else 0,
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000,
+            "max_ms": (latencies[-1] if latencies else 0) * 1000,
+        }
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0
+    index = min(int(len(sorted_values) * percentile / 100),
+                len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _node_id(index: int) -> str:
+    return "node-{:06d}".format(index)
+
+
+def _node_ip(index: int) -> str:
+    return "10.{}.{}.{}".format(index // 65536 % 256, index // 256 % 256, index % 256)
+
+
+def _control_state(redis_address: str, redis_password: str) -> ControlState:
+    ip, port = redis_address.split(":")
+    control_state = ControlState()
+    control_state.initialize_control_state(ip, port, redis_password)
+    return control_state
+
+
+class SimulatedNode:
+    """The heartbeat writes of a node controller."""
+
+    def __init__(self, index: int):
+        self.node_id = _node_id(index)
+        self.node_ip = _node_ip(index)
+        self.node_info = {
+            "node_id": self.node_id,
+            "node_ip": self.node_ip,
+            "node_type": "worker.default",
+            "resource": NODE_RESOURCES,
+            "process": {},
+        }
+        self.node_info_publish_time = 0
+
+    def send_heartbeat(self, now, node_table, node_heartbeat_table, redis_client):
+        # Same as the NodeController heartbeat
+        if now - self.node_info_publish_time >= constants.CLOUDTIK_NODE_INFO_REFRESH_S:
+            node_table.put(self.node_id, json.dumps(self.node_info))
+            self.node_info_publish_time = now
+        node_heartbeat_table.put(self.node_id, encode_heartbeat(now))
+        redis_client.publish(
+            constants.CLOUDTIK_HEARTBEAT_CHANNEL,
+            encode_record({
+                "node_id": self.node_id,
+                "node_ip": self.node_ip,
+                "last_heartbeat_time": now}))
+
+
+class LoadGenerator:
+    def __init__(self, redis_address: str, redis_password: str, args):
+        self.redis_address = redis_address
+        self.redis_password = redis_password
+        self.args = args
+        self.stop_event = threading.Event()
+        self.heartbeats = LatencyRecorder("heartbeat")
+        self.scaling_updates = LatencyRecorder("scaling_update")
+        self.controller_updates = LatencyRecorder("controller_update")
+        self.threads: List[threading.Thread] = []
+
+    def start(self):
+        nodes = [SimulatedNode(i) for i in range(self.args.nodes)]
+        for i in range(self.args.writer_threads):
+            self._start_thread(self._run_node_writer, nodes[i::self.args.writer_threads])
+        node_ids = [node.node_id for node in nodes]
+        for i in range(self.args.scaling_writers):
+            self._start_thread(
+                self._run_scaling_writer, node_ids[i::self.args.scaling_writers])
+        self._start_thread(self._run_controller_reader)
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _run_periodically(self, period_s: float, func):
+        # Spread the start of the writers over the period
+        next_time = time.time() + random.random() * period_s
+        while not self.stop_event.is_set():
+            delay = next_time - time.time()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            func()
+            next_time += period_s
+
+    def _run_node_writer(self, nodes: List[SimulatedNode]):
+        """Send the heartbeats of the nodes with a shared connection."""
+        control_state = _control_state(self.redis_address, self.redis_password)
+        node_table = control_state.get_node_table()
+        node_heartbeat_table = control_state.get_node_heartbeat_table()
+        ip, port = self.redis_address.split(":")
+        redis_client = redis.StrictRedis(
+            host=ip, port=int(port), password=self.redis_password)
+
+        def send_heartbeats():
+            for node in nodes:
+                start_time = time.perf_counter()
+                try:
+                    node.send_heartbeat(
+                        time.time(), node_table, node_heartbeat_table, redis_client)
+                    self.heartbeats.record(time.perf_counter() - start_time)
+                except Exception as e:
+                    logger.debug("Failed to send heartbeat: {}".format(e))
+                    self.heartbeats.error()
+
+        self._run_periodically(self.args.heartbeat_period, send_heartbeats)
+
+    def _run_scaling_writer(self, node_ids: List[str]):
+        """Write the resource states of the nodes as a scaling policy."""
+        scaling_state_client = ScalingStateClient(
+            _control_state(self.redis_address, self.redis_password))
+
+        def update_scaling_state():
+            now = time.time()
+            scaling_state = ScalingState()
+            scaling_state.set_autoscaling_instructions({
+                "demanding_time": now,
+                "resource_demands": [{"CPU": 1}] * self.args.resource_demands,
+            })
+            for i, node_id in enumerate(node_ids):
+                scaling_state.add_node_resource_state(node_id, {
+                    "node_id": node_id,
+                    "node_ip": _node_ip(int(node_id.split("-")[1])),
+                    "resource_time": now,
+                    "total_resources": NODE_RESOURCES,
+                    "available_resources": {
+                        "CPU": i % 17, "memory": NODE_RESOURCES["memory"] // 2},
+                    "resource_load": {"in_use": i % 2 == 0},
+                })
+            start_time = time.perf_counter()
+            try:
+                scaling_state_client.update_scaling_state(scaling_state)
+                self.scaling_updates.record(time.perf_counter() - start_time)
+            except Exception as e:
+                logger.debug("Failed to update scaling state: {}".format(e))
+                self.scaling_updates.error()
+
+        self._run_periodically(self.args.scaling_period, update_scaling_state)
+
+    def _run_controller_reader(self):
+        """Read the state in the same way as the cluster controller."""
+        ip, port = self.redis_address.split(":")
+        heartbeat_subscriber = NodeHeartbeatSubscriber(redis.StrictRedis(
+            host=ip, port=int(port), password=self.redis_password))
+        heartbeat_subscriber.start()
+        cluster_metrics_updater = ClusterMetricsUpdater(
+            ClusterMetrics(), EventSummarizer(),
+            ScalingStateClient(_control_state(self.redis_address, self.redis_password)),
+            heartbeat_subscriber=heartbeat_subscriber)
+
+        def update_cluster_metrics():
+            start_time = time.perf_counter()
+            try:
+                cluster_metrics_updater.update()
+                self.controller_updates.record(time.perf_counter() - start_time)
+            except Exception as e:
+                logger.debug("Failed to update cluster metrics: {}".format(e))
+                self.controller_updates.error()
+
+        self._run_periodically(self.args.controller_period, update_cluster_metrics)
+        self.nodes_seen = len(
+            cluster_metrics_updater.cluster_metrics.last_heartbeat_time_by_ip)
+
+
+def start_redis(session_dir: str, num_shards: int, password: str):
+    """Start the Redis servers in the same way as the head node."""
+    redis_address, redis_shards, process_infos = services.start_redis(
+        "127.0.0.1",
+        [(None, None)] * (num_shards + 1),
+        ResourceSpec().resolve(is_head=True),
+        session_dir,
+        num_redis_shards=num_shards,
+        password=password)
+    return redis_address, redis_shards, process_infos
+
+
+def redis_used_memory(addresses: List[str], password: str) -> int:
+    used_memory = 0
+    for address in addresses:
+        ip, port = address.split(":")
+        client = redis.StrictRedis(host=ip, port=int(port), password=password)
+        used_memory += client.info("memory")["used_memory"]
+    return used_memory
+
+
+def _cpu_seconds(process: psutil.Process) -> float:
+    cpu_times = process.cpu_times()
+    return cpu_times.user + cpu_times.system
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    password = constants.CLOUDTIK_REDIS_DEFAULT_PASSWORD
+    session_dir = tempfile.mkdtemp(prefix="cloudtik-state-benchmark-")
+    redis_address, redis_shards, process_infos = start_redis(
+        session_dir, args.shards, password)
+    try:
+        kv_initialize_with_address(redis_address, password)
+        addresses = [redis_address] + redis_shards
+        base_memory = redis_used_memory(addresses, password)
+
+        redis_processes = [psutil.Process(process_info.process.pid)
+                           for process_info in process_infos]
+        client_process = psutil.Process()
+
+        load_generator = LoadGenerator(redis_address, password, args)
+        load_generator.start()
+        # Warm up to write all the nodes before measuring
+        time.sleep(args.warmup)
+        for recorder in [load_generator.heartbeats,
+                         load_generator.scaling_updates,
+                         load_generator.controller_updates]:
+            recorder.reset()
+        redis_cpu_start = sum(_cpu_seconds(process) for process in redis_processes)
+        client_cpu_start = _cpu_seconds(client_process)
+        start_time = time.time()
+
+        time.sleep(args.duration)
+
+        duration = time.time() - start_time
+        redis_cpu = sum(
+            _cpu_seconds(process) for process in redis_processes) - redis_cpu_start
+        client_cpu = _cpu_seconds(client_process) - client_cpu_start
+        used_memory = redis_used_memory(addresses, password)
+        load_generator.stop()
+
+        return {
+            "nodes": args.nodes,
+            "shards": args.shards,
+            "heartbeat_period_s": args.heartbeat_period,
+            "scaling_writers": args.scaling_writers,
+            "scaling_period_s": args.scaling_period,
+            "controller_period_s": args.controller_period,
+            "duration_s": duration,
+            "operations": {
+                recorder.name: recorder.report(duration)
+                for recorder in [load_generator.heartbeats,
+                                 load_generator.scaling_updates,
+                                 load_generator.controller_updates]},
+            "controller_nodes_seen": getattr(load_generator, "nodes_seen", None),
+            "redis_memory_bytes": used_memory,
+            "redis_memory_per_node_bytes": (
+                (used_memory - base_memory) / args.nodes if args.nodes else 0),
+            # The CPU usage in the percentage of a core
+            "redis_cpu_percent": redis_cpu / duration * 100,
+            "client_cpu_percent": client_cpu / duration * 100,
+        }
+    finally:
+        for process_info in process_infos:
+            process_info.process.terminate()
+            process_info.process.wait()
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
+def print_result(result: Dict[str, Any]):
+    print("nodes={}, shards={}, heartbeat period={}s, duration={:.1f}s".format(
+        result["nodes"], result["shards"], result["heartbeat_period_s"],
+        result["duration_s"]))
+    for name, report in result["operations"].items():
+        print("  {}: {} ops, {:.1f} ops/s, p50 {:.2f}ms, p99 {:.2f}ms, "
+              "max {:.2f}ms, {} errors".format(
+                  name, report["count"], report["throughput_per_s"],
+                  report["p50_ms"], report["p99_ms"], report["max_ms"],
+                  report["errors"]))
+    print("  controller nodes seen: {}".format(result["controller_nodes_seen"]))
+    print("  redis memory: {:.1f}MB, {:.0f} bytes per node".format(
+        result["redis_memory_bytes"] / 1024 ** 2,
+        result["redis_memory_per_node_bytes"]))
+    print("  cpu: redis {:.1f}%, clients {:.1f}%".format(
+        result["redis_cpu_percent"], result["client_cpu_percent"]))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Redis state store under the cluster load.")
+    parser.add_argument(
+        "--nodes", type=int, default=1000,
+        help="The number of simulated node controllers.")
+    parser.add_argument(
+        "--shards", type=int, default=1,
+        help="The number of Redis shards besides the primary one.")
+    parser.add_argument(
+        "--heartbeat-period", type=float,
+        default=constants.CLOUDTIK_HEARTBEAT_PERIOD_SECONDS,
+        help="The heartbeat period of each node in seconds.")
+    parser.add_argument(
+        "--writer-threads", type=int, default=16,
+        help="The number of threads sending the node heartbeats. "
+             "The nodes of a thread share a connection.")
+    parser.add_argument(
+        "--scaling-writers", type=int, default=1,
+        help="The number of scaling policy writers.")
+    parser.add_argument(
+        "--scaling-period", type=float,
+        default=constants.CLOUDTIK_UPDATE_INTERVAL_S,
+        help="The period of the scaling policy writes in seconds.")
+    parser.add_argument(
+        "--resource-demands", type=int, default=100,
+        help="The number of resource demands in the autoscaling instructions.")
+    parser.add_argument(
+        "--controller-period", type=float,
+        default=constants.CLOUDTIK_UPDATE_INTERVAL_S,
+        help="The period of the cluster controller reads in seconds.")
+    parser.add_argument(
+        "--warmup", type=float, default=5,
+        help="The seconds to run before measuring.")
+    parser.add_argument(
+        "--duration", type=float, default=30,
+        help="The seconds to measure.")
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help="The JSON file to save the result.")
+    args = parser.parse_args(argv)
+
+    if args.writer_threads < 1 or args.scaling_writers < 0:
+        parser.error("Invalid number of writers.")
+    if args.controller_period <= 0 or args.heartbeat_period <= 0 or (
+            args.scaling_period <= 0):
+        parser.error("The periods must be positive.")
+
+    logging.basicConfig(level=logging.WARNING)
+    result = run_benchmark(args)
+    print_result(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print("Result saved to {}".format(args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())